@@ -1,7 +1,226 @@
 import os
+import tempfile
+from typing import Iterator, Optional
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "accounting_for_pets.settings")
 
-application = get_asgi_application()
+
+class PetsASGIHandler(ASGIHandler):
+    """
+    ASGI-обработчик для асинхронного режима развертывания.
+
+    Отличия от стандартного обработчика Django 3.2:
+    - каждый запрос выполняется в своем ThreadSensitiveContext, поэтому
+      синхронные представления DRF, ORM и работа с файлами разных
+      запросов выполняются в отдельных потоках параллельно, а не в одном
+      общем потоке процесса, и не блокируют цикл событий;
+    - тело запроса буферизуется в памяти только до
+      settings.ASGI_BODY_MAX_MEMORY_SIZE, дальше - во временный файл на
+      томе медиафайлов, а тело больше settings.ASGI_BODY_MAX_SIZE
+      отклоняется по заголовку Content-Length до чтения. Медленные
+      клиенты, загружающие фото, занимают только соединение, но не поток;
+    - тело потокового ответа (выгрузка) читается не в цикле событий, а в
+      потоке запроса: генератор выполняет запросы ORM;
+    - слот загрузки фото (api.ratelimit.upload_slots) занимается до
+      чтения тела: при занятых слотах загрузка отклоняется с 503 сразу,
+      а не после того, как клиент передал файл.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and self.is_too_large(scope):
+            await self.send_error(
+                send, 413, b'{"detail": "Request body is too large."}'
+            )
+            return
+        upload = scope["type"] == "http" and self.is_limited_upload(scope)
+        if upload:
+            if not upload_slots.acquire(blocking=False):
+                await self.send_error(
+                    send,
+                    503,
+                    b'{"detail": "Too many concurrent uploads"}',
+                    [(b"retry-after", b"1")],
+                )
+                return
+            scope = {**scope, UPLOAD_SLOT_SCOPE_KEY: True}
+        try:
+            async with ThreadSensitiveContext():
+                await super().__call__(scope, receive, send)
+        finally:
+            if upload:
+                upload_slots.release()
+
+    @staticmethod
+    def is_too_large(scope: dict) -> bool:
+        """Проверяет заявленный размер тела запроса."""
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value) > settings.ASGI_BODY_MAX_SIZE
+                except ValueError:
+                    return False
+        return False
+
+    @staticmethod
+    def is_limited_upload(scope: dict) -> bool:
+        """Проверяет, ограничено ли для запроса число загрузок."""
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        return (
+            settings.API_RATE_LIMIT_ENABLED
+            and path.startswith(settings.API_URL_PREFIX)
+            and is_upload(scope["method"], path)
+        )
+
+    @staticmethod
+    async def send_error(
+        send,
+        status: int,
+        body: bytes,
+        headers: Optional[list[tuple[bytes, bytes]]] = None,
+    ) -> None:
+        """Отправляет JSON-ответ с ошибкой без чтения тела запроса."""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                    *(headers or []),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def read_body(self, receive):
+        """
+        Читает тело запроса, сбрасывая его на диск сверх лимита памяти.
+
+        Части тела в пределах settings.ASGI_BODY_MAX_MEMORY_SIZE пишутся
+        в память прямо в цикле событий; запись на диск (начиная со сброса
+        буфера во временный файл) выполняется в потоке запроса.
+        """
+        body_file = tempfile.SpooledTemporaryFile(
+            max_size=settings.ASGI_BODY_MAX_MEMORY_SIZE,
+            mode="w+b",
+            dir=settings.FILE_UPLOAD_TEMP_DIR,
+        )
+        write_to_disk = sync_to_async(
+            self.write_to_disk, thread_sensitive=True
+        )
+        size = 0
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise RequestAborted()
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > settings.ASGI_BODY_MAX_MEMORY_SIZE:
+                    await write_to_disk(body_file, chunk)
+                else:
+                    body_file.write(chunk)
+                if not message.get("more_body", False):
+                    break
+        except BaseException:
+            await sync_to_async(body_file.close, thread_sensitive=True)()
+            raise
+        body_file.seek(0)
+        return body_file
+
+    @staticmethod
+    def write_to_disk(body_file, chunk: bytes) -> None:
+        """Записывает часть тела во временный файл на диске."""
+        os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+        body_file.write(chunk)
+
+    async def send_response(self, response, send) -> None:
+        """
+        Отправляет ответ; части потокового ответа читаются в потоке запроса.
+
+        Django 3.2 перебирает потоковый ответ прямо в цикле событий, и
+        запросы ORM в генераторе завершаются SynchronousOnlyOperation.
+        Здесь части читаются через sync_to_async в том же потоке, где
+        выполнялось представление (ThreadSensitiveContext запроса), - с тем
+        же соединением с БД и серверным курсором. Чтобы не переключаться
+        в поток на каждую строку, части собираются в блоки по chunk_size.
+        """
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": self.get_response_headers(response),
+            }
+        )
+        parts = iter(response)
+        read_block = sync_to_async(self.read_block, thread_sensitive=True)
+        try:
+            while True:
+                block = await read_block(parts, self.chunk_size)
+                if not block:
+                    break
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": block,
+                        "more_body": True,
+                    }
+                )
+            await send({"type": "http.response.body"})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+    @staticmethod
+    def read_block(parts: Iterator[bytes], size: int) -> bytes:
+        """Читает части потокового ответа, пока не наберется size байт."""
+        block = bytearray()
+        for part in parts:
+            block += part
+            if len(block) >= size:
+                break
+        return bytes(block)
+
+    @staticmethod
+    def get_response_headers(response) -> list[tuple[bytes, bytes]]:
+        """Возвращает заголовки ответа и cookies в формате ASGI."""
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append(
+                (
+                    b"Set-Cookie",
+                    cookie.output(header="").encode("ascii").strip(),
+                )
+            )
+        return headers
+
+
+django.setup(set_prefix=False)
+
+# Модуль лимитов читает настройки при импорте, поэтому импортируется после
+# настройки Django.
+from api.ratelimit import (  # noqa: E402
+    UPLOAD_SLOT_SCOPE_KEY,
+    is_upload,
+    upload_slots,
+)
+
+application = PetsASGIHandler()
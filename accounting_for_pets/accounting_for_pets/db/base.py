@@ -0,0 +1,195 @@
+import logging
+import os
+import threading
+import time
+from queue import Empty, Full, LifoQueue
+from typing import Optional
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Пул открытых соединений psycopg2 одного процесса.
+
+    Хранит до size свободных соединений; если свободных нет, создается
+    новое соединение, а лишние соединения при возврате закрываются.
+    Запросы никогда не ждут соединения, поэтому пул не может привести к
+    взаимной блокировке потоков. После fork (воркеры gunicorn) пул
+    родительского процесса не используется.
+    """
+
+    def __init__(self, size: int, max_lifetime: Optional[float]) -> None:
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.pid = os.getpid()
+        self._idle: LifoQueue = LifoQueue(maxsize=size)
+
+    def get(self):
+        """
+        Возвращает свободное соединение или None, если свободных нет.
+
+        Возвращает:
+            Optional[tuple]: Соединение psycopg2 и время его открытия
+            или None.
+        """
+        while True:
+            try:
+                connection, created_at = self._idle.get_nowait()
+            except Empty:
+                return None
+            if connection.closed or self.is_expired(created_at):
+                self.discard(connection)
+                continue
+            return connection, created_at
+
+    def put(self, connection, created_at: float) -> None:
+        """
+        Возвращает соединение в пул или закрывает его.
+
+        Соединение принимается, только если оно открыто и не находится
+        в транзакции; незавершенная транзакция откатывается.
+
+        Аргументы:
+            connection: Соединение psycopg2.
+            created_at (float): Время открытия соединения (monotonic).
+        """
+        if connection.closed or self.is_expired(created_at):
+            self.discard(connection)
+            return
+        try:
+            status = connection.info.transaction_status
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            self._idle.put_nowait((connection, created_at))
+        except Full:
+            self.discard(connection)
+        except Exception:
+            logger.warning("Discarding broken connection", exc_info=True)
+            self.discard(connection)
+
+    def is_expired(self, created_at: float) -> bool:
+        """Проверяет, превышен ли максимальный срок жизни соединения."""
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - created_at > self.max_lifetime
+        )
+
+    @staticmethod
+    def discard(connection) -> None:
+        """Закрывает соединение, не вызывая исключений."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, settings_dict: dict) -> Optional[ConnectionPool]:
+    """
+    Возвращает пул соединений для базы данных текущего процесса.
+
+    Аргументы:
+        alias (str): Псевдоним базы данных.
+        settings_dict (dict): Настройки базы данных (POOL_SIZE и
+            POOL_MAX_LIFETIME).
+
+    Возвращает:
+        Optional[ConnectionPool]: Пул или None, если пул отключен.
+    """
+    size = settings_dict.get("POOL_SIZE") or 0
+    if size <= 0:
+        return None
+    pool = _pools.get(alias)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None or pool.pid != os.getpid():
+                pool = _pools[alias] = ConnectionPool(
+                    size, settings_dict.get("POOL_MAX_LIFETIME")
+                )
+    return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд PostgreSQL с проверкой соединений и пулом соединений.
+
+    Проверка (CONN_HEALTH_CHECKS): повторно используемое соединение
+    проверяется запросом при первом обращении в каждом HTTP-запросе, и
+    разорванное соединение заменяется новым вместо ошибки запроса.
+
+    Пул (POOL_SIZE > 0): при закрытии в конце запроса соединение
+    возвращается в пул процесса, а при открытии берется из пула. Так
+    соединения переиспользуются и под ASGI, где каждый запрос
+    выполняется в новом потоке и постоянные соединения (CONN_MAX_AGE)
+    не переиспользуются.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.connection_created_at: Optional[float] = None
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params: dict):
+        pool = self.pool
+        pooled = pool.get() if pool is not None else None
+        if pooled is None:
+            self.connection_created_at = time.monotonic()
+            # Новое соединение проверять не нужно.
+            self.health_check_done = True
+            return super().get_new_connection(conn_params)
+
+        connection, self.connection_created_at = pooled
+        self.health_check_done = False
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self) -> None:
+        pool = self.pool
+        if (
+            pool is None
+            or self.in_atomic_block
+            or self.errors_occurred
+            or self.connection_created_at is None
+        ):
+            super()._close()
+            return
+        pool.put(self.connection, self.connection_created_at)
+
+    def close_if_unusable_or_obsolete(self) -> None:
+        super().close_if_unusable_or_obsolete()
+        # Соединение, пережившее запрос, проверяется в следующем запросе.
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self) -> None:
+        """Закрывает переиспользуемое соединение, если оно разорвано."""
+        if (
+            self.connection is None
+            or self.health_check_done
+            or not self.settings_dict.get("CONN_HEALTH_CHECKS")
+            or self.in_atomic_block
+        ):
+            return
+        if not self.is_usable():
+            # Разорванное соединение не возвращается в пул.
+            self.errors_occurred = True
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name: Optional[str] = None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
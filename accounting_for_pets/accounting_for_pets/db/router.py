@@ -0,0 +1,50 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Разрешено ли читать с реплики в текущем запросе. По умолчанию (команды,
+# фоновые задачи, запросы на запись) все запросы идут в основную базу.
+read_from_replica: ContextVar[bool] = ContextVar(
+    "read_from_replica", default=False
+)
+
+
+def get_replicas() -> list[str]:
+    """
+    Возвращает псевдонимы баз данных - реплик основной базы.
+
+    Возвращает:
+        list[str]: Все базы из settings.DATABASES, кроме основной.
+    """
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор запросов к базам данных: запись - в основную базу,
+    чтение - в случайную реплику, если это разрешено для текущего запроса
+    (см. api.middleware.ReplicaMiddleware), иначе в основную базу.
+    """
+
+    def db_for_read(self, model, **hints) -> str:
+        if read_from_replica.get():
+            replicas = get_replicas()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        # Объект, прочитанный с реплики, тоже сохраняется в основную базу.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        # Схема нужна во всех базах: физическая реплика получает ее от
+        # основной базы, а отдельная база (логическая репликация, SQLite
+        # в тестах) создается командой migrate --database <псевдоним>.
+        return True
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+TIMEOUT_SETTINGS = ("statement_timeout", "idle_in_transaction_session_timeout")
+
+
+@contextmanager
+def without_timeouts(using: str = DEFAULT_DB_ALIAS) -> Iterator[None]:
+    """
+    Отключает серверные таймауты запросов на соединении с базой.
+
+    Таймауты settings.DB_STATEMENT_TIMEOUT и
+    settings.DB_IDLE_IN_TRANSACTION_TIMEOUT задаются для каждого
+    соединения и защищают обработку запросов; миграции и пересчеты
+    могут выполняться дольше. На выходе восстанавливаются прежние
+    значения, поэтому вложенные вызовы безопасны. В других СУБД ничего
+    не делает.
+
+    Аргументы:
+        using (str): Псевдоним базы данных.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        yield
+        return
+    previous = {}
+    with connection.cursor() as cursor:
+        for name in TIMEOUT_SETTINGS:
+            cursor.execute("SELECT current_setting(%s)", [name])
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute("SELECT set_config(%s, '0', false)", [name])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in previous.items():
+                cursor.execute(
+                    "SELECT set_config(%s, %s, false)", [name, value]
+                )
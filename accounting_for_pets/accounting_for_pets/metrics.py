@@ -0,0 +1,410 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+# Границы корзин гистограмм длительности, в секундах
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Количество самых медленных SQL-запросов в образце медленного запроса
+SLOW_SAMPLE_QUERIES = 5
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+@dataclass
+class RequestStats:
+    """Статистика SQL-запросов текущего HTTP-запроса."""
+
+    queries: int = 0
+    sql_time: float = 0.0
+    # Самые медленные запросы: куча из (длительность, порядковый номер, SQL)
+    slowest: list = field(default_factory=list)
+
+    def add_query(self, sql: str, duration: float) -> None:
+        """Учитывает выполненный SQL-запрос."""
+        self.queries += 1
+        self.sql_time += duration
+        entry = (duration, self.queries, sql)
+        if len(self.slowest) < SLOW_SAMPLE_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_stats", default=None
+)
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(DURATION_BUCKETS, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса: длительности запросов и этапов, SQL и трафик.
+
+    Метрики хранятся в памяти процесса, поэтому при нескольких воркерах
+    каждый воркер отдает свои значения. Обновление выполняется под одной
+    блокировкой и занимает единицы микросекунд.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Сбрасывает все метрики."""
+        with self._lock:
+            self.requests: dict[tuple[str, str], Histogram] = {}
+            self.responses: dict[tuple[str, str, int], int] = {}
+            self.queries: dict[str, int] = {}
+            self.sql_time: dict[str, float] = {}
+            self.bytes_received: dict[str, int] = {}
+            self.bytes_sent: dict[str, int] = {}
+            self.slow_requests: dict[str, int] = {}
+            self.stages: dict[str, Histogram] = {}
+            self.slow_samples: deque = deque(
+                maxlen=settings.METRICS_SLOW_SAMPLES
+            )
+
+    def observe_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        duration: float,
+        stats: RequestStats,
+        received: int,
+        sent: int,
+    ) -> None:
+        """Учитывает завершенный HTTP-запрос."""
+        with self._lock:
+            histogram = self.requests.get((endpoint, method))
+            if histogram is None:
+                histogram = self.requests[(endpoint, method)] = Histogram()
+            histogram.observe(duration)
+            key = (endpoint, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.queries[endpoint] = (
+                self.queries.get(endpoint, 0) + stats.queries
+            )
+            self.sql_time[endpoint] = (
+                self.sql_time.get(endpoint, 0.0) + stats.sql_time
+            )
+            self.bytes_received[endpoint] = (
+                self.bytes_received.get(endpoint, 0) + received
+            )
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + sent
+
+    def add_bytes_sent(self, endpoint: str, size: int) -> None:
+        """Учитывает отправленные байты тела ответа."""
+        with self._lock:
+            self.bytes_sent[endpoint] = (
+                self.bytes_sent.get(endpoint, 0) + size
+            )
+
+    def observe_stage(self, stage: str, duration: float) -> None:
+        """Учитывает длительность этапа обработки (например, записи файла)."""
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(duration)
+
+    def add_slow_sample(self, endpoint: str, sample: dict) -> None:
+        """Сохраняет образец медленного запроса."""
+        with self._lock:
+            self.slow_requests[endpoint] = (
+                self.slow_requests.get(endpoint, 0) + 1
+            )
+            self.slow_samples.append(sample)
+
+    def get_slow_samples(self) -> list[dict]:
+        """Возвращает образцы медленных запросов, начиная с последнего."""
+        with self._lock:
+            return list(reversed(self.slow_samples))
+
+    def render(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+
+        Возвращает:
+            str: Метрики в формате text/plain; version=0.0.4.
+        """
+        with self._lock:
+            lines = []
+            _render_histograms(
+                lines,
+                "pets_http_request_duration_seconds",
+                "Длительность обработки HTTP-запросов.",
+                {
+                    _labels(endpoint=endpoint, method=method): histogram
+                    for (endpoint, method), histogram in self.requests.items()
+                },
+            )
+            _render_counters(
+                lines,
+                "pets_http_responses_total",
+                "Количество HTTP-ответов по коду статуса.",
+                {
+                    _labels(endpoint=e, method=m, status=status): value
+                    for (e, m, status), value in self.responses.items()
+                },
+            )
+            for name, help_text, values in (
+                (
+                    "pets_db_queries_total",
+                    "Количество SQL-запросов.",
+                    self.queries,
+                ),
+                (
+                    "pets_db_query_duration_seconds_total",
+                    "Суммарное время SQL-запросов.",
+                    self.sql_time,
+                ),
+                (
+                    "pets_http_request_bytes_total",
+                    "Байты тела запросов.",
+                    self.bytes_received,
+                ),
+                (
+                    "pets_http_response_bytes_total",
+                    "Байты тела ответов.",
+                    self.bytes_sent,
+                ),
+                (
+                    "pets_http_slow_requests_total",
+                    "Количество медленных запросов.",
+                    self.slow_requests,
+                ),
+            ):
+                _render_counters(
+                    lines,
+                    name,
+                    help_text,
+                    {
+                        _labels(endpoint=endpoint): value
+                        for endpoint, value in values.items()
+                    },
+                )
+            _render_histograms(
+                lines,
+                "pets_stage_duration_seconds",
+                "Длительность этапов обработки (запись и удаление файлов, "
+                "сериализация).",
+                {
+                    _labels(stage=stage): histogram
+                    for stage, histogram in self.stages.items()
+                },
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()
+    )
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _render_counters(
+    lines: list[str], name: str, help_text: str, values: dict[str, float]
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in values.items():
+        lines.append(f"{name}{{{labels}}} {value}")
+
+
+def _render_histograms(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    histograms: dict[str, Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in histograms.items():
+        cumulative = 0
+        bounds = [*map(str, DURATION_BUCKETS), "+Inf"]
+        for bound, count in zip(bounds, histogram.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """
+    Замеряет длительность этапа обработки.
+
+    Аргументы:
+        stage (str): Название этапа, например "storage_save".
+    """
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe_stage(stage, time.perf_counter() - started)
+
+
+def execute_wrapper(execute: Callable, sql: str, params, many, context):
+    """
+    Обертка выполнения SQL, учитывающая запросы текущего HTTP-запроса.
+
+    Устанавливается на каждое новое соединение с базой данных. Вне
+    HTTP-запроса (фоновые задачи, команды) только вызывает запрос.
+    """
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_execute_wrapper(*, connection, **kwargs) -> None:
+    """Устанавливает execute_wrapper на новое соединение с базой данных."""
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def get_endpoint(request: HttpRequest) -> str:
+    """
+    Возвращает имя эндпоинта для меток метрик.
+
+    Используется имя маршрута (например, "api:pets-list"), а не путь,
+    чтобы число серий не росло с количеством идентификаторов.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_ENDPOINT
+    return match.view_name or UNMATCHED_ENDPOINT
+
+
+def count_streaming_bytes(
+    content: Iterator[bytes], endpoint: str
+) -> Iterator[bytes]:
+    """Считает байты потокового ответа по мере отправки."""
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        registry.add_bytes_sent(endpoint, size)
+
+
+def start_request() -> tuple[float, object]:
+    """
+    Начинает учет HTTP-запроса.
+
+    Возвращает:
+        tuple[float, object]: Время начала и токен ContextVar для
+        finish_request.
+    """
+    return time.perf_counter(), current_stats.set(RequestStats())
+
+
+def finish_request(
+    request: HttpRequest,
+    response: HttpResponse,
+    started: float,
+    token: object,
+) -> None:
+    """
+    Завершает учет HTTP-запроса и записывает метрики.
+
+    Аргументы:
+        request (HttpRequest): HTTP-запрос.
+        response (HttpResponse): HTTP-ответ.
+        started (float): Время начала из start_request.
+        token (object): Токен ContextVar из start_request.
+    """
+    duration = time.perf_counter() - started
+    stats = current_stats.get()
+    current_stats.reset(token)
+    endpoint = get_endpoint(request)
+    try:
+        received = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        received = 0
+    if getattr(response, "file_to_stream", None) is not None:
+        # Файл передает сервер (wsgi.file_wrapper); обертка генератором
+        # отключила бы эту передачу, поэтому размер берется из заголовка.
+        sent = int(response.get("Content-Length") or 0)
+    elif response.streaming:
+        # Байты потокового ответа учитываются по мере отправки.
+        sent = 0
+        response.streaming_content = count_streaming_bytes(
+            response.streaming_content, endpoint
+        )
+    else:
+        sent = len(response.content)
+    registry.observe_request(
+        endpoint,
+        request.method,
+        response.status_code,
+        duration,
+        stats,
+        received,
+        sent,
+    )
+
+    if duration >= settings.METRICS_SLOW_REQUEST_SECONDS:
+        registry.add_slow_sample(
+            endpoint,
+            {
+                "time": time.time(),
+                "endpoint": endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration": round(duration, 6),
+                "queries": stats.queries,
+                "sql_time": round(stats.sql_time, 6),
+                "slowest_sql": [
+                    {"sql": sql, "duration": round(query_duration, 6)}
+                    for query_duration, _, sql in sorted(
+                        stats.slowest, reverse=True
+                    )
+                ],
+            },
+        )
@@ -10,6 +10,30 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY", "SK")
 
 API_KEY = os.getenv("API_KEY", "AK")
+# Дополнительные действующие ключи через запятую (например, на время ротации)
+API_KEYS = [key for key in os.getenv("API_KEYS", "").split(",") if key]
+# Запросы к API не используют сессии, аутентификацию Django и сообщения
+API_URL_PREFIX = "/api/"
+# Лимиты запросов к API по ключу: (токенов в секунду, емкость корзины)
+API_RATE_LIMIT_ENABLED = (
+    os.getenv("API_RATE_LIMIT_ENABLED") or "True"
+) == "True"
+API_RATE_LIMITS = {
+    "read": (50, 100),
+    "write": (10, 20),
+    "upload": (2, 10),
+}
+# Максимум одновременных загрузок фото в одном процессе
+API_UPLOAD_CONCURRENCY = int(os.getenv("API_UPLOAD_CONCURRENCY") or 4)
+
+# Метрики производительности (/api/metrics/ в формате Prometheus)
+METRICS_ENABLED = (os.getenv("METRICS_ENABLED") or "True") == "True"
+# Запросы дольше этого порога (в секундах) сохраняются как образцы
+METRICS_SLOW_REQUEST_SECONDS = float(
+    os.getenv("METRICS_SLOW_REQUEST_SECONDS") or 0.5
+)
+# Количество хранимых образцов медленных запросов
+METRICS_SLOW_SAMPLES = 50
 
 DEBUG = os.getenv("DEBUG") == "True"
 
@@ -22,20 +46,23 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "pets",
     "api",
     "rest_framework",
 ]
 
 MIDDLEWARE = [
+    "api.middleware.MetricsMiddleware",
+    "api.middleware.APIKeyMiddleware",
+    "api.middleware.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.AuthenticationMiddleware",
+    "api.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "api.middleware.APIKeyMiddleware",
 ]
 
 ROOT_URLCONF = "accounting_for_pets.urls"
@@ -58,16 +85,107 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "accounting_for_pets.wsgi.application"
 
+# Для нескольких воркеров gunicorn нужен общий кеш: локальный кеш процесса
+# не видит изменений, сделанных другими воркерами, и устаревшие страницы
+# списка живут до PETS_LIST_CACHE_TIMEOUT. docker-compose по умолчанию
+# подключает memcached (PyMemcacheCache); локальный кеш - для разработки.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND")
+        or "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+}
+
+# Пул соединений процесса (0 - без пула). Под ASGI каждый запрос идет в
+# новом потоке и постоянные соединения не переиспользуются, поэтому там
+# пул включен по умолчанию.
+DB_POOL_SIZE = int(
+    os.getenv("DB_POOL_SIZE")
+    or (10 if os.getenv("SERVER_MODE") == "asgi" else 0)
+)
+
+# Таймауты на стороне сервера в миллисекундах (0 - без ограничения).
+# Задаются для каждого соединения; migrate и пересчеты (refresh_pet_stats,
+# check_photo_counts) отключают их на своем соединении (см.
+# accounting_for_pets.db.timeouts).
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT") or 30000)
+DB_IDLE_IN_TRANSACTION_TIMEOUT = int(
+    os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT") or 60000
+)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "accounting_for_pets.db",
         "NAME": os.getenv("DB_NAME", "postgres"),
         "USER": os.getenv("POSTGRES_USER", "postgres"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.getenv("DB_HOST", "db"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Время жизни постоянного соединения в секундах. С пулом
+        # соединение возвращается в пул в конце каждого запроса.
+        "CONN_MAX_AGE": 0
+        if DB_POOL_SIZE
+        else int(os.getenv("DB_CONN_MAX_AGE") or 60),
+        # Проверять переиспользуемое соединение в начале запроса
+        "CONN_HEALTH_CHECKS": (os.getenv("DB_CONN_HEALTH_CHECKS") or "True")
+        == "True",
+        "POOL_SIZE": DB_POOL_SIZE,
+        "POOL_MAX_LIFETIME": int(os.getenv("DB_POOL_MAX_LIFETIME") or 3600),
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT") or 5),
+            "options": (
+                f"-c statement_timeout={DB_STATEMENT_TIMEOUT} "
+                "-c idle_in_transaction_session_timeout="
+                f"{DB_IDLE_IN_TRANSACTION_TIMEOUT}"
+            ),
+        },
     },
 }
+# Реплика только для чтения (необязательно). С нее читаются безопасные
+# запросы API (список, выгрузка, статистика, журнал изменений), кроме
+# запросов клиента в течение DB_READ_AFTER_WRITE_SECONDS после его записи.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": (
+            os.getenv("DB_REPLICA_NAME") or DATABASES["default"]["NAME"]
+        ),
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": (
+            os.getenv("DB_REPLICA_PORT") or DATABASES["default"]["PORT"]
+        ),
+        # В тестах реплика - та же база, что и основная
+        "TEST": {"MIRROR": "default"},
+    }
+# Локальная замена PostgreSQL (например, для нагрузочного теста без Docker)
+if os.getenv("DB_ENGINE") == "sqlite3":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_NAME") or BASE_DIR / "db.sqlite3",
+        },
+    }
+    # Вторая база SQLite в роли реплики (данные в нее не копируются,
+    # схема создается командой migrate --database replica). В тестах это
+    # отдельная база, что позволяет проверить выбор базы для чтения.
+    if os.getenv("DB_REPLICA_NAME"):
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_REPLICA_NAME"),
+        }
+    # SQLite не поддерживает INCLUDE в индексах, эти поля не нужны для
+    # корректности.
+    SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+DATABASE_ROUTERS = ["accounting_for_pets.db.router.ReplicaRouter"]
+
+# Сколько секунд после запроса на запись клиент читает с основной базы,
+# чтобы видеть свои изменения несмотря на отставание реплики. Для
+# нескольких воркеров нужен общий кеш (см. CACHES).
+DB_READ_AFTER_WRITE_SECONDS = int(
+    os.getenv("DB_READ_AFTER_WRITE_SECONDS") or 5
+)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -100,6 +218,18 @@ STATIC_ROOT = BASE_DIR.joinpath("staticfiles")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR.joinpath("media")
+# Фото отдаются только с API-ключом или по подписанному URL (API выдает
+# подписанные URL). Срок действия подписи - от MEDIA_URL_TTL до
+# 2 * MEDIA_URL_TTL секунд; должен быть больше времени кеширования
+# страниц списка (PETS_LIST_CACHE_TIMEOUT).
+MEDIA_URL_TTL = int(os.getenv("MEDIA_URL_TTL") or 3600)
+# Передавать файл через nginx (X-Accel-Redirect на внутренний location
+# MEDIA_ACCEL_REDIRECT_PREFIX): Django только проверяет доступ. Включено
+# по умолчанию, так как nginx проксирует весь /media/ в Django. Отдача
+# файла самим Django (False) - только для разработки без nginx
+# (runserver).
+MEDIA_ACCEL_REDIRECT = (os.getenv("MEDIA_ACCEL_REDIRECT") or "True") == "True"
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
 
 SITE_URL = os.getenv("SITE_URL")
 
@@ -111,11 +241,28 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     "DATETIME_FORMAT": "%Y-%m-%dT%H:%M:%S",
+    # Доступ к API проверяется APIKeyMiddleware
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
 }
 
 # Максимальный размер загружаемых файлов (в байтах)
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 МБ
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 МБ
+# Каталог временных файлов внутри MEDIA_ROOT (тот же том, что и фото,
+# чтобы готовый файл перемещался на место без копирования)
+FILE_UPLOAD_TEMP_DIR = MEDIA_ROOT.joinpath("tmp")
+# Максимальный размер фотографии (как client_max_body_size в nginx.conf)
+PHOTO_UPLOAD_MAX_SIZE = 10 * 1024 * 1024  # 10 МБ
+# ASGI: тело запроса держится в памяти до этого размера, дальше - на диске
+ASGI_BODY_MAX_MEMORY_SIZE = 256 * 1024  # 256 КБ
+# Пакетная загрузка фото: количество файлов, размер запроса (как
+# client_max_body_size для /api/v1/pets/photos/ в nginx.conf) и количество
+# потоков проверки изображений в процессе
+PHOTO_BATCH_MAX_FILES = 30
+PHOTO_BATCH_MAX_SIZE = 100 * 1024 * 1024  # 100 МБ
+PHOTO_BATCH_WORKERS = int(os.getenv("PHOTO_BATCH_WORKERS") or 4)
+# ASGI: максимальный размер тела запроса
+ASGI_BODY_MAX_SIZE = PHOTO_BATCH_MAX_SIZE + 64 * 1024
 
 # Регулярное выражение для проверки валидности имени питомца (любые буквы)
 VALID_NAME_REGEX = r"^[A-Za-zА-Яа-я]+$"
@@ -126,5 +273,45 @@ PET_AGE_MAX = 30
 
 # Настройки пагинации для PetViewSet
 PAGINATION_LIMIT = 20
+# Больший limit уменьшается до этого значения
+PAGINATION_MAX_LIMIT = 100
 PAGINATION_OFFSET = 0
 HAS_PHOTOS_DEFAULT = None
+# Режим подсчета общего количества: "exact", "estimated" или "none"
+PAGINATION_COUNT_DEFAULT = "exact"
+# Ниже этого порога оценка заменяется точным подсчетом
+PAGINATION_ESTIMATE_THRESHOLD = 10_000
+# Время жизни закешированной страницы списка (в секундах)
+PETS_LIST_CACHE_TIMEOUT = 60
+# Сериализация списка питомцев из строк values() без полей DRF
+PETS_FAST_SERIALIZATION = os.getenv("PETS_FAST_SERIALIZATION") == "True"
+
+# Пакетное создание питомцев
+PETS_BULK_CREATE_BATCH_SIZE = 1000
+PETS_BULK_CREATE_MAX_BATCH_SIZE = 5000
+PETS_BULK_CREATE_MAX_ITEMS = 100_000
+
+# Размер пакета при потоковой выгрузке питомцев
+PETS_EXPORT_CHUNK_SIZE = 2000
+
+# Журнал изменений (api/v1/pets/changes/): размер страницы по умолчанию
+# и максимальный, срок хранения событий для compact_changes (в днях)
+PETS_CHANGES_LIMIT = 500
+PETS_CHANGES_MAX_LIMIT = 5000
+PETS_CHANGES_RETENTION_DAYS = int(
+    os.getenv("PETS_CHANGES_RETENTION_DAYS") or 30
+)
+PETS_CHANGES_COMPACT_BATCH_SIZE = 5000
+
+# Фоновые задачи (удаление файлов и т.п.) в пуле потоков процесса
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS") or 2)
+BACKGROUND_TASKS_SYNC = os.getenv("BACKGROUND_TASKS_SYNC") == "True"
+FILE_REMOVAL_BATCH_SIZE = 500
+
+# Уменьшенные копии фотографий (создаются в фоне после загрузки)
+PHOTO_RENDITIONS_DIR = "renditions"
+PHOTO_RENDITION_WIDTHS = (160, 480, 1024)
+PHOTO_RENDITION_FORMAT = "WEBP"
+PHOTO_RENDITION_QUALITY = 80
+# Количество процессов для обработки; 0 - обработка в фоновом потоке
+PHOTO_PROCESSING_WORKERS = int(os.getenv("PHOTO_PROCESSING_WORKERS") or 2)
@@ -0,0 +1,231 @@
+import io
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.backends.signals import connection_created
+from django.test import Client
+from PIL import Image
+
+from pets import stats
+from pets.models import Pet, Photo
+
+BENCHMARK_PET_NAME = "Benchmark"
+BENCHMARK_PHOTO_PREFIX = "photos/benchmark/"
+SEED_BATCH_SIZE = 5000
+
+
+@dataclass
+class ScenarioResult:
+    """Результаты одного сценария нагрузки."""
+
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+    # Количество новых соединений с базой данных за время замеров
+    connections: int = 0
+
+    def to_dict(self) -> dict:
+        """
+        Сводит замеры в словарь для JSON-отчета.
+
+        Возвращает:
+            dict: Пропускная способность, перцентили задержки (мс),
+            количество SQL-запросов и новых соединений на запрос.
+        """
+        count = len(self.latencies)
+        latencies = sorted(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "throughput_rps": (
+                round(count / self.elapsed, 2) if self.elapsed else None
+            ),
+            "latency_ms": {
+                "mean": _ms(sum(latencies) / count) if count else None,
+                "p50": _ms(percentile(latencies, 50)),
+                "p95": _ms(percentile(latencies, 95)),
+                "p99": _ms(percentile(latencies, 99)),
+                "max": _ms(latencies[-1]) if count else None,
+            },
+            "queries": {
+                "mean": (
+                    round(sum(self.queries) / count, 2) if count else None
+                ),
+                "max": max(self.queries) if count else None,
+            },
+            "connections_per_request": (
+                round(self.connections / count, 3) if count else None
+            ),
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 3)
+
+
+def percentile(values: list[float], percent: float) -> Optional[float]:
+    """
+    Возвращает перцентиль отсортированного списка (метод ближайшего ранга).
+
+    Аргументы:
+        values (list[float]): Отсортированные значения.
+        percent (float): Перцентиль от 0 до 100.
+
+    Возвращает:
+        Optional[float]: Значение перцентиля или None для пустого списка.
+    """
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def get_client() -> Client:
+    """
+    Возвращает тестовый клиент с API-ключом и допустимым заголовком Host.
+
+    Возвращает:
+        Client: Клиент Django для запросов к API в текущем процессе.
+    """
+    host = next(
+        (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"),
+        "testserver",
+    )
+    return Client(HTTP_X_API_KEY=settings.API_KEY, HTTP_HOST=host)
+
+
+def seed_pets(
+    count: int, max_photos: int, rng: random.Random
+) -> list[uuid.UUID]:
+    """
+    Создает питомцев и записи фотографий для нагрузочного теста.
+
+    Фотографии ссылаются на несуществующие файлы в BENCHMARK_PHOTO_PREFIX:
+    для списков и удаления важны только строки в базе данных.
+
+    Аргументы:
+        count (int): Количество питомцев.
+        max_photos (int): Максимальное количество фото у одного питомца.
+        rng (random.Random): Генератор случайных чисел.
+
+    Возвращает:
+        list[uuid.UUID]: Идентификаторы созданных питомцев.
+    """
+    created = []
+    for start in range(0, count, SEED_BATCH_SIZE):
+        pets = []
+        photos = []
+        for _ in range(min(SEED_BATCH_SIZE, count - start)):
+            photo_count = rng.randint(0, max_photos) if max_photos else 0
+            pet = Pet(
+                name=BENCHMARK_PET_NAME,
+                age=rng.randint(settings.PET_AGE_MIN, settings.PET_AGE_MAX),
+                type=rng.choice(Pet.PET_TYPES)[0],
+                photo_count=photo_count,
+            )
+            pets.append(pet)
+            photos.extend(
+                Photo(
+                    pet=pet,
+                    file=f"{BENCHMARK_PHOTO_PREFIX}{rng.randrange(1000)}.jpg",
+                )
+                for _ in range(photo_count)
+            )
+        with transaction.atomic():
+            Pet.objects.bulk_create(pets)
+            Photo.objects.bulk_create(photos, batch_size=SEED_BATCH_SIZE)
+            stats.pets_created(pets)
+        created.extend(pet.id for pet in pets)
+    return created
+
+
+def make_image(rng: random.Random, size: int = 256) -> bytes:
+    """
+    Создает уникальное JPEG-изображение для загрузки.
+
+    Аргументы:
+        rng (random.Random): Генератор случайных чисел.
+        size (int): Сторона изображения в пикселях.
+
+    Возвращает:
+        bytes: Содержимое JPEG-файла.
+    """
+    color = tuple(rng.randrange(256) for _ in range(3))
+    image = Image.new("RGB", (size, size), color)
+    image.putpixel((0, 0), (rng.randrange(256), 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def run_scenario(
+    name: str,
+    request: Callable[[], object],
+    iterations: int,
+    warmup: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> ScenarioResult:
+    """
+    Выполняет сценарий последовательно и замеряет каждый запрос.
+
+    Время подготовки (setup) не входит ни в задержку, ни в общее время
+    сценария, по которому считается пропускная способность. Как и
+    сервер, сценарий закрывает устаревшие соединения после каждого
+    запроса, поэтому открытие соединения входит в замеры.
+
+    Аргументы:
+        name (str): Название сценария.
+        request (Callable[[], object]): Функция, выполняющая один запрос
+            и возвращающая ответ.
+        iterations (int): Количество замеряемых запросов.
+        warmup (int): Количество запросов прогрева без замеров.
+        setup (Optional[Callable[[], None]]): Подготовка перед каждым
+            запросом.
+
+    Возвращает:
+        ScenarioResult: Результаты сценария.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        request()
+        close_old_connections()
+
+    result = ScenarioResult(name)
+
+    def count_query(execute, sql, params, many, context):
+        result.queries[-1] += 1
+        return execute(sql, params, many, context)
+
+    def count_connection(**kwargs) -> None:
+        result.connections += 1
+
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+            close_old_connections()
+        result.queries.append(0)
+        connection_created.connect(count_connection)
+        try:
+            with connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                response = request()
+                # Тестовый клиент, в отличие от сервера, не закрывает
+                # соединения в конце запроса.
+                close_old_connections()
+                duration = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+        result.latencies.append(duration)
+        result.elapsed += duration
+        if response.status_code >= 400:
+            result.errors += 1
+    return result
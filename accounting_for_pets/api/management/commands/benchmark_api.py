@@ -0,0 +1,339 @@
+import json
+import platform
+import random
+import subprocess
+from datetime import datetime, timezone
+from typing import Optional
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.benchmark import (
+    BENCHMARK_PET_NAME,
+    ScenarioResult,
+    get_client,
+    make_image,
+    run_scenario,
+    seed_pets,
+)
+from pets.models import Pet
+from pets.tasks import get_executor
+
+SCENARIOS = (
+    "list_shallow",
+    "list_deep_offset",
+    "list_with_photos",
+    "list_without_photos",
+    "create",
+    "upload_photo",
+    "bulk_delete",
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для нагрузочного тестирования эндпоинтов PetViewSet.
+
+    Заполняет базу данных тестовыми питомцами и фотографиями, выполняет
+    сценарии через тестовый клиент Django (в текущем процессе, без сети)
+    и сохраняет пропускную способность, перцентили задержки и количество
+    SQL-запросов в JSON-файл для сравнения между коммитами.
+    """
+
+    help = "Нагрузочный тест эндпоинтов питомцев с отчетом в JSON."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--pets",
+            type=int,
+            default=10_000,
+            help=(
+                "Размер набора данных. Недостающие тестовые питомцы "
+                "создаются, уже созданные переиспользуются."
+            ),
+        )
+        parser.add_argument(
+            "--max-photos",
+            type=int,
+            default=20,
+            help="Максимальное количество фото у питомца при заполнении.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Количество замеряемых запросов в каждом сценарии.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="Количество запросов прогрева в каждом сценарии.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=settings.PAGINATION_LIMIT,
+            help="Размер страницы для сценариев списка.",
+        )
+        parser.add_argument(
+            "--delete-size",
+            type=int,
+            default=50,
+            help="Количество питомцев в одном запросе массового удаления.",
+        )
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help=f"Сценарии через запятую: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Не отключать кеш страниц списка.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Начальное значение генератора случайных чисел.",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark.json",
+            help="Путь к JSON-файлу с результатами.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="JSON-файл предыдущего запуска для сравнения.",
+        )
+        parser.add_argument(
+            "--clean",
+            action="store_true",
+            help="Удалить тестовых питомцев и завершить работу.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        scenarios = [s for s in options["scenarios"].split(",") if s]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Неизвестные сценарии: {', '.join(unknown)}")
+
+        self.client = get_client()
+        self.rng = random.Random(options["seed"])
+        overrides = {"API_RATE_LIMIT_ENABLED": False}
+        if not options["cache"]:
+            overrides["PETS_LIST_CACHE_TIMEOUT"] = 0
+        if connection.vendor == "sqlite":
+            # SQLite не допускает параллельной записи из фоновых потоков,
+            # поэтому фоновые задачи выполняются в потоке запроса.
+            overrides["BACKGROUND_TASKS_SYNC"] = True
+
+        with override_settings(**overrides):
+            if options["clean"]:
+                removed = self.clean()
+                self.stdout.write(f"Удалено тестовых питомцев: {removed}")
+                return
+            self.seed(options["pets"], options["max_photos"])
+            results = {
+                name: getattr(self, f"run_{name}")(options).to_dict()
+                for name in scenarios
+            }
+        # Дожидается фоновых задач, чтобы они не пережили команду.
+        get_executor().shutdown(wait=True)
+
+        report = {
+            "meta": self.get_meta(options),
+            "results": results,
+        }
+        with open(options["output"], "w") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        self.print_report(results, self.load_previous(options["compare"]))
+        self.stdout.write(
+            self.style.SUCCESS(f"Результаты сохранены в {options['output']}")
+        )
+
+    def seed(self, count: int, max_photos: int) -> None:
+        """Дополняет набор тестовых питомцев до нужного размера."""
+        existing = Pet.objects.filter(name=BENCHMARK_PET_NAME).count()
+        if existing < count:
+            self.stdout.write(f"Создание питомцев: {count - existing}")
+            seed_pets(count - existing, max_photos, self.rng)
+
+    def clean(self) -> int:
+        """
+        Удаляет тестовых питомцев через API, вместе с фото и файлами.
+
+        Возвращает:
+            int: Количество удаленных питомцев.
+        """
+        removed = 0
+        while True:
+            ids = list(
+                Pet.objects.filter(name=BENCHMARK_PET_NAME).values_list(
+                    "id", flat=True
+                )[:1000]
+            )
+            if not ids:
+                break
+            self.client.delete(
+                "/api/v1/pets/",
+                {"ids": [str(pk) for pk in ids]},
+                content_type="application/json",
+            )
+            removed += len(ids)
+        get_executor().shutdown(wait=True)
+        return removed
+
+    def run_list(
+        self, name: str, options: dict, query: str
+    ) -> ScenarioResult:
+        url = f"/api/v1/pets/?limit={options['limit']}{query}"
+        return run_scenario(
+            name,
+            lambda: self.client.get(url),
+            options["requests"],
+            options["warmup"],
+        )
+
+    def run_list_shallow(self, options: dict) -> ScenarioResult:
+        return self.run_list("list_shallow", options, "")
+
+    def run_list_deep_offset(self, options: dict) -> ScenarioResult:
+        offset = max(Pet.objects.count() - options["limit"], 0)
+        return self.run_list(
+            "list_deep_offset", options, f"&offset={offset}"
+        )
+
+    def run_list_with_photos(self, options: dict) -> ScenarioResult:
+        return self.run_list("list_with_photos", options, "&has_photos=true")
+
+    def run_list_without_photos(self, options: dict) -> ScenarioResult:
+        return self.run_list(
+            "list_without_photos", options, "&has_photos=false"
+        )
+
+    def run_create(self, options: dict) -> ScenarioResult:
+        def request():
+            return self.client.post(
+                "/api/v1/pets/",
+                {
+                    "name": BENCHMARK_PET_NAME,
+                    "age": self.rng.randint(
+                        settings.PET_AGE_MIN, settings.PET_AGE_MAX
+                    ),
+                    "type": self.rng.choice(Pet.PET_TYPES)[0],
+                },
+                content_type="application/json",
+            )
+
+        return run_scenario(
+            "create", request, options["requests"], options["warmup"]
+        )
+
+    def run_upload_photo(self, options: dict) -> ScenarioResult:
+        pet_ids = list(
+            Pet.objects.filter(name=BENCHMARK_PET_NAME).values_list(
+                "id", flat=True
+            )[:100]
+        )
+        payload = {}
+
+        def setup():
+            payload["url"] = f"/api/v1/pets/{self.rng.choice(pet_ids)}/photo/"
+            payload["file"] = SimpleUploadedFile(
+                "photo.jpg", make_image(self.rng), content_type="image/jpeg"
+            )
+
+        return run_scenario(
+            "upload_photo",
+            lambda: self.client.post(
+                payload["url"], {"file": payload["file"]}
+            ),
+            options["requests"],
+            options["warmup"],
+            setup=setup,
+        )
+
+    def run_bulk_delete(self, options: dict) -> ScenarioResult:
+        payload = {}
+
+        def setup():
+            ids = seed_pets(options["delete_size"], 3, self.rng)
+            payload["ids"] = [str(pk) for pk in ids]
+
+        return run_scenario(
+            "bulk_delete",
+            lambda: self.client.delete(
+                "/api/v1/pets/", payload, content_type="application/json"
+            ),
+            options["requests"],
+            options["warmup"],
+            setup=setup,
+        )
+
+    def get_meta(self, options: dict) -> dict:
+        """Возвращает параметры запуска для отчета."""
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "pool_size": connection.settings_dict.get("POOL_SIZE", 0),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "pets": Pet.objects.count(),
+            "max_photos": options["max_photos"],
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "limit": options["limit"],
+            "delete_size": options["delete_size"],
+            "cache": options["cache"],
+            "background_tasks_sync": settings.BACKGROUND_TASKS_SYNC
+            or connection.vendor == "sqlite",
+            "seed": options["seed"],
+        }
+
+    @staticmethod
+    def load_previous(path: Optional[str]) -> dict:
+        """Загружает результаты предыдущего запуска для сравнения."""
+        if not path:
+            return {}
+        try:
+            with open(path) as file:
+                return json.load(file)["results"]
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"Не удалось прочитать {path}: {error}")
+
+    def print_report(self, results: dict, previous: dict) -> None:
+        """Выводит таблицу результатов и изменение p95 к прошлому запуску."""
+        self.stdout.write(
+            f"{'сценарий':<22}{'rps':>10}{'p50':>10}{'p95':>10}"
+            f"{'p99':>10}{'sql':>8}{'соед.':>7}{'ошибки':>8}{'Δp95':>9}"
+        )
+        for name, result in results.items():
+            latency = result["latency_ms"]
+            delta = ""
+            before = previous.get(name, {}).get("latency_ms", {}).get("p95")
+            if before and latency["p95"] is not None:
+                delta = f"{(latency['p95'] - before) / before:+.0%}"
+            self.stdout.write(
+                f"{name:<22}{result['throughput_rps'] or 0:>10}"
+                f"{latency['p50'] or 0:>10}{latency['p95'] or 0:>10}"
+                f"{latency['p99'] or 0:>10}{result['queries']['mean'] or 0:>8}"
+                f"{result['connections_per_request'] or 0:>7}"
+                f"{result['errors']:>8}{delta:>9}"
+            )
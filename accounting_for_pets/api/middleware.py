@@ -1,12 +1,152 @@
+import asyncio
+import hmac
+import logging
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
 from django.http import HttpRequest, HttpResponse, JsonResponse
 
+from accounting_for_pets.db.router import get_replicas, read_from_replica
+from accounting_for_pets.metrics import (
+    finish_request,
+    install_execute_wrapper,
+    start_request,
+)
+from api.ratelimit import (
+    ENDPOINT_UPLOAD,
+    SAFE_METHODS,
+    UPLOAD_SLOT_SCOPE_KEY,
+    RateLimitResult,
+    check_rate_limit,
+    get_client_id,
+    get_endpoint_class,
+    upload_slots,
+)
+from pets.media import is_signed_request
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_keyring() -> tuple[bytes, ...]:
+    """
+    Возвращает действующие API-ключи.
+
+    Основной ключ settings.API_KEY и дополнительные settings.API_KEYS
+    (например, старый и новый ключ на время ротации). Результат
+    кешируется и сбрасывается при изменении настроек в тестах.
+
+    Возвращает:
+        tuple[bytes, ...]: API-ключи в байтах.
+    """
+    keys = [settings.API_KEY, *settings.API_KEYS]
+    return tuple(dict.fromkeys(key.encode() for key in keys if key))
+
+
+@receiver(setting_changed)
+def reset_keyring(*, setting: str, **kwargs) -> None:
+    """Сбрасывает кеш ключей при изменении API_KEY или API_KEYS."""
+    if setting in ("API_KEY", "API_KEYS"):
+        get_keyring.cache_clear()
+
+
+def is_valid_api_key(api_key: Optional[str]) -> bool:
+    """
+    Проверяет API-ключ за постоянное время.
+
+    Ключ сравнивается со всеми ключами связки без досрочного выхода,
+    чтобы время проверки не зависело ни от совпавшего префикса, ни от
+    позиции ключа в связке.
+
+    Аргументы:
+        api_key (Optional[str]): Ключ из заголовка запроса.
+
+    Возвращает:
+        bool: True, если ключ действителен.
+    """
+    if not api_key:
+        return False
+    candidate = api_key.encode()
+    valid = False
+    for key in get_keyring():
+        valid |= hmac.compare_digest(candidate, key)
+    return valid
+
+
+def is_api_request(request: HttpRequest) -> bool:
+    """Проверяет, относится ли запрос к API без состояния."""
+    return request.path_info.startswith(settings.API_URL_PREFIX)
+
+
+class WebOnlyMiddlewareMixin:
+    """
+    Миксин, пропускающий middleware для запросов к API.
+
+    API не использует сессии, пользователей и сообщения, поэтому для
+    запросов к settings.API_URL_PREFIX обработка такого middleware
+    не выполняется вовсе.
+    """
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(
+    WebOnlyMiddlewareMixin, sessions_middleware.SessionMiddleware
+):
+    """SessionMiddleware только для запросов вне API."""
+
+
+class AuthenticationMiddleware(
+    WebOnlyMiddlewareMixin, auth_middleware.AuthenticationMiddleware
+):
+    """AuthenticationMiddleware только для запросов вне API."""
+
+
+class MessageMiddleware(
+    WebOnlyMiddlewareMixin, messages_middleware.MessageMiddleware
+):
+    """MessageMiddleware только для запросов вне API."""
+
 
 class APIKeyMiddleware:
-    """Middleware для проверки API-ключа в заголовках запроса."""
+    """
+    Middleware для проверки API-ключа и лимитов запросов.
+
+    Стоит первым в settings.MIDDLEWARE, поэтому запросы без ключа или с
+    неверным ключом отклоняются до остальной обработки; запросы к фото
+    по подписанному URL ключа не требуют. Для запросов к API
+    применяются лимиты token bucket по ключу и классу эндпоинта (чтение,
+    запись, загрузка), а число одновременных загрузок в процессе
+    ограничено: лишние загрузки отклоняются с 503 до чтения тела.
+
+    Поддерживает синхронный (WSGI) и асинхронный (ASGI) режимы. Лимиты
+    хранятся в кеше, обращения к которому синхронные, поэтому в
+    асинхронном режиме проверка выполняется в потоке запроса, а не в
+    цикле событий.
+    """
+
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response) -> None:
         self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Помечает экземпляр как корутину, чтобы Django вызывал его
+            # в асинхронном режиме.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
         """
@@ -18,10 +158,285 @@ class APIKeyMiddleware:
         Возвращает:
             HttpResponse: HTTP-ответ.
 
-        Возвращает 401 Unauthorized, если API-ключ отсутствует или неверен.
+        Возвращает 401 Unauthorized, если API-ключ отсутствует или неверен,
+        429 Too Many Requests при превышении лимита и 503 Service
+        Unavailable, если заняты все слоты загрузки.
+        """
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response, limit, upload = self.check_request(request)
+        if response is not None:
+            return response
+        try:
+            response = self.get_response(request)
+        finally:
+            if upload:
+                upload_slots.release()
+        return self.add_rate_limit_headers(response, limit)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Асинхронная версия __call__ для ASGI."""
+        response, limit, upload = await sync_to_async(
+            self.check_request, thread_sensitive=True
+        )(request)
+        if response is not None:
+            return response
+        try:
+            response = await self.get_response(request)
+        finally:
+            if upload:
+                upload_slots.release()
+        return self.add_rate_limit_headers(response, limit)
+
+    def check_request(
+        self, request: HttpRequest
+    ) -> tuple[Optional[HttpResponse], Optional[RateLimitResult], bool]:
+        """
+        Проверяет API-ключ, лимит запросов и слот загрузки.
+
+        Аргументы:
+            request (HttpRequest): Входящий HTTP-запрос.
+
+        Возвращает:
+            tuple[Optional[HttpResponse], Optional[RateLimitResult], bool]:
+            Ответ с отказом (или None), результат проверки лимита (или
+            None, если лимиты не применяются) и признак занятого слота
+            загрузки, который нужно освободить после ответа.
         """
         api_key = request.headers.get("X-API-KEY")
+        if not is_valid_api_key(api_key) and not is_signed_request(request):
+            response = JsonResponse({"detail": "Unauthorized"}, status=401)
+            return response, None, False
+
+        if not settings.API_RATE_LIMIT_ENABLED or not is_api_request(request):
+            return None, None, False
+
+        limit = check_rate_limit(request, api_key)
+        if not limit.allowed:
+            response = JsonResponse(
+                {"detail": "Too Many Requests"}, status=429
+            )
+            return self.add_rate_limit_headers(response, limit), limit, False
+
+        if get_endpoint_class(request) != ENDPOINT_UPLOAD:
+            return None, limit, False
+        if getattr(request, "scope", {}).get(UPLOAD_SLOT_SCOPE_KEY):
+            # Под ASGI слот занимает и освобождает обработчик.
+            return None, limit, False
+        if not upload_slots.acquire(blocking=False):
+            response = JsonResponse(
+                {"detail": "Too many concurrent uploads"}, status=503
+            )
+            response["Retry-After"] = "1"
+            return response, limit, False
+        return None, limit, True
+
+    @staticmethod
+    def add_rate_limit_headers(
+        response: HttpResponse, limit: Optional[RateLimitResult]
+    ) -> HttpResponse:
+        """Добавляет в ответ заголовки RateLimit-*."""
+        if limit is not None:
+            for header, value in limit.get_headers().items():
+                response[header] = value
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Middleware для сбора метрик производительности запросов.
+
+    Записывает длительность запроса по эндпоинту, количество и время
+    SQL-запросов, объем принятых и отправленных данных, а для медленных
+    запросов (дольше settings.METRICS_SLOW_REQUEST_SECONDS) сохраняет
+    образец с самыми медленными SQL-запросами. Метрики доступны в формате
+    Prometheus по адресу /api/metrics/.
+
+    Стоит первым в settings.MIDDLEWARE, чтобы учитывать полное время
+    обработки, включая проверку API-ключа.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        for connection in connections.all():
+            install_execute_wrapper(connection=connection)
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Обработка входящего запроса.
+
+        Аргументы:
+            request (HttpRequest): Входящий HTTP-запрос.
+
+        Возвращает:
+            HttpResponse: HTTP-ответ.
+        """
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started, token = start_request()
+        response = self.get_response(request)
+        finish_request(request, response, started, token)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Асинхронная версия __call__ для ASGI."""
+        started, token = start_request()
+        response = await self.get_response(request)
+        finish_request(request, response, started, token)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Middleware выбора базы данных для чтения.
+
+    Безопасные запросы к API (GET, HEAD, OPTIONS) читают с реплики, если
+    она настроена. После запроса на запись клиент (API-ключ) в течение
+    settings.DB_READ_AFTER_WRITE_SECONDS читает с основной базы, чтобы
+    видеть свои изменения несмотря на отставание реплики. Отметка записи
+    хранится в кеше; если кеш недоступен, чтение идет с основной базы.
+    Остальные запросы, команды и фоновые задачи работают с основной базой.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Обработка входящего запроса.
+
+        Аргументы:
+            request (HttpRequest): Входящий HTTP-запрос.
+
+        Возвращает:
+            HttpResponse: HTTP-ответ.
+        """
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        use_replica = self.can_read_from_replica(request)
+        token = read_from_replica.set(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        self.mark_write(request)
+        return self.wrap_streaming(response, use_replica)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Асинхронная версия __call__ для ASGI.
+
+        Обращения к кешу синхронные и выполняются в потоке запроса, а не
+        в цикле событий.
+        """
+        use_replica = await sync_to_async(
+            self.can_read_from_replica, thread_sensitive=True
+        )(request)
+        token = read_from_replica.set(use_replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_from_replica.reset(token)
+        await sync_to_async(self.mark_write, thread_sensitive=True)(request)
+        return self.wrap_streaming(response, use_replica)
+
+    @staticmethod
+    def wrap_streaming(
+        response: HttpResponse, use_replica: bool
+    ) -> HttpResponse:
+        """
+        Сохраняет выбор базы на время чтения потокового ответа.
+
+        Тело потокового ответа (выгрузка) читает базу уже после выхода из
+        middleware, поэтому флаг чтения с реплики устанавливается заново
+        на каждый фрагмент.
+
+        Аргументы:
+            response (HttpResponse): HTTP-ответ.
+            use_replica (bool): Читать ли с реплики.
+
+        Возвращает:
+            HttpResponse: Тот же ответ.
+        """
+        if use_replica and response.streaming:
+            response.streaming_content = iter_with_replica(
+                response.streaming_content
+            )
+        return response
+
+    @staticmethod
+    def get_write_key(request: HttpRequest) -> str:
+        """Возвращает ключ кеша отметки записи клиента."""
+        api_key = request.headers.get("X-API-KEY", "")
+        return f"db:write:{get_client_id(api_key)}"
+
+    def can_read_from_replica(self, request: HttpRequest) -> bool:
+        """
+        Проверяет, можно ли читать с реплики в этом запросе.
+
+        Аргументы:
+            request (HttpRequest): Входящий HTTP-запрос.
+
+        Возвращает:
+            bool: True для безопасного запроса к API от клиента без
+            недавней записи.
+        """
+        if request.method not in SAFE_METHODS or not is_api_request(request):
+            return False
+        try:
+            return cache.get(self.get_write_key(request)) is None
+        except Exception:
+            logger.warning("Replica cache is unavailable", exc_info=True)
+            return False
+
+    def mark_write(self, request: HttpRequest) -> None:
+        """Отмечает запрос на запись, закрепляя клиента за основной базой."""
+        if request.method in SAFE_METHODS or not is_api_request(request):
+            return
+        try:
+            cache.set(
+                self.get_write_key(request),
+                True,
+                settings.DB_READ_AFTER_WRITE_SECONDS,
+            )
+        except Exception:
+            logger.warning("Replica cache is unavailable", exc_info=True)
+
+
+def iter_with_replica(content: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Читает фрагменты потокового ответа с разрешенным чтением с реплики.
+
+    Флаг устанавливается и сбрасывается вокруг каждого фрагмента, так как
+    под ASGI фрагменты читаются в разных вызовах sync_to_async.
+
+    Аргументы:
+        content (Iterable[bytes]): Фрагменты тела ответа.
 
-        if not api_key or api_key != settings.API_KEY:
-            return JsonResponse({"detail": "Unauthorized"}, status=401)
-        return self.get_response(request)
+    Возвращает:
+        Iterator[bytes]: Те же фрагменты.
+    """
+    iterator = iter(content)
+    while True:
+        token = read_from_replica.set(True)
+        try:
+            chunk = next(iterator, None)
+        finally:
+            read_from_replica.reset(token)
+        if chunk is None:
+            return
+        yield chunk
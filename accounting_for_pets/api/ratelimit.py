@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_READ = "read"
+ENDPOINT_WRITE = "write"
+ENDPOINT_UPLOAD = "upload"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+UPLOAD_PATH_SUFFIXES = ("/photo/", "/photo", "/photos/", "/photos")
+
+
+@dataclass
+class RateLimitResult:
+    """Результат проверки лимита запросов."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int
+
+    def get_headers(self) -> dict[str, str]:
+        """
+        Возвращает заголовки RateLimit-* (и Retry-After при отказе).
+
+        Возвращает:
+            dict[str, str]: Заголовки ответа.
+        """
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def get_endpoint_class(request: HttpRequest) -> str:
+    """
+    Определяет класс эндпоинта для лимитов: чтение, запись или загрузка.
+
+    Аргументы:
+        request (HttpRequest): Входящий HTTP-запрос.
+
+    Возвращает:
+        str: ENDPOINT_READ, ENDPOINT_WRITE или ENDPOINT_UPLOAD.
+    """
+    if request.method in SAFE_METHODS:
+        return ENDPOINT_READ
+    if is_upload(request.method, request.path_info):
+        return ENDPOINT_UPLOAD
+    return ENDPOINT_WRITE
+
+
+def is_upload(method: str, path: str) -> bool:
+    """
+    Проверяет, является ли запрос загрузкой фото.
+
+    Аргументы:
+        method (str): HTTP-метод.
+        path (str): Путь запроса.
+
+    Возвращает:
+        bool: True для POST на эндпоинты загрузки фото.
+    """
+    return method == "POST" and path.endswith(UPLOAD_PATH_SUFFIXES)
+
+
+def get_client_id(api_key: str) -> str:
+    """Возвращает идентификатор клиента по API-ключу (без самого ключа)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class TokenBucketLimiter:
+    """
+    Лимитер запросов по алгоритму token bucket.
+
+    Состояние корзин хранится в кеше Django, общем для всех воркеров
+    (при общем бэкенде кеша). Если кеш недоступен, используется
+    состояние в памяти процесса. Чтение и запись состояния в кеше не
+    атомарны, поэтому при гонке лимит может быть превышен на несколько
+    запросов - это приемлемо для защиты от перегрузки.
+    """
+
+    def __init__(self) -> None:
+        self._local: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(
+        self, key: str, rate: float, burst: int, now: Optional[float] = None
+    ) -> RateLimitResult:
+        """
+        Списывает один токен из корзины.
+
+        Аргументы:
+            key (str): Ключ корзины.
+            rate (float): Скорость пополнения, токенов в секунду.
+            burst (int): Емкость корзины.
+            now (Optional[float]): Текущее время (для тестов).
+
+        Возвращает:
+            RateLimitResult: Результат проверки.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._load(key)
+            tokens, updated_at = state if state else (float(burst), now)
+            tokens = min(float(burst), tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._store(key, (tokens, now), math.ceil(burst / rate))
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=burst,
+            remaining=int(tokens),
+            reset=math.ceil((burst - tokens) / rate),
+            retry_after=0 if allowed else math.ceil((1 - tokens) / rate),
+        )
+
+    def _load(self, key: str) -> Optional[tuple[float, float]]:
+        try:
+            return cache.get(key)
+        except Exception:
+            logger.warning("Rate limit cache is unavailable", exc_info=True)
+            return self._local.get(key)
+
+    def _store(self, key: str, state: tuple[float, float], ttl: int) -> None:
+        try:
+            cache.set(key, state, ttl)
+        except Exception:
+            self._local[key] = state
+
+
+limiter = TokenBucketLimiter()
+
+# Ограничение одновременных загрузок в процессе; лишние загрузки
+# отклоняются с 503 до чтения тела запроса.
+upload_slots = threading.BoundedSemaphore(settings.API_UPLOAD_CONCURRENCY)
+# Ключ scope ASGI: слот загрузки занят обработчиком еще до чтения тела.
+UPLOAD_SLOT_SCOPE_KEY = "pets.upload_slot"
+
+
+def check_rate_limit(request: HttpRequest, api_key: str) -> RateLimitResult:
+    """
+    Проверяет лимит запросов клиента для класса эндпоинта.
+
+    Аргументы:
+        request (HttpRequest): Входящий HTTP-запрос.
+        api_key (str): Проверенный API-ключ клиента.
+
+    Возвращает:
+        RateLimitResult: Результат проверки.
+    """
+    endpoint_class = get_endpoint_class(request)
+    rate, burst = settings.API_RATE_LIMITS[endpoint_class]
+    key = f"ratelimit:{get_client_id(api_key)}:{endpoint_class}"
+    return limiter.consume(key, rate, burst)
@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, modify_settings, override_settings
+
+# Без этого middleware все запросы читают с основной базы.
+REPLICA_MIDDLEWARE = "api.middleware.ReplicaMiddleware"
+
+
+class APITestCase(TestCase):
+    """
+    Базовый класс тестов API.
+
+    Клиент передает API-ключ, медиафайлы сохраняются во временный
+    каталог, фоновые задачи выполняются сразу, а лимиты запросов
+    отключены. Чтение с реплики включается атрибутом replica_reads.
+    """
+
+    replica_reads = False
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.media_root = Path(tempfile.mkdtemp())
+        cls.media_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            FILE_UPLOAD_TEMP_DIR=cls.media_root / "tmp",
+            BACKGROUND_TASKS_SYNC=True,
+            PHOTO_PROCESSING_WORKERS=0,
+            API_RATE_LIMIT_ENABLED=False,
+        )
+        cls.media_settings.enable()
+        middleware = {}
+        if not cls.replica_reads:
+            middleware["remove"] = REPLICA_MIDDLEWARE
+        cls.middleware_settings = modify_settings(MIDDLEWARE=middleware)
+        cls.middleware_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        cls.middleware_settings.disable()
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self) -> None:
+        self.client = Client(HTTP_X_API_KEY=settings.API_KEY)
+        cache.clear()
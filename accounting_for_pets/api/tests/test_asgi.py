@@ -0,0 +1,148 @@
+import json
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.test import (
+    SimpleTestCase,
+    TransactionTestCase,
+    modify_settings,
+    override_settings,
+)
+
+from accounting_for_pets.asgi import PetsASGIHandler
+from api.ratelimit import upload_slots
+from api.tests.base import REPLICA_MIDDLEWARE
+from pets.models import Pet
+
+
+async def asgi_request(
+    application: PetsASGIHandler, path: str, query: bytes = b""
+) -> tuple[dict, bytes]:
+    """Выполняет GET-запрос к ASGI-приложению, возвращает начало и тело."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query,
+        "headers": [
+            (b"host", b"testserver"),
+            (b"x-api-key", settings.API_KEY.encode()),
+        ],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    communicator = ApplicationCommunicator(application, scope)
+    await communicator.send_input({"type": "http.request"})
+    start = await communicator.receive_output(timeout=10)
+    body = b""
+    while True:
+        message = await communicator.receive_output(timeout=10)
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    await communicator.wait(timeout=10)
+    return start, body
+
+
+@override_settings(API_RATE_LIMIT_ENABLED=True)
+@modify_settings(MIDDLEWARE={"remove": REPLICA_MIDDLEWARE})
+class ASGIExportTests(TransactionTestCase):
+    """
+    Проверка потоковой выгрузки под ASGI-обработчиком.
+
+    Тело потокового ответа читает ORM, поэтому данные должны быть
+    зафиксированы: обработчик выполняет запросы в потоке запроса.
+    """
+
+    def setUp(self) -> None:
+        # Middleware загружается при создании обработчика.
+        self.application = PetsASGIHandler()
+
+    def request(self, path: str, query: bytes = b"") -> tuple[dict, bytes]:
+        return async_to_sync(asgi_request)(self.application, path, query)
+
+    def test_export_ndjson(self) -> None:
+        Pet.objects.bulk_create(
+            Pet(name=f"Rex{index}", age=index % 10, type=Pet.DOG)
+            for index in range(25)
+        )
+        with self.settings(PETS_EXPORT_CHUNK_SIZE=10):
+            start, body = self.request("/api/v1/pets/export/")
+        self.assertEqual(start["status"], 200)
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(
+            {row["name"] for row in rows},
+            {f"Rex{index}" for index in range(25)},
+        )
+
+    def test_rate_limited_list(self) -> None:
+        start, body = self.request("/api/v1/pets/")
+        self.assertEqual(start["status"], 200)
+        self.assertIn(b"RateLimit-Limit", dict(start["headers"]))
+        self.assertEqual(json.loads(body)["count"], 0)
+
+
+@override_settings(API_RATE_LIMIT_ENABLED=True)
+class ASGIUploadTests(SimpleTestCase):
+    """Проверка приема тела запроса ASGI-обработчиком."""
+
+    def setUp(self) -> None:
+        self.application = PetsASGIHandler()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name) / "tmp"
+
+    def test_upload_shed_before_body(self) -> None:
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/pets/photos/",
+            "query_string": b"",
+            "headers": [(b"content-length", b"1000")],
+        }
+        acquired = []
+        while upload_slots.acquire(blocking=False):
+            acquired.append(True)
+        self.addCleanup(lambda: [upload_slots.release() for _ in acquired])
+        communicator = ApplicationCommunicator(self.application, scope)
+
+        async def shed() -> tuple[dict, dict]:
+            # Тело не отправляется: ответ должен прийти без его чтения.
+            start = await communicator.receive_output(timeout=5)
+            body = await communicator.receive_output(timeout=5)
+            await communicator.wait(timeout=5)
+            return start, body
+
+        start, body = async_to_sync(shed)()
+        self.assertEqual(start["status"], 503)
+        self.assertIn((b"retry-after", b"1"), start["headers"])
+        self.assertEqual(
+            json.loads(body["body"]), {"detail": "Too many concurrent uploads"}
+        )
+
+    def test_large_body_spooled_to_disk(self) -> None:
+        chunks = [b"a" * 1000, b"b" * 1000, b"c" * 10]
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": True}
+            for chunk in chunks
+        ]
+        messages[-1]["more_body"] = False
+
+        async def receive() -> dict:
+            return messages.pop(0)
+
+        with self.settings(
+            ASGI_BODY_MAX_MEMORY_SIZE=1500, FILE_UPLOAD_TEMP_DIR=self.temp_dir
+        ):
+            body_file = async_to_sync(self.application.read_body)(receive)
+        self.addCleanup(body_file.close)
+        self.assertTrue(body_file._rolled)
+        self.assertEqual(body_file.read(), b"".join(chunks))
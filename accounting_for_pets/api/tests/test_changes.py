@@ -0,0 +1,89 @@
+import datetime
+import json
+
+from django.utils import timezone
+
+from api.tests.base import APITestCase
+from pets.changes import compact_changes
+
+
+class ChangeFeedTests(APITestCase):
+    """Проверка журнала изменений питомцев."""
+
+    url = "/api/v1/pets/changes/"
+
+    def create_pets(self, *names: str) -> list[str]:
+        ids = []
+        for name in names:
+            response = self.client.post(
+                "/api/v1/pets/", {"name": name, "age": 3, "type": "dog"}
+            )
+            self.assertEqual(response.status_code, 201)
+            ids.append(response.json()["id"])
+        return ids
+
+    def get_changes(self, **params) -> dict:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_next_cursor(self) -> None:
+        start = self.get_changes()
+        self.assertEqual(start, {"items": [], "next": 0, "has_more": False})
+        rex, max_, bim = self.create_pets("Rex", "Max", "Bim")
+
+        page = self.get_changes(since=start["next"], limit=2)
+        self.assertTrue(page["has_more"])
+        self.assertEqual([item["id"] for item in page["items"]], [rex, max_])
+        self.assertEqual(page["next"], page["items"][-1]["seq"])
+        self.assertEqual(page["items"][0]["type"], "pet.created")
+        self.assertEqual(page["items"][0]["data"]["name"], "Rex")
+
+        self.client.delete(
+            "/api/v1/pets/delete/",
+            json.dumps({"ids": [rex]}),
+            content_type="application/json",
+        )
+        page = self.get_changes(since=page["next"], limit=2)
+        self.assertFalse(page["has_more"])
+        self.assertEqual(
+            [(item["type"], item["id"]) for item in page["items"]],
+            [("pet.created", bim), ("pet.deleted", rex)],
+        )
+
+        last = self.get_changes(since=page["next"])
+        self.assertEqual(last["items"], [])
+        self.assertEqual(last["next"], page["next"])
+        self.assertEqual(self.get_changes()["next"], page["next"])
+
+    def test_gone_after_compaction(self) -> None:
+        self.create_pets("Rex", "Max")
+        seq = self.get_changes()["next"]
+        before = timezone.now() + datetime.timedelta(seconds=1)
+        self.assertEqual(compact_changes(before, batch_size=1), (2, seq))
+
+        response = self.client.get(self.url, {"since": 0})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(
+            response.json(),
+            {"error": f"Changes up to {seq} were compacted, reload the list"},
+        )
+        # После полной выгрузки чтение продолжается с номера из ответа без
+        # since, даже когда журнал пуст.
+        self.assertEqual(self.get_changes()["next"], seq)
+        self.create_pets("Bim")
+        page = self.get_changes(since=seq)
+        self.assertEqual(len(page["items"]), 1)
+
+    def test_invalid_since(self) -> None:
+        for params in (
+            {"since": -1},
+            {"since": "x"},
+            {"since": 0, "limit": 0},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json(), {"error": "Invalid since or limit"}
+                )
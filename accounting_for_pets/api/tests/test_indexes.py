@@ -0,0 +1,61 @@
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+
+from api.v1.views import PetViewSet
+from pets.models import Pet
+
+
+class ListIndexTests(TestCase):
+    """
+    Проверка планов запросов фильтров списка.
+
+    В PostgreSQL последовательное чтение запрещается на время теста:
+    на маленькой тестовой таблице оно всегда дешевле индекса.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Pet.objects.bulk_create(
+            Pet(
+                name=f"Rex{index}",
+                age=index % 30,
+                type=Pet.PET_TYPES[index % 2][0],
+                photo_count=index % 3,
+            )
+            for index in range(200)
+        )
+
+    def setUp(self) -> None:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def get_queryset(self, query: str):
+        params = QueryDict(query)
+        view = PetViewSet()
+        queryset = view.filter_has_photos(
+            Pet.objects.all(), params.get("has_photos")
+        )
+        return view.filter_attributes(queryset, params)
+
+    def test_page_uses_partial_and_type_indexes(self) -> None:
+        # Индекс дает и фильтр, и порядок страницы.
+        for query, index in (
+            ("has_photos=true", "pets_pet_with_photos_idx"),
+            ("has_photos=false", "pets_pet_without_photos_idx"),
+            ("type=cat", "pets_pet_type_idx"),
+        ):
+            with self.subTest(query=query):
+                plan = self.get_queryset(query)[:20].explain()
+                self.assertIn(index, plan)
+
+    def test_age_range_uses_age_index(self) -> None:
+        plan = self.get_queryset("age_min=3&age_max=5").order_by().explain()
+        self.assertIn("pets_pet_age_idx", plan)
+
+    def test_name_prefix_uses_pattern_index(self) -> None:
+        if connection.vendor != "postgresql":
+            self.skipTest("SQLite LIKE does not use indexes")
+        plan = self.get_queryset("name_prefix=Rex1").order_by().explain()
+        self.assertIn("pets_pet_name_prefix_idx", plan)
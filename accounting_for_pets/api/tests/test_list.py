@@ -0,0 +1,41 @@
+import random
+
+from django.core.cache import cache
+
+from api.benchmark import seed_pets
+from api.tests.base import APITestCase
+
+
+class ListQueryCountTests(APITestCase):
+    """Количество SQL-запросов списка не зависит от питомцев и фото."""
+
+    def assert_list_queries(self, url: str, expected: int) -> None:
+        rng = random.Random(1)
+        for count, max_photos in ((2, 1), (20, 5), (50, 10)):
+            seed_pets(count, max_photos, rng)
+            cache.clear()
+            with self.subTest(url=url, pets=count):
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_offset_page(self) -> None:
+        # Количество, страница и фото страницы
+        self.assert_list_queries("/api/v1/pets/?limit=20", 3)
+
+    def test_cursor_page_without_count(self) -> None:
+        self.assert_list_queries("/api/v1/pets/?cursor=&count=none", 2)
+
+    def test_has_photos_filter(self) -> None:
+        self.assert_list_queries("/api/v1/pets/?has_photos=true", 3)
+
+    def test_fast_serialization(self) -> None:
+        with self.settings(PETS_FAST_SERIALIZATION=True):
+            self.assert_list_queries("/api/v1/pets/?limit=20", 3)
+
+    def test_cached_page(self) -> None:
+        seed_pets(10, 3, random.Random(2))
+        self.client.get("/api/v1/pets/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/pets/")
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,86 @@
+import time
+from urllib.parse import urlsplit
+
+from django.http import FileResponse
+from django.test import Client, RequestFactory
+
+from accounting_for_pets.metrics import UNMATCHED_ENDPOINT, registry
+from api.middleware import MetricsMiddleware
+from api.tests.base import APITestCase
+from api.tests.test_photos import make_file
+from pets import media
+from pets.models import Pet, Photo
+from pets.storage import photo_storage
+
+
+class ServeMediaTests(APITestCase):
+    """Проверка доступа к фото и способа их отдачи."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        self.content = make_file(1).getvalue()
+        response = self.client.post(
+            f"/api/v1/pets/{pet.id}/photo/", {"file": make_file(1)}
+        )
+        self.assertEqual(response.status_code, 201)
+        url = urlsplit(response.json()["url"])
+        self.signed_url = f"{url.path}?{url.query}"
+        self.name = Photo.objects.get().file.name
+        self.anonymous = Client()
+
+    def test_signed_url_is_passed_to_nginx(self) -> None:
+        response = self.anonymous.get(self.signed_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{self.name}"
+        )
+        self.assertEqual(response.content, b"")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_unsigned_or_expired_url_is_rejected(self) -> None:
+        expired = media.get_signed_query(self.name, int(time.time()) - 1)
+        for url in (
+            f"/media/{self.name}",
+            f"/media/{self.name}?{expired}",
+            f"{self.signed_url}0",
+        ):
+            with self.subTest(url=url):
+                response = self.anonymous.get(url)
+                self.assertEqual(response.status_code, 401)
+
+    def test_api_key_grants_access(self) -> None:
+        response = self.client.get(f"/media/{self.name}")
+        self.assertEqual(response.status_code, 200)
+
+    def test_matching_etag_returns_not_modified(self) -> None:
+        digest = self.name.rsplit("/", 1)[-1].split(".")[0]
+        response = self.anonymous.get(
+            self.signed_url, HTTP_IF_NONE_MATCH=f'"{digest}"'
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_file_served_by_django_without_nginx(self) -> None:
+        with self.settings(MEDIA_ACCEL_REDIRECT=False):
+            response = self.anonymous.get(self.signed_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Accel-Redirect", response)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        response.close()
+
+    def test_metrics_keep_file_for_file_wrapper(self) -> None:
+        # Тестовый клиент сам оборачивает потоковые ответы, поэтому
+        # middleware вызывается напрямую.
+        request = RequestFactory().get(f"/media/{self.name}")
+        path = photo_storage.path(self.name)
+        before = registry.bytes_sent.get(UNMATCHED_ENDPOINT, 0)
+        response = MetricsMiddleware(
+            lambda request: FileResponse(open(path, "rb"))
+        )(request)
+        response.close()
+        self.assertIsNotNone(response.file_to_stream)
+        self.assertEqual(
+            registry.bytes_sent[UNMATCHED_ENDPOINT] - before,
+            len(self.content),
+        )
@@ -0,0 +1,65 @@
+from django.test import Client, override_settings
+
+from api.ratelimit import upload_slots
+from api.tests.base import APITestCase
+from api.tests.test_photos import make_file
+from pets.models import Pet
+
+
+class APIKeyTests(APITestCase):
+    """Проверка API-ключей, в том числе на время ротации."""
+
+    def get_status(self, api_key: str = "") -> int:
+        headers = {"HTTP_X_API_KEY": api_key} if api_key else {}
+        return Client(**headers).get("/api/v1/pets/").status_code
+
+    def test_rotation_accepts_old_and_new_keys(self) -> None:
+        with self.settings(API_KEY="new-key", API_KEYS=["old-key"]):
+            self.assertEqual(self.get_status("new-key"), 200)
+            self.assertEqual(self.get_status("old-key"), 200)
+            self.assertEqual(self.get_status("other-key"), 401)
+            self.assertEqual(self.get_status(), 401)
+
+    def test_retired_key_rejected(self) -> None:
+        with self.settings(API_KEY="new-key", API_KEYS=[]):
+            self.assertEqual(self.get_status("old-key"), 401)
+            self.assertEqual(self.get_status("new-key"), 200)
+
+
+@override_settings(
+    API_RATE_LIMIT_ENABLED=True,
+    API_RATE_LIMITS={"read": (0.5, 2), "write": (10, 20), "upload": (10, 20)},
+)
+class RateLimitTests(APITestCase):
+    """Проверка отказов 429 и 503 с заголовком Retry-After."""
+
+    def test_too_many_requests(self) -> None:
+        for _ in range(2):
+            response = self.client.get("/api/v1/pets/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["RateLimit-Limit"], "2")
+        response = self.client.get("/api/v1/pets/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {"detail": "Too Many Requests"})
+        # Один токен при 0.5 токена в секунду пополняется за 2 секунды.
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertEqual(response["RateLimit-Remaining"], "0")
+
+    def test_too_many_concurrent_uploads(self) -> None:
+        pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        acquired = 0
+        while upload_slots.acquire(blocking=False):
+            acquired += 1
+        try:
+            response = self.client.post(
+                f"/api/v1/pets/{pet.id}/photo/", {"file": make_file(1)}
+            )
+        finally:
+            for _ in range(acquired):
+                upload_slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json(), {"detail": "Too many concurrent uploads"}
+        )
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(pet.photos.exists())
@@ -0,0 +1,35 @@
+from api.tests.base import APITestCase
+from pets.models import Pet
+
+
+class PageLimitTests(APITestCase):
+    """Проверка параметров limit и offset списка питомцев."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Pet.objects.bulk_create(
+            Pet(name="Rex", age=1, type=Pet.DOG) for _ in range(5)
+        )
+
+    def test_invalid_limit_or_offset(self) -> None:
+        for query in (
+            "limit=-1",
+            "limit=0",
+            "limit=x",
+            "offset=-1",
+            "limit=-1&cursor=",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/pets/?{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json(), {"error": "Invalid limit or offset"}
+                )
+
+    def test_limit_is_clamped(self) -> None:
+        with self.settings(PAGINATION_MAX_LIMIT=3):
+            for query in ("limit=1000", "limit=1000&cursor="):
+                with self.subTest(query=query):
+                    response = self.client.get(f"/api/v1/pets/?{query}")
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.json()["items"]), 3)
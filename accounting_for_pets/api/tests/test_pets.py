@@ -0,0 +1,181 @@
+import json
+import uuid
+from unittest import mock
+
+from django.db import DatabaseError
+
+from api.tests.base import APITestCase
+from api.tests.test_photos import make_file
+from pets import stats
+from pets.models import Pet, PetStats, Photo
+
+
+class PetBulkCreateTests(APITestCase):
+    """Проверка пакетного создания питомцев."""
+
+    def bulk_create(self, items: list, query: str = "") -> dict:
+        response = self.client.post(
+            f"/api/v1/pets/bulk/{query}",
+            json.dumps(items),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_partial_failure(self) -> None:
+        items = [
+            {"name": "Rex", "age": 3, "type": "dog"},
+            {"name": "Max", "age": 3, "type": ["dog"]},
+            {"name": "Bim", "age": 4, "type": "dog"},
+            {"name": "Tom", "age": 5, "type": "cat"},
+        ]
+        # Пакеты по одному питомцу: второй пакет (Bim) не сохраняется.
+        with mock.patch(
+            "pets.changes.record_changes",
+            side_effect=[None, DatabaseError("boom"), None],
+        ):
+            data = self.bulk_create(items, "?batch_size=1")
+        self.assertEqual(data["created"], 2)
+        self.assertEqual([item["index"] for item in data["items"]], [0, 3])
+        self.assertEqual([error["index"] for error in data["errors"]], [1, 2])
+        self.assertIn("type", data["errors"][0]["errors"])
+        self.assertEqual(data["errors"][1]["errors"], {"detail": "boom"})
+        self.assertEqual(
+            sorted(Pet.objects.values_list("name", flat=True)), ["Rex", "Tom"]
+        )
+        self.assertEqual(stats.get_stats()["total"], 2)
+
+    def test_invalid_batch_size(self) -> None:
+        response = self.client.post(
+            "/api/v1/pets/bulk/?batch_size=0",
+            json.dumps([{"name": "Rex", "age": 3, "type": "dog"}]),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid batch_size"})
+
+
+class PetDeleteTests(APITestCase):
+    """Проверка пакетного удаления питомцев."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.pets = [
+            Pet.objects.create(name=name, age=3, type=Pet.DOG)
+            for name in ("Rex", "Max", "Bim")
+        ]
+        stats.pets_created(self.pets)
+        response = self.client.post(
+            "/api/v1/pets/photos/",
+            {
+                str(self.pets[0].id): [make_file(1), make_file(2)],
+                str(self.pets[1].id): [make_file(3)],
+            },
+        )
+        self.assertEqual(response.json()["created"], 3)
+
+    def delete(self, ids: list) -> dict:
+        response = self.client.delete(
+            "/api/v1/pets/delete/",
+            json.dumps({"ids": ids}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_delete_pets_with_photos(self) -> None:
+        rex, max_, bim = self.pets
+        missing = str(uuid.uuid4())
+        data = self.delete(
+            [str(rex.id), str(max_.id), str(rex.id), "bad", missing]
+        )
+        self.assertEqual(data["deleted"], 2)
+        self.assertEqual(
+            data["errors"],
+            [
+                {"id": str(rex.id), "error": "Duplicate pet ID"},
+                {"id": "bad", "error": "Invalid pet ID"},
+                {
+                    "id": missing,
+                    "error": "Pet with the matching ID was not found",
+                },
+            ],
+        )
+        self.assertEqual(
+            list(Pet.objects.values_list("id", flat=True)), [bim.id]
+        )
+        self.assertFalse(Photo.objects.exists())
+        self.assertEqual(
+            dict(PetStats.objects.values_list("has_photos", "count")),
+            {False: 1, True: 0},
+        )
+
+    def test_already_deleted_pet_not_found(self) -> None:
+        rex = self.pets[0]
+        self.assertEqual(self.delete([str(rex.id)])["deleted"], 1)
+        data = self.delete([str(rex.id)])
+        self.assertEqual(data["deleted"], 0)
+        self.assertEqual(
+            data["errors"],
+            [
+                {
+                    "id": str(rex.id),
+                    "error": "Pet with the matching ID was not found",
+                }
+            ],
+        )
+
+    def test_no_ids(self) -> None:
+        response = self.client.delete(
+            "/api/v1/pets/delete/",
+            json.dumps({"ids": []}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "No IDs provided"})
+
+
+class PetStatsTests(APITestCase):
+    """Статистика обновляется при создании и удалении питомцев и фото."""
+
+    def get_stats(self) -> dict:
+        response = self.client.get("/api/v1/pets/stats/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_after_create_and_delete(self) -> None:
+        rex = self.client.post(
+            "/api/v1/pets/", {"name": "Rex", "age": 3, "type": "dog"}
+        ).json()
+        self.client.post(
+            "/api/v1/pets/bulk/",
+            json.dumps(
+                [
+                    {"name": "Tom", "age": 3, "type": "cat"},
+                    {"name": "Bim", "age": 5, "type": "dog"},
+                ]
+            ),
+            content_type="application/json",
+        )
+        self.client.post(
+            f"/api/v1/pets/{rex['id']}/photo/", {"file": make_file(1)}
+        )
+        data = self.get_stats()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(data["by_type"], {"dog": 2, "cat": 1})
+        self.assertEqual(data["by_age"]["3"], 2)
+        self.assertEqual(data["by_age"]["5"], 1)
+        self.assertEqual(data["with_photos"], 1)
+        self.assertEqual(data["without_photos"], 2)
+
+        self.client.delete(
+            "/api/v1/pets/delete/",
+            json.dumps({"ids": [rex["id"]]}),
+            content_type="application/json",
+        )
+        data = self.get_stats()
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(data["by_type"], {"dog": 1, "cat": 1})
+        self.assertEqual(data["by_age"]["3"], 1)
+        self.assertEqual(data["with_photos"], 0)
+        self.assertEqual(data["without_photos"], 2)
@@ -0,0 +1,221 @@
+import io
+import os
+import random
+import uuid
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+
+from api.benchmark import make_image
+from api.tests.base import APITestCase
+from pets import stats
+from pets.images import render_photo
+from pets.models import Pet, PetStats, Photo, PhotoBlob
+from pets.storage import photo_storage
+from pets.tasks import process_photos
+
+
+def make_file(seed: int) -> io.BytesIO:
+    """Возвращает JPEG-файл для загрузки в тестах."""
+    file = io.BytesIO(make_image(random.Random(seed), size=64))
+    file.name = f"{seed}.jpg"
+    return file
+
+
+class PhotoProcessingTests(APITestCase):
+    """Проверка фоновой обработки загруженных фото."""
+
+    def test_generation_bumped_once_per_batch(self) -> None:
+        pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        with mock.patch(
+            "pets.tasks.bump_generation"
+        ) as bump, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/pets/photos/",
+                {str(pet.id): [make_file(seed) for seed in range(3)]},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(Photo.objects.exclude(renditions={}).count(), 3)
+        bump.assert_called_once_with()
+
+    def test_shared_file_rendered_once(self) -> None:
+        pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        with mock.patch(
+            "pets.tasks.render_photo", wraps=render_photo
+        ) as render, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/v1/pets/photos/",
+                {str(pet.id): [make_file(1), make_file(1)]},
+            )
+        self.assertEqual(render.call_count, 1)
+        first, second = Photo.objects.order_by("created_at", "id")
+        self.assertEqual(first.renditions, second.renditions)
+        self.assertNotEqual(first.renditions, {})
+
+    def test_regenerate_renders_again(self) -> None:
+        pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/v1/pets/photos/",
+                {str(pet.id): [make_file(1), make_file(1), make_file(2)]},
+            )
+        photo_ids = list(Photo.objects.values_list("id", flat=True))
+        with mock.patch(
+            "pets.tasks.render_photo", wraps=render_photo
+        ) as render:
+            # Копии второй фотографии того же файла переиспользуются, а
+            # собственные копии фотографии готовыми не считаются.
+            process_photos(photo_ids)
+            self.assertEqual(render.call_count, 1)
+            process_photos(photo_ids, regenerate=True)
+            self.assertEqual(render.call_count, 4)
+
+
+class PhotoUploadTests(APITestCase):
+    """Проверка загрузки фото питомца."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.pet = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        stats.pets_created([self.pet])
+        self.url = f"/api/v1/pets/{self.pet.id}/photo/"
+
+    def test_upload_updates_counters(self) -> None:
+        response = self.client.post(self.url, {"file": make_file(1)})
+        self.assertEqual(response.status_code, 201)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.photo_count, 1)
+        self.assertEqual(
+            dict(PetStats.objects.values_list("has_photos", "count")),
+            {False: 0, True: 1},
+        )
+
+    def test_database_error_removes_stored_file(self) -> None:
+        with mock.patch(
+            "pets.changes.record_changes", side_effect=DatabaseError("boom")
+        ):
+            response = self.client.post(self.url, {"file": make_file(1)})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"error": "boom"})
+        self.assertFalse(Photo.objects.exists())
+        self.assertFalse(PhotoBlob.objects.exists())
+        photos_dir = photo_storage.path("photos")
+        self.assertEqual(
+            [files for _, _, files in os.walk(photos_dir) if files], []
+        )
+
+    def test_database_error_keeps_shared_file(self) -> None:
+        self.client.post(self.url, {"file": make_file(1)})
+        blob = PhotoBlob.objects.get()
+        with mock.patch(
+            "pets.changes.record_changes", side_effect=DatabaseError("boom")
+        ):
+            response = self.client.post(self.url, {"file": make_file(1)})
+        self.assertEqual(response.status_code, 503)
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertTrue(photo_storage.exists(blob.name))
+
+
+class BatchUploadTests(APITestCase):
+    """Проверка результатов пакетной загрузки по каждому файлу."""
+
+    def test_results_per_file(self) -> None:
+        rex = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        tom = Pet.objects.create(name="Tom", age=2, type=Pet.CAT)
+        stats.pets_created([rex, tom])
+        text = io.BytesIO(b"not an image")
+        text.name = "notes.txt"
+        large = io.BytesIO(make_image(random.Random(5), size=512))
+        large.name = "large.jpg"
+        missing = str(uuid.uuid4())
+        with self.settings(PHOTO_UPLOAD_MAX_SIZE=2048):
+            response = self.client.post(
+                "/api/v1/pets/photos/",
+                {
+                    str(rex.id): [make_file(1), text, make_file(2)],
+                    str(tom.id): [large, make_file(3)],
+                    "bad": [make_file(4)],
+                    missing: [make_file(5)],
+                },
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["created"], 3)
+        self.assertEqual(
+            [(item["index"], item["pet_id"]) for item in data["items"]],
+            [(0, str(rex.id)), (2, str(rex.id)), (4, str(tom.id))],
+        )
+        self.assertEqual(
+            [
+                (item["index"], item["pet_id"], item["name"], item["error"])
+                for item in data["errors"]
+            ],
+            [
+                (
+                    1,
+                    str(rex.id),
+                    "notes.txt",
+                    "Uploaded file is not a supported image.",
+                ),
+                (3, str(tom.id), "large.jpg", "Photo file is too large."),
+                (5, "bad", "4.jpg", "Invalid pet ID"),
+                (
+                    6,
+                    missing,
+                    "5.jpg",
+                    "Pet with the matching ID was not found",
+                ),
+            ],
+        )
+        self.assertEqual(
+            dict(Pet.objects.values_list("name", "photo_count")),
+            {"Rex": 2, "Tom": 1},
+        )
+        self.assertEqual(Photo.objects.count(), 3)
+
+
+class PhotoCountCheckTests(APITestCase):
+    """Проверка сверки Pet.photo_count командой check_photo_counts."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.rex = Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        self.tom = Pet.objects.create(name="Tom", age=2, type=Pet.CAT)
+        stats.pets_created([self.rex, self.tom])
+        self.client.post(
+            "/api/v1/pets/photos/",
+            {str(self.rex.id): [make_file(1), make_file(2)]},
+        )
+        # Расхождения: у Rex две фото, у Tom фото нет.
+        Pet.objects.filter(id=self.rex.id).update(photo_count=5)
+        Pet.objects.filter(id=self.tom.id).update(photo_count=1)
+        PetStats.objects.update(count=0)
+
+    def check_counts(self, *args: str) -> str:
+        stdout = io.StringIO()
+        call_command("check_photo_counts", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_detects_drift(self) -> None:
+        output = self.check_counts()
+        self.assertIn("Расхождений photo_count: 2", output)
+        self.assertEqual(
+            dict(Pet.objects.values_list("name", "photo_count")),
+            {"Rex": 5, "Tom": 1},
+        )
+
+    def test_fix_repairs_drift(self) -> None:
+        output = self.check_counts("--fix", "--batch-size", "1")
+        self.assertIn("Расхождения исправлены.", output)
+        self.assertEqual(
+            dict(Pet.objects.values_list("name", "photo_count")),
+            {"Rex": 2, "Tom": 0},
+        )
+        self.assertEqual(
+            dict(PetStats.objects.values_list("has_photos", "count")),
+            {False: 1, True: 1},
+        )
+        self.assertIn("Расхождений photo_count: 0", self.check_counts())
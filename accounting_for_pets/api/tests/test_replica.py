@@ -0,0 +1,89 @@
+import json
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import Client, TransactionTestCase
+
+from accounting_for_pets.asgi import PetsASGIHandler
+from api.tests.base import APITestCase
+from api.tests.test_asgi import asgi_request
+from pets.models import Pet
+
+# Тестам нужна отдельная база-реплика, например
+# DB_ENGINE=sqlite3 DB_REPLICA_NAME=replica.sqlite3 python manage.py test
+REPLICA = settings.DATABASES.get("replica", {})
+HAS_REPLICA = bool(REPLICA) and not REPLICA.get("TEST", {}).get("MIRROR")
+SKIP_REASON = "Replica database is not configured"
+# Без реплики тесты пропускаются, но базы проверяются при запуске.
+DATABASES = {"default", "replica"} if HAS_REPLICA else {"default"}
+
+
+@skipUnless(HAS_REPLICA, SKIP_REASON)
+class ReplicaReadTests(APITestCase):
+    """
+    Выбор базы для чтения: в основной базе и в реплике разные питомцы,
+    поэтому по ответу видно, из какой базы он прочитан.
+    """
+
+    databases = DATABASES
+    replica_reads = True
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        Pet.objects.using("replica").create(name="Tom", age=2, type=Pet.CAT)
+
+    def get_names(self, client: Client) -> set[str]:
+        response = client.get("/api/v1/pets/")
+        self.assertEqual(response.status_code, 200)
+        return {item["name"] for item in response.json()["items"]}
+
+    def create_pet(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/pets/",
+                {"name": "Max", "age": 1, "type": Pet.DOG},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_safe_request_reads_from_replica(self) -> None:
+        self.assertEqual(self.get_names(self.client), {"Tom"})
+
+    def test_client_reads_from_primary_after_write(self) -> None:
+        self.create_pet()
+        self.assertEqual(self.get_names(self.client), {"Rex", "Max"})
+
+    def test_replica_page_is_not_cached_after_write(self) -> None:
+        self.create_pet()
+        with self.settings(API_KEYS=["other-key"]):
+            other = Client(HTTP_X_API_KEY="other-key")
+            self.assertEqual(self.get_names(other), {"Tom"})
+        self.assertEqual(self.get_names(self.client), {"Rex", "Max"})
+
+    def test_export_streams_from_replica(self) -> None:
+        response = self.client.get("/api/v1/pets/export/")
+        self.assertEqual(response.status_code, 200)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["name"] for row in rows], ["Tom"])
+
+
+@skipUnless(HAS_REPLICA, SKIP_REASON)
+class ReplicaASGIExportTests(TransactionTestCase):
+    """Потоковая выгрузка под ASGI читает с реплики."""
+
+    databases = DATABASES
+
+    def test_export_streams_from_replica(self) -> None:
+        Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        Pet.objects.using("replica").create(name="Tom", age=2, type=Pet.CAT)
+        start, body = async_to_sync(asgi_request)(
+            PetsASGIHandler(), "/api/v1/pets/export/"
+        )
+        self.assertEqual(start["status"], 200)
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["name"] for row in rows], ["Tom"])
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from api.tests.base import APITestCase
+from pets.models import Pet
+
+# Внутри группы совпадений по началу имени порядок по времени создания
+# совпадает с порядком сходства с "Rex", поэтому ожидаемый порядок один
+# для всех СУБД.
+NAMES = ("Rex", "Rexy", "Rexford", "T-Rex", "Bob")
+
+
+class SearchTests(APITestCase):
+    """Проверка поиска питомцев по имени."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        created_at = timezone.now()
+        for index, name in enumerate(NAMES):
+            pet = Pet.objects.create(name=name, age=1, type=Pet.DOG)
+            Pet.objects.filter(id=pet.id).update(
+                created_at=created_at + timedelta(seconds=index)
+            )
+
+    def search(self, query: str) -> list[str]:
+        response = self.client.get(f"/api/v1/pets/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return [item["name"] for item in response.json()["items"]]
+
+    def test_ranking_order(self) -> None:
+        for search in ("rex", "REX"):
+            with self.subTest(search=search):
+                self.assertEqual(
+                    self.search(f"search={search}"),
+                    ["Rex", "Rexy", "Rexford", "T-Rex"],
+                )
+
+    def test_cursor_pagination_by_rank(self) -> None:
+        names = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(
+                "/api/v1/pets/",
+                {"search": "rex", "limit": 1, "cursor": cursor},
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            names.extend(item["name"] for item in data["items"])
+            cursor = data["next"]
+        self.assertEqual(names, ["Rex", "Rexy", "Rexford", "T-Rex"])
+
+        first = self.client.get(
+            "/api/v1/pets/", {"search": "rex", "limit": 2, "cursor": ""}
+        ).json()
+        page = self.client.get(
+            "/api/v1/pets/",
+            {"search": "rex", "limit": 2, "cursor": first["next"]},
+        ).json()
+        self.assertEqual(
+            [item["name"] for item in page["items"]], ["Rexford", "T-Rex"]
+        )
+        back = self.client.get(
+            "/api/v1/pets/",
+            {"search": "rex", "limit": 2, "cursor": page["previous"]},
+        ).json()
+        self.assertEqual(
+            [item["name"] for item in back["items"]], ["Rex", "Rexy"]
+        )
+
+    def test_cursor_without_rank_rejected(self) -> None:
+        page = self.client.get("/api/v1/pets/?limit=1&cursor=").json()
+        response = self.client.get(
+            "/api/v1/pets/",
+            {"search": "rex", "limit": 1, "cursor": page["next"]},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+    def test_substring_fallback(self) -> None:
+        if connection.vendor == "postgresql":
+            self.skipTest("PostgreSQL matches by trigram similarity")
+        # Подстрока без совпадения начала: все в одной группе по времени.
+        self.assertEqual(
+            self.search("search=ex"), ["Rex", "Rexy", "Rexford", "T-Rex"]
+        )
+
+    def test_trigram_similarity(self) -> None:
+        if connection.vendor != "postgresql":
+            self.skipTest("Trigram similarity requires PostgreSQL")
+        names = self.search("search=rexx")
+        self.assertEqual(names[0], "Rex")
+        self.assertNotIn("Bob", names)
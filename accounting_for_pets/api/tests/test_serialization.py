@@ -0,0 +1,48 @@
+from django.core.cache import cache
+
+from api.tests.base import APITestCase
+from pets.models import Pet, Photo
+
+
+class FastSerializationParityTests(APITestCase):
+    """Быстрая сериализация списка совпадает с PetSerializer."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        Pet.objects.create(name="Rex", age=3, type=Pet.DOG)
+        with_photos = Pet.objects.create(name="Tom", age=2, type=Pet.CAT)
+        Photo.objects.create(pet=with_photos, file="photos/aa/bb/a.jpg")
+        photo = Photo.objects.create(
+            pet=with_photos, file="photos/cc/dd/c.jpg"
+        )
+        photo.renditions = {
+            "160": f"renditions/{photo.id}/160.webp",
+            "640": f"renditions/{photo.id}/640.webp",
+        }
+        photo.save()
+
+    def get_list(self, url: str, fast: bool) -> dict:
+        cache.clear()
+        with self.settings(PETS_FAST_SERIALIZATION=fast):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_same_output_as_serializer(self) -> None:
+        for url in (
+            "/api/v1/pets/",
+            "/api/v1/pets/?cursor=",
+            "/api/v1/pets/?has_photos=true",
+            "/api/v1/pets/?has_photos=false",
+        ):
+            with self.subTest(url=url):
+                expected = self.get_list(url, fast=False)
+                self.assertEqual(self.get_list(url, fast=True), expected)
+
+    def test_photos_and_renditions_are_listed(self) -> None:
+        items = self.get_list("/api/v1/pets/", fast=True)["items"]
+        photos = {item["name"]: item["photos"] for item in items}
+        self.assertEqual(photos["Rex"], [])
+        self.assertEqual(len(photos["Tom"]), 2)
+        renditions = [len(photo["renditions"]) for photo in photos["Tom"]]
+        self.assertEqual(sorted(renditions), [0, 2])
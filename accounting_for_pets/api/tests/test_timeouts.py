@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test import TestCase
+
+from accounting_for_pets.db.timeouts import without_timeouts
+
+
+class WithoutTimeoutsTests(TestCase):
+    """Команды отключают серверные таймауты только на время работы."""
+
+    def get_statement_timeout(self) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('statement_timeout')")
+            return cursor.fetchone()[0]
+
+    def test_timeouts_restored(self) -> None:
+        if connection.vendor != "postgresql":
+            self.skipTest("Server timeouts are PostgreSQL settings")
+        timeout = self.get_statement_timeout()
+        with without_timeouts():
+            self.assertEqual(self.get_statement_timeout(), "0")
+            with without_timeouts():
+                pass
+            self.assertEqual(self.get_statement_timeout(), "0")
+        self.assertEqual(self.get_statement_timeout(), timeout)
@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase
+
+from api.v1.serializers import PetSerializer
+from pets import validators
+
+
+class ValidatePetsParityTests(SimpleTestCase):
+    """Сравнение validate_pets с проверкой PetSerializer."""
+
+    ITEMS = [
+        {"name": "Rex", "age": 5, "type": "dog"},
+        {"name": "  Rex ", "age": " 5", "type": "dog"},
+        {"name": "Rex", "age": "5 ", "type": "dog"},
+        {"name": "Rex", "age": " 5.0 ", "type": "dog"},
+        {"name": "Rex", "age": "5.", "type": "cat"},
+        {"name": "Rex", "age": "+5", "type": "cat"},
+        {"name": "Rex", "age": 5.0, "type": "cat"},
+        {"name": "Rex", "age": 5.5, "type": "cat"},
+        {"name": "Rex", "age": "5.5", "type": "cat"},
+        {"name": "Rex", "age": "abc", "type": "cat"},
+        {"name": "Rex", "age": "", "type": "cat"},
+        {"name": "Rex", "age": True, "type": "cat"},
+        {"name": "Rex", "age": -1, "type": "cat"},
+        {"name": "Rex", "age": 1000, "type": "cat"},
+        {"name": "Rex", "age": None, "type": "cat"},
+        {"name": "Rex1", "age": 1, "type": "cat"},
+        {"name": "   ", "age": 1, "type": "cat"},
+        {"name": "R" * 300, "age": 1, "type": "cat"},
+        {"name": "Rex", "age": 1, "type": "fish"},
+        {"name": "Rex", "age": 1, "type": ["cat"]},
+        {"name": "Rex", "age": 1, "type": {"cat": 1}},
+        {"name": "Rex", "age": 1, "type": 1},
+        {"name": "Rex", "age": 1, "type": ""},
+        {"age": 1},
+    ]
+
+    def test_same_result_as_serializer(self) -> None:
+        valid, errors = validators.validate_pets(self.ITEMS)
+        valid = dict(valid)
+        errors = {error["index"]: error["errors"] for error in errors}
+        for index, item in enumerate(self.ITEMS):
+            with self.subTest(item=item):
+                serializer = PetSerializer(data=item)
+                if serializer.is_valid():
+                    self.assertEqual(
+                        valid.get(index), dict(serializer.validated_data)
+                    )
+                else:
+                    expected = {
+                        field: [str(message) for message in messages]
+                        for field, messages in serializer.errors.items()
+                    }
+                    actual = {
+                        field: [str(message) for message in messages]
+                        for field, messages in errors.get(index, {}).items()
+                    }
+                    self.assertEqual(actual, expected)
+
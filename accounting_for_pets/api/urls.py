@@ -1,7 +1,12 @@
 from django.urls import include, path
 
+from api import views
 from api.v1 import urls as urls_v1
 
 app_name = "api"
 
-urlpatterns = [path("v1/", include(urls_v1))]
+urlpatterns = [
+    path("v1/", include(urls_v1)),
+    path("metrics/", views.metrics, name="metrics"),
+    path("metrics/slow/", views.slow_requests, name="metrics-slow"),
+]
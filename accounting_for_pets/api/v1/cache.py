@@ -0,0 +1,111 @@
+import hashlib
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+
+from accounting_for_pets.db.router import read_from_replica
+from pets.cache import get_generation, get_generation_age
+
+
+def get_page_key(request: Request) -> str:
+    """
+    Возвращает ключ кеша страницы списка питомцев.
+
+    Ключ зависит от поколения данных, хоста (он входит в URL фото) и
+    всех параметров запроса независимо от их порядка.
+
+    Аргументы:
+        request (Request): HTTP запрос.
+
+    Возвращает:
+        str: Ключ кеша.
+    """
+    params = sorted(request.query_params.lists())
+    raw = json.dumps([request.get_host(), params], separators=(",", ":"))
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"pets:list:{get_generation()}:{digest}"
+
+
+def get_cached_page(key: str) -> Optional[tuple[str, dict]]:
+    """
+    Возвращает закешированную страницу.
+
+    Аргументы:
+        key (str): Ключ кеша.
+
+    Возвращает:
+        Optional[tuple[str, dict]]: ETag и данные страницы или None.
+    """
+    return cache.get(key)
+
+
+def can_cache_page() -> bool:
+    """
+    Проверяет, можно ли закешировать страницу, читаемую сейчас.
+
+    Реплика может отставать от основной базы до
+    settings.DB_READ_AFTER_WRITE_SECONDS. Страница, прочитанная с нее
+    в это время после изменения данных, может их не содержать, а под
+    текущим поколением ее получил бы и клиент, сделавший изменение.
+    Поэтому такие страницы не кешируются; проверять нужно до чтения.
+
+    Возвращает:
+        bool: True, если страница читается с основной базы или данные
+        не менялись дольше допустимого отставания реплики.
+    """
+    if not read_from_replica.get():
+        return True
+    return get_generation_age() >= settings.DB_READ_AFTER_WRITE_SECONDS
+
+
+def get_etag(data: dict) -> str:
+    """
+    Возвращает ETag данных страницы.
+
+    Аргументы:
+        data (dict): Данные ответа.
+
+    Возвращает:
+        str: ETag страницы.
+    """
+    body = json.dumps(data, sort_keys=True, default=str)
+    return f'"{hashlib.md5(body.encode()).hexdigest()}"'
+
+
+def set_cached_page(key: str, data: dict) -> str:
+    """
+    Сохраняет страницу в кеш.
+
+    Аргументы:
+        key (str): Ключ кеша.
+        data (dict): Данные ответа.
+
+    Возвращает:
+        str: ETag страницы.
+    """
+    etag = get_etag(data)
+    cache.set(key, (etag, data), settings.PETS_LIST_CACHE_TIMEOUT)
+    return etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверяет, совпадает ли ETag с заголовком If-None-Match.
+
+    Аргументы:
+        request (Request): HTTP запрос.
+        etag (str): ETag страницы.
+
+    Возвращает:
+        bool: True, если у клиента актуальная версия.
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = {
+        value.strip().removeprefix("W/") for value in header.split(",")
+    }
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,164 @@
+import uuid
+from typing import Callable, Iterable, Optional
+
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from pets.models import ChangeEvent, Photo
+
+PET_FIELDS = ("id", "name", "age", "type", "created_at")
+
+
+def encode_photos(
+    pet_ids: Iterable[uuid.UUID], get_file_url: Callable[[str], str]
+) -> dict[uuid.UUID, list[dict]]:
+    """
+    Загружает фото питомцев одним запросом в формате PhotoSerializer.
+
+    Аргументы:
+        pet_ids (Iterable[uuid.UUID]): Идентификаторы питомцев.
+        get_file_url (Callable[[str], str]): Функция построения URL фото
+            по имени файла.
+
+    Возвращает:
+        dict[uuid.UUID, list[dict]]: Представления фото по питомцу.
+    """
+    photos = {}
+    photo_rows = (
+        Photo.objects.filter(pet_id__in=list(pet_ids))
+        .order_by()
+        .values_list("pet_id", "id", "file", "renditions")
+    )
+    for pet_id, photo_id, name, renditions in photo_rows:
+        photos.setdefault(pet_id, []).append(
+            {
+                "id": str(photo_id),
+                "url": get_file_url(name),
+                "renditions": {
+                    width: get_file_url(rendition)
+                    for width, rendition in renditions.items()
+                },
+            }
+        )
+    return photos
+
+
+class PetEncoder:
+    """
+    Кодирует строки values() питомцев в формат PetSerializer.
+
+    Поля заполняются напрямую, без полей DRF на каждое значение; дата
+    создания форматируется тем же DateTimeField (DATETIME_FORMAT и
+    часовой пояс), что и в PetSerializer.
+    """
+
+    def __init__(
+        self, get_file_url: Optional[Callable[[str], str]] = None
+    ) -> None:
+        """
+        Аргументы:
+            get_file_url (Optional[Callable[[str], str]]): Функция
+                построения URL фото по имени файла. Если не передана,
+                фото не кодируются.
+        """
+        self.get_file_url = get_file_url
+        self.format_datetime = serializers.DateTimeField().to_representation
+
+    def encode(self, rows: list[dict]) -> list[dict]:
+        """
+        Кодирует пакет питомцев; фото пакета загружаются одним запросом.
+
+        Аргументы:
+            rows (list[dict]): Строки values() с полями PET_FIELDS.
+
+        Возвращает:
+            list[dict]: Представления питомцев.
+        """
+        photos = None
+        if self.get_file_url is not None and rows:
+            photos = encode_photos(
+                (row["id"] for row in rows), self.get_file_url
+            )
+        return [self.encode_row(row, photos) for row in rows]
+
+    def encode_row(
+        self, row: dict, photos: Optional[dict[uuid.UUID, list[dict]]]
+    ) -> dict:
+        """
+        Кодирует одного питомца.
+
+        Аргументы:
+            row (dict): Строка values() с полями PET_FIELDS.
+            photos (Optional[dict[uuid.UUID, list[dict]]]): Фото по
+                питомцу или None, если фото не кодируются.
+
+        Возвращает:
+            dict: Представление питомца.
+        """
+        item = {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "age": row["age"],
+            "type": row["type"],
+        }
+        if photos is not None:
+            item["photos"] = photos.get(row["id"], [])
+        item["created_at"] = self.format_datetime(row["created_at"])
+        return item
+
+
+class ChangeEncoder:
+    """Кодирует события журнала изменений для ответа API."""
+
+    def __init__(self, get_file_url: Callable[[str], str]) -> None:
+        """
+        Аргументы:
+            get_file_url (Callable[[str], str]): Функция построения URL
+                фото по имени файла.
+        """
+        self.get_file_url = get_file_url
+        self.format_datetime = serializers.DateTimeField().to_representation
+
+    def encode(self, events: list[ChangeEvent]) -> list[dict]:
+        """
+        Кодирует события.
+
+        Аргументы:
+            events (list[ChangeEvent]): События журнала.
+
+        Возвращает:
+            list[dict]: Представления событий; у событий создания в data
+            те же поля, что у PetSerializer (для фото - url).
+        """
+        return [self.encode_event(event) for event in events]
+
+    def encode_event(self, event: ChangeEvent) -> dict:
+        """
+        Кодирует одно событие.
+
+        Аргументы:
+            event (ChangeEvent): Событие журнала.
+
+        Возвращает:
+            dict: Представление события.
+        """
+        data = None
+        if event.kind == ChangeEvent.PET_CREATED:
+            data = {
+                "name": event.data["name"],
+                "age": event.data["age"],
+                "type": event.data["type"],
+                "created_at": self.format_datetime(
+                    parse_datetime(event.data["created_at"])
+                ),
+            }
+        elif event.kind == ChangeEvent.PHOTO_CREATED:
+            data = {"url": self.get_file_url(event.data["file"])}
+        return {
+            "seq": event.seq,
+            "type": event.kind,
+            "id": str(event.object_id),
+            "pet_id": str(event.pet_id),
+            "data": data,
+            "created_at": self.format_datetime(event.created_at),
+        }
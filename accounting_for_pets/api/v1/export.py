@@ -0,0 +1,94 @@
+import csv
+import json
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from django.db.models import QuerySet
+
+from api.v1.encoders import PET_FIELDS, PetEncoder
+
+CSV_PHOTOS_SEPARATOR = " "
+
+
+def iter_pets(
+    queryset: QuerySet,
+    chunk_size: int,
+    get_file_url: Optional[Callable[[str], str]] = None,
+) -> Iterator[dict]:
+    """
+    Построчно выгружает питомцев в формате PetSerializer.
+
+    Питомцы читаются серверным курсором пакетами по chunk_size, фото
+    каждого пакета загружаются одним запросом. В памяти одновременно
+    находится не больше одного пакета.
+
+    Аргументы:
+        queryset (QuerySet): Отфильтрованный queryset объектов Pet.
+        chunk_size (int): Размер пакета.
+        get_file_url (Optional[Callable[[str], str]]): Функция построения
+            URL фото по имени файла. Если не передана, фото не выгружаются.
+
+    Возвращает:
+        Iterator[dict]: Представления питомцев.
+    """
+    encoder = PetEncoder(get_file_url)
+    rows = (
+        queryset.order_by("created_at", "id")
+        .values(*PET_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield from encoder.encode(chunk)
+
+
+def to_ndjson(items: Iterator[dict]) -> Iterator[bytes]:
+    """
+    Кодирует представления питомцев в NDJSON.
+
+    Аргументы:
+        items (Iterator[dict]): Представления питомцев.
+
+    Возвращает:
+        Iterator[bytes]: Строки NDJSON.
+    """
+    for item in items:
+        yield (json.dumps(item, ensure_ascii=False) + "\n").encode()
+
+
+class _Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def to_csv(items: Iterator[dict], with_photos: bool) -> Iterator[bytes]:
+    """
+    Кодирует представления питомцев в CSV.
+
+    URL фото записываются в одну колонку через пробел.
+
+    Аргументы:
+        items (Iterator[dict]): Представления питомцев.
+        with_photos (bool): Добавлять ли колонку photos.
+
+    Возвращает:
+        Iterator[bytes]: Строки CSV.
+    """
+    writer = csv.writer(_Echo())
+    header = list(PET_FIELDS)
+    if with_photos:
+        header.append("photos")
+    yield writer.writerow(header).encode()
+    for item in items:
+        row = [item[field] for field in PET_FIELDS]
+        if with_photos:
+            row.append(
+                CSV_PHOTOS_SEPARATOR.join(
+                    photo["url"] for photo in item["photos"]
+                )
+            )
+        yield writer.writerow(row).encode()
@@ -1,3 +1,7 @@
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
+
+from pets import media
 from pets.models import Photo
 
 
@@ -6,6 +10,39 @@ class PhotoURLMixin:
     Миксин для добавления метода получения полного URL файла (фотографии).
     """
 
+    def get_media_base_url(self) -> str:
+        """
+        Возвращает абсолютный базовый URL медиафайлов.
+
+        URL строится один раз на запрос и сохраняется в контексте
+        сериализатора, который общий для всех вложенных сериализаторов.
+
+        Возвращает:
+            str: Абсолютный URL settings.MEDIA_URL.
+        """
+        base_url = self.context.get("media_base_url")
+        if base_url is None:
+            request = self.context["request"]
+            base_url = request.build_absolute_uri(settings.MEDIA_URL)
+            self.context["media_base_url"] = base_url
+        return base_url
+
+    def get_media_expires(self) -> int:
+        """
+        Возвращает срок действия подписи URL медиафайлов.
+
+        Срок вычисляется один раз на запрос и сохраняется в контексте
+        сериализатора, как и базовый URL.
+
+        Возвращает:
+            int: Время окончания действия подписи (Unix time).
+        """
+        expires = self.context.get("media_expires")
+        if expires is None:
+            expires = media.get_expires()
+            self.context["media_expires"] = expires
+        return expires
+
     def get_url(self, obj: Photo) -> str:
         """
         Возвращает полный URL файла (фотографии).
@@ -16,5 +53,40 @@ class PhotoURLMixin:
         Возвращает:
             str: Полный URL файла (фотографии).
         """
-        request = self.context.get("request")
-        return obj.get_full_url(request) if request else obj.file.url
+        if not self.context.get("request"):
+            return media.get_signed_url(obj.file.name)
+        return self.get_file_url(obj.file.name)
+
+    def get_renditions(self, obj: Photo) -> dict[str, str]:
+        """
+        Возвращает полные URL уменьшенных копий фотографии по ширине.
+
+        Аргументы:
+            obj (Photo): Экземпляр модели Photo.
+
+        Возвращает:
+            dict[str, str]: URL копий; пустой словарь, пока копии
+            не созданы.
+        """
+        if not self.context.get("request"):
+            return {
+                width: media.get_signed_url(name)
+                for width, name in obj.renditions.items()
+            }
+        return {
+            width: self.get_file_url(name)
+            for width, name in obj.renditions.items()
+        }
+
+    def get_file_url(self, name: str) -> str:
+        """
+        Возвращает полный подписанный URL файла по его имени в хранилище.
+
+        Аргументы:
+            name (str): Имя файла в хранилище.
+
+        Возвращает:
+            str: Полный URL файла с параметрами подписи.
+        """
+        query = media.get_signed_query(name, self.get_media_expires())
+        return f"{self.get_media_base_url()}{filepath_to_uri(name)}?{query}"
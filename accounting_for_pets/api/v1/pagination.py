@@ -0,0 +1,257 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+CURSOR_NEXT = "n"
+CURSOR_PREVIOUS = "p"
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+
+class InvalidCursor(ValueError):
+    """Исключение для некорректного или поврежденного курсора."""
+
+
+def encode_cursor(
+    created_at: datetime,
+    pk: uuid.UUID,
+    direction: str,
+    rank: Optional[int] = None,
+) -> str:
+    """
+    Кодирует позицию (created_at, id) в непрозрачный токен курсора.
+
+    Аргументы:
+        created_at (datetime): Дата создания граничной записи.
+        pk (uuid.UUID): Идентификатор граничной записи.
+        direction (str): Направление (CURSOR_NEXT или CURSOR_PREVIOUS).
+        rank (Optional[int]): Ранг граничной записи при сортировке по
+            рангу (например, в поиске).
+
+    Возвращает:
+        str: Токен курсора в формате base64url.
+    """
+    position = [created_at.isoformat(), str(pk), direction]
+    if rank is not None:
+        position.append(rank)
+    payload = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    token: str,
+) -> tuple[datetime, uuid.UUID, str, Optional[int]]:
+    """
+    Декодирует токен курсора.
+
+    Аргументы:
+        token (str): Токен курсора.
+
+    Возвращает:
+        tuple[datetime, uuid.UUID, str, Optional[int]]: Позиция,
+        направление и ранг (None, если курсор без ранга).
+
+    Вызывает:
+        InvalidCursor: Если токен не удается разобрать.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, pk, direction, *rank = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+            raise ValueError(direction)
+        if len(rank) > 1 or (rank and not isinstance(rank[0], int)):
+            raise ValueError(rank)
+        return (
+            datetime.fromisoformat(created_at),
+            uuid.UUID(pk),
+            direction,
+            rank[0] if rank else None,
+        )
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise InvalidCursor(str(error)) from error
+
+
+def keyset_filter(fields: list[str], values: list, reverse: bool) -> Q:
+    """
+    Строит условие "строка после позиции" для сортировки по полям.
+
+    Для полей (a, b) и значений (x, y) это a > x OR (a = x AND b > y),
+    при reverse - то же с "<".
+
+    Аргументы:
+        fields (list[str]): Поля сортировки.
+        values (list): Значения полей граничной записи.
+        reverse (bool): Сравнение в обратном порядке.
+
+    Возвращает:
+        Q: Условие фильтрации.
+    """
+    lookup = "lt" if reverse else "gt"
+    condition = Q()
+    for index, field in enumerate(fields):
+        equal = dict(zip(fields[:index], values[:index]))
+        condition |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+    return condition
+
+
+def paginate_keyset(
+    queryset: QuerySet,
+    limit: int,
+    token: Optional[str],
+    rank: Optional[str] = None,
+) -> tuple[list, Optional[str], Optional[str]]:
+    """
+    Возвращает страницу объектов по ключу (created_at, id).
+
+    В отличие от limit/offset, стоимость запроса не зависит от глубины
+    страницы: база данных сразу переходит к нужной позиции по индексу
+    pets_pet_created_id_idx.
+
+    Аргументы:
+        queryset (QuerySet): Отфильтрованный queryset объектов Pet
+            (в том числе values() с полями ключа).
+        limit (int): Размер страницы.
+        token (Optional[str]): Токен курсора или None для первой страницы.
+        rank (Optional[str]): Имя целочисленной аннотации, по которой
+            объекты сортируются перед (created_at, id), например ранг
+            результата поиска.
+
+    Возвращает:
+        tuple[list, Optional[str], Optional[str]]: Объекты страницы,
+        токены следующей и предыдущей страниц.
+
+    Вызывает:
+        InvalidCursor: Если токен некорректен.
+    """
+    fields = ["created_at", "id"]
+    if rank is not None:
+        fields.insert(0, rank)
+    direction = CURSOR_NEXT
+    if token:
+        created_at, pk, direction, rank_value = decode_cursor(token)
+        if (rank_value is None) != (rank is None):
+            raise InvalidCursor("Cursor does not match the ordering")
+        values = [created_at, pk]
+        if rank is not None:
+            values.insert(0, rank_value)
+        queryset = queryset.filter(
+            keyset_filter(fields, values, direction == CURSOR_PREVIOUS)
+        )
+
+    if direction == CURSOR_NEXT:
+        queryset = queryset.order_by(*fields)
+    else:
+        queryset = queryset.order_by(*[f"-{field}" for field in fields])
+
+    # Одна лишняя запись показывает, есть ли страница дальше.
+    items = list(queryset[: limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == CURSOR_PREVIOUS:
+        items.reverse()
+
+    if not items:
+        return items, None, None
+
+    first, last = get_key(items[0], fields), get_key(items[-1], fields)
+    has_next = has_more if direction == CURSOR_NEXT else True
+    has_previous = bool(token) if direction == CURSOR_NEXT else has_more
+    next_token = (
+        encode_cursor(
+            last["created_at"],
+            last["id"],
+            CURSOR_NEXT,
+            None if rank is None else last[rank],
+        )
+        if has_next
+        else None
+    )
+    previous_token = (
+        encode_cursor(
+            first["created_at"],
+            first["id"],
+            CURSOR_PREVIOUS,
+            None if rank is None else first[rank],
+        )
+        if has_previous
+        else None
+    )
+    return items, next_token, previous_token
+
+
+def get_key(item, fields: list[str]) -> dict:
+    """
+    Возвращает значения полей ключа пагинации объекта или строки values().
+
+    Аргументы:
+        item: Экземпляр модели или словарь из values().
+        fields (list[str]): Поля ключа.
+
+    Возвращает:
+        dict: Значения полей ключа.
+    """
+    if isinstance(item, dict):
+        return {field: item[field] for field in fields}
+    return {field: getattr(item, field) for field in fields}
+
+
+def count_queryset(queryset: QuerySet, mode: str) -> Optional[int]:
+    """
+    Подсчитывает количество объектов в выбранном режиме.
+
+    Аргументы:
+        queryset (QuerySet): Отфильтрованный queryset.
+        mode (str): COUNT_EXACT, COUNT_ESTIMATED или COUNT_NONE.
+
+    Возвращает:
+        Optional[int]: Количество объектов или None для COUNT_NONE.
+    """
+    if mode == COUNT_NONE:
+        return None
+    if mode == COUNT_ESTIMATED:
+        estimate = estimate_count(queryset)
+        if estimate is not None:
+            return estimate
+    return queryset.count()
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Оценивает количество строк по плану запроса PostgreSQL.
+
+    Оценка берется из EXPLAIN и не требует сканирования таблицы.
+    Для небольших результатов (меньше settings.PAGINATION_ESTIMATE_THRESHOLD)
+    точный подсчет дешевле неточной оценки, поэтому возвращается None.
+
+    Аргументы:
+        queryset (QuerySet): Отфильтрованный queryset.
+
+    Возвращает:
+        Optional[int]: Оценка количества строк или None, если оценка
+        недоступна для текущей СУБД.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < settings.PAGINATION_ESTIMATE_THRESHOLD:
+        return None
+    return estimate
@@ -0,0 +1,47 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Парсер потока NDJSON (один JSON-объект на строку).
+
+    Возвращает список объектов, пустые строки пропускаются.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> list:
+        """
+        Разбирает поток NDJSON построчно.
+
+        Аргументы:
+            stream: Поток тела запроса.
+            media_type (str, optional): Тип содержимого.
+            parser_context (dict, optional): Контекст парсера.
+
+        Возвращает:
+            list: Список разобранных объектов.
+
+        Вызывает:
+            ParseError: Если строка не является корректным JSON.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        if stream is None:
+            return items
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as error:
+                raise ParseError(
+                    f"NDJSON parse error on line {number} - {error}"
+                )
+        return items
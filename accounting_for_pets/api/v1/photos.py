@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import serializers
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает пул потоков проверки изображений, создавая его при первом
+    вызове.
+
+    Пул общий для всех запросов процесса, поэтому количество
+    одновременных проверок ограничено settings.PHOTO_BATCH_WORKERS.
+
+    Возвращает:
+        ThreadPoolExecutor: Пул потоков.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PHOTO_BATCH_WORKERS,
+            thread_name_prefix="photo-validation",
+        )
+    return _executor
+
+
+def validate_photo(file: UploadedFile) -> Optional[str]:
+    """
+    Проверяет загруженный файл так же, как поле file PhotoUploadSerializer.
+
+    Аргументы:
+        file (UploadedFile): Загруженный файл.
+
+    Возвращает:
+        Optional[str]: Сообщение об ошибке или None.
+    """
+    try:
+        serializers.ImageField().run_validation(file)
+    except serializers.ValidationError as error:
+        return str(error.detail[0])
+    except ValidationError as error:
+        # Ошибку Pillow поле DRF передает как исключение Django.
+        return error.messages[0]
+    return None
+
+
+def validate_photos(files: list[UploadedFile]) -> list[Optional[str]]:
+    """
+    Проверяет файлы пакета параллельно в пуле потоков.
+
+    Pillow освобождает GIL при декодировании, поэтому проверка
+    нескольких файлов занимает несколько ядер.
+
+    Аргументы:
+        files (list[UploadedFile]): Загруженные файлы.
+
+    Возвращает:
+        list[Optional[str]]: Ошибки проверки в порядке файлов.
+    """
+    if len(files) <= 1:
+        return [validate_photo(file) for file in files]
+    return list(get_executor().map(validate_photo, files))
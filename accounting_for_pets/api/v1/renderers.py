@@ -0,0 +1,35 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamRenderer(BaseRenderer):
+    """
+    Базовый рендерер для потоковых форматов выгрузки.
+
+    Потоковые ответы формируются в представлении и не проходят через
+    рендерер, поэтому он используется только для согласования формата
+    и вывода ошибок.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Сериализует ответ с ошибкой в JSON."""
+        if data is None:
+            return b""
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class NDJSONRenderer(StreamRenderer):
+    """Рендерер формата NDJSON (один JSON-объект на строку)."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(StreamRenderer):
+    """Рендерер формата CSV."""
+
+    media_type = "text/csv"
+    format = "csv"
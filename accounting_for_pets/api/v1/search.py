@@ -0,0 +1,79 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Cast, Upper
+
+SEARCH_RANK = "search_rank"
+SEARCH_MAX_LENGTH = 100
+
+# Ранг результата: точное совпадение имени, совпадение начала имени,
+# похожее имя. Внутри группы похожие имена упорядочены по сходству.
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SIMILAR = 2
+RANK_STEP = 1000
+
+
+def is_postgresql(queryset: QuerySet) -> bool:
+    """Проверяет, выполняется ли queryset в PostgreSQL."""
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def filter_search(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Оставляет питомцев, имя которых совпадает с запросом без учета
+    регистра: по началу имени или (в PostgreSQL) по сходству триграмм.
+
+    В PostgreSQL оба условия обслуживаются индексами по UPPER(name):
+    pets_pet_name_upper_idx (начало имени) и pets_pet_name_trgm_idx
+    (сходство). В других СУБД вместо сходства ищется подстрока.
+
+    Аргументы:
+        queryset (QuerySet): Queryset объектов Pet.
+        query (str): Поисковый запрос.
+
+    Возвращает:
+        QuerySet: Отфильтрованный queryset.
+    """
+    if is_postgresql(queryset):
+        return queryset.annotate(name_upper=Upper("name")).filter(
+            Q(name__istartswith=query)
+            | Q(name_upper__trigram_similar=query.upper())
+        )
+    return queryset.filter(
+        Q(name__istartswith=query) | Q(name__icontains=query)
+    )
+
+
+def rank_search(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Добавляет ранг результата поиска (аннотация SEARCH_RANK) и
+    сортирует по нему: чем меньше ранг, тем лучше совпадение.
+
+    Ранг целочисленный, чтобы по нему работала курсорная пагинация.
+
+    Аргументы:
+        queryset (QuerySet): Queryset, отфильтрованный filter_search.
+        query (str): Поисковый запрос.
+
+    Возвращает:
+        QuerySet: Queryset с рангом, отсортированный по
+        (ранг, created_at, id).
+    """
+    tier = Case(
+        When(name__iexact=query, then=Value(RANK_EXACT)),
+        When(name__istartswith=query, then=Value(RANK_PREFIX)),
+        default=Value(RANK_SIMILAR),
+        output_field=IntegerField(),
+    )
+    rank = tier * Value(RANK_STEP)
+    if is_postgresql(queryset):
+        # Чем выше сходство, тем меньше ранг внутри группы.
+        rank = rank + Cast(
+            (Value(1.0) - TrigramSimilarity(F("name_upper"), query.upper()))
+            * Value(float(RANK_STEP - 1)),
+            IntegerField(),
+        )
+    return queryset.annotate(**{SEARCH_RANK: rank}).order_by(
+        SEARCH_RANK, "created_at", "id"
+    )
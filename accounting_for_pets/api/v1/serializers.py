@@ -1,10 +1,16 @@
-import re
+from collections import Counter
 
-from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
 from rest_framework import serializers
 
+from accounting_for_pets.metrics import observe_stage
 from api.v1.mixins import PhotoURLMixin
+from pets import changes, stats, validators
+from pets.cache import schedule_generation_bump
 from pets.models import Pet, Photo
+from pets.storage import photo_storage
+from pets.tasks import schedule_photo_processing
 
 
 class PhotoSerializer(serializers.ModelSerializer, PhotoURLMixin):
@@ -13,10 +19,11 @@ class PhotoSerializer(serializers.ModelSerializer, PhotoURLMixin):
     """
 
     url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Photo
-        fields = ["id", "url"]
+        fields = ["id", "url", "renditions"]
 
 
 class PetSerializer(serializers.ModelSerializer):
@@ -44,16 +51,9 @@ class PetSerializer(serializers.ModelSerializer):
         Вызывает:
             serializers.ValidationError: Если возраст не в допустимых пределах.
         """
-        if value < settings.PET_AGE_MIN or value > settings.PET_AGE_MAX:
-            raise serializers.ValidationError(
-                {
-                    "age": (
-                        "Возраст питомца должен быть от "
-                        f"{settings.PET_AGE_MIN} до "
-                        f"{settings.PET_AGE_MAX} включительно."
-                    )
-                }
-            )
+        error = validators.validate_age(value)
+        if error is not None:
+            raise serializers.ValidationError(error)
         return value
 
     def validate_name(self, value: str) -> str:
@@ -69,13 +69,55 @@ class PetSerializer(serializers.ModelSerializer):
         Вызывает:
             serializers.ValidationError: Если имя содержит не только буквы.
         """
-        if not re.match(settings.VALID_NAME_REGEX, value):
-            raise serializers.ValidationError(
-                "Имя питомца должно содержать только буквы."
-            )
+        error = validators.validate_name(value)
+        if error is not None:
+            raise serializers.ValidationError(error)
         return value
 
 
+def save_photos(photos: list[Photo]) -> None:
+    """
+    Сохраняет новые фото одним запросом вместе со связанными данными.
+
+    В одной транзакции сохраняются файлы и строки Photo (bulk_create),
+    увеличиваются счетчики фото питомцев и статистика, записываются
+    события журнала изменений; после фиксации планируется создание
+    уменьшенных копий. Строки питомцев блокируются до сохранения файлов,
+    а файлы сохраняются в порядке хеша содержимого, чтобы параллельные
+    загрузки и удаления блокировали строки в одном порядке.
+
+    Аргументы:
+        photos (list[Photo]): Несохраненные фото с загруженными файлами.
+    """
+    photos.sort(key=lambda photo: getattr(photo.file.file, "sha256", ""))
+    counts = Counter(photo.pet_id for photo in photos)
+    try:
+        with transaction.atomic():
+            # Порядок блокировок тот же, что при удалении питомцев: строки
+            # Pet, группы статистики, затем PhotoBlob.
+            list(
+                Pet.objects.select_for_update()
+                .filter(id__in=counts)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            stats.photos_added(counts)
+            with observe_stage("photo_save"):
+                Photo.objects.bulk_create(photos)
+            for pet_id, count in sorted(counts.items()):
+                Pet.objects.filter(id=pet_id).update(
+                    photo_count=F("photo_count") + count
+                )
+            schedule_photo_processing([photo.id for photo in photos])
+            schedule_generation_bump()
+            changes.record_changes(changes.photo_created(photos))
+    except DatabaseError:
+        # Файлы уже перемещены в хранилище, а их строки PhotoBlob
+        # откатились вместе с транзакцией.
+        photo_storage.discard([photo.file.name for photo in photos])
+        raise
+
+
 class PhotoUploadSerializer(serializers.ModelSerializer, PhotoURLMixin):
     """Сериализатор для загрузки фото, включающий URL для фото."""
 
@@ -95,4 +137,6 @@ class PhotoUploadSerializer(serializers.ModelSerializer, PhotoURLMixin):
         Возвращает:
             Photo: Новый экземпляр модели Photo.
         """
-        return Photo.objects.create(**validated_data)
+        photo = Photo(**validated_data)
+        save_photos([photo])
+        return photo
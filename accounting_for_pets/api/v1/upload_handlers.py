@@ -0,0 +1,164 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Сигнатуры поддерживаемых форматов изображений.
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"GIF87a",
+    b"GIF89a",
+    b"BM",
+    b"II*\x00",  # TIFF (little-endian)
+    b"MM\x00*",  # TIFF (big-endian)
+)
+# Запас на заголовки и границы multipart сверх размера файла.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class PhotoTooLarge(APIException):
+    """Исключение для слишком большого файла фотографии."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Photo file is too large."
+    default_code = "photo_too_large"
+
+
+class TooManyPhotos(APIException):
+    """Исключение для пакета со слишком большим количеством файлов."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Too many files in one request."
+    default_code = "too_many_photos"
+
+
+class InvalidPhoto(APIException):
+    """Исключение для файла, который не является изображением."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Uploaded file is not a supported image."
+    default_code = "invalid_photo"
+
+
+def is_image_header(data: bytes) -> bool:
+    """
+    Проверяет, начинаются ли данные с сигнатуры изображения.
+
+    Аргументы:
+        data (bytes): Первые байты файла.
+
+    Возвращает:
+        bool: True, если сигнатура известна.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return True
+    return data.startswith(IMAGE_SIGNATURES)
+
+
+class StreamingImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Загрузчик фотографий, записывающий данные сразу во временный файл.
+
+    Временный файл создается в settings.FILE_UPLOAD_TEMP_DIR на томе
+    медиафайлов, поэтому хранилище перемещает его на место без копирования.
+    Во время записи считается SHA-256 для адресации по содержимому.
+    Тело запроса больше settings.PHOTO_UPLOAD_MAX_SIZE отклоняется до
+    чтения, а файл без сигнатуры изображения - по первому блоку данных.
+    В памяти одновременно находится не больше одного блока.
+    """
+
+    chunk_size = 64 * 1024
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ) -> None:
+        """Отклоняет запрос, если заявленный размер превышает лимит."""
+        if content_length > settings.PHOTO_UPLOAD_MAX_SIZE + MULTIPART_OVERHEAD:
+            raise PhotoTooLarge()
+
+    def new_file(self, *args, **kwargs) -> None:
+        """Создает временный файл и начинает подсчет хеша."""
+        os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        """Проверяет и записывает очередной блок данных файла."""
+        if start == 0 and not is_image_header(raw_data):
+            self.upload_interrupted()
+            raise InvalidPhoto()
+        self.received += len(raw_data)
+        if self.received > settings.PHOTO_UPLOAD_MAX_SIZE:
+            self.upload_interrupted()
+            raise PhotoTooLarge()
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size: int) -> TemporaryUploadedFile:
+        """Возвращает загруженный файл с посчитанным хешем."""
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        return uploaded
+
+
+class BatchImageUploadHandler(StreamingImageUploadHandler):
+    """
+    Загрузчик пакета фотографий в одном multipart-запросе.
+
+    Каждый файл записывается во временный файл так же, как в
+    StreamingImageUploadHandler, но файл без сигнатуры изображения или
+    больше settings.PHOTO_UPLOAD_MAX_SIZE пропускается и попадает в
+    rejected, а остальные файлы пакета загружаются. Тело запроса больше
+    settings.PHOTO_BATCH_MAX_SIZE и пакет больше
+    settings.PHOTO_BATCH_MAX_FILES файлов отклоняются целиком.
+    """
+
+    def __init__(self, request=None) -> None:
+        super().__init__(request)
+        self.index = -1
+        # Пропущенные файлы: порядковый номер, поле, имя файла и ошибка
+        self.rejected: list[dict] = []
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ) -> None:
+        """Отклоняет запрос, если заявленный размер превышает лимит."""
+        if content_length > settings.PHOTO_BATCH_MAX_SIZE + MULTIPART_OVERHEAD:
+            raise PhotoTooLarge()
+
+    def new_file(self, *args, **kwargs) -> None:
+        """Создает временный файл для очередного файла пакета."""
+        self.index += 1
+        if self.index >= settings.PHOTO_BATCH_MAX_FILES:
+            raise TooManyPhotos()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        """Записывает блок данных или пропускает некорректный файл."""
+        try:
+            super().receive_data_chunk(raw_data, start)
+        except (InvalidPhoto, PhotoTooLarge) as error:
+            self.rejected.append(
+                {
+                    "index": self.index,
+                    "field_name": self.field_name,
+                    "name": self.file_name,
+                    "error": str(error.detail),
+                }
+            )
+            raise SkipFile()
+
+    def file_complete(self, file_size: int) -> TemporaryUploadedFile:
+        """Возвращает загруженный файл с его порядковым номером."""
+        uploaded = super().file_complete(file_size)
+        uploaded.index = self.index
+        return uploaded
@@ -1,14 +1,57 @@
-import os
+import uuid
+from collections import Counter
+from typing import Optional, Sequence
 
 from django.conf import settings
-from django.db import transaction
+from django.db import DatabaseError, transaction
+from django.db.models import Prefetch, QuerySet
+from django.http import QueryDict, StreamingHttpResponse
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
-from api.v1.serializers import PetSerializer, PhotoUploadSerializer
-from pets.models import Pet
+from accounting_for_pets.metrics import observe_stage
+from api.v1.cache import (
+    can_cache_page,
+    etag_matches,
+    get_cached_page,
+    get_etag,
+    get_page_key,
+    set_cached_page,
+)
+from api.v1.encoders import PET_FIELDS, ChangeEncoder, PetEncoder
+from api.v1.export import iter_pets, to_csv, to_ndjson
+from api.v1.pagination import (
+    COUNT_MODES,
+    InvalidCursor,
+    count_queryset,
+    paginate_keyset,
+)
+from api.v1.parsers import NDJSONParser
+from api.v1.renderers import CSVRenderer, NDJSONRenderer
+from api.v1.search import (
+    SEARCH_MAX_LENGTH,
+    SEARCH_RANK,
+    filter_search,
+    rank_search,
+)
+from api.v1.photos import validate_photos
+from api.v1.serializers import (
+    PetSerializer,
+    PhotoSerializer,
+    PhotoUploadSerializer,
+    save_photos,
+)
+from api.v1.upload_handlers import (
+    BatchImageUploadHandler,
+    StreamingImageUploadHandler,
+)
+from pets import changes, stats, validators
+from pets.cache import schedule_generation_bump
+from pets.models import Pet, Photo
+from pets.storage import photo_storage
+from pets.tasks import schedule_photo_files_removal
 
 
 class PetViewSet(
@@ -18,6 +61,29 @@ class PetViewSet(
 
     queryset = Pet.objects.all()
 
+    def get_queryset(self) -> QuerySet:
+        """
+        Возвращает queryset питомцев с предзагрузкой фотографий.
+
+        Фотографии всей страницы загружаются одним запросом и только с
+        полями, нужными для сериализации. При быстрой сериализации
+        (settings.PETS_FAST_SERIALIZATION) фото загружает PetEncoder.
+
+        Возвращает:
+            QuerySet: Queryset объектов Pet.
+        """
+        queryset = super().get_queryset()
+        if self.action == "list" and not settings.PETS_FAST_SERIALIZATION:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "photos",
+                    queryset=Photo.objects.only(
+                        "id", "file", "renditions", "pet"
+                    ),
+                )
+            )
+        return queryset
+
     def get_serializer_class(self) -> type:
         """
         Возвращает класс сериализатора в зависимости от действия.
@@ -29,20 +95,133 @@ class PetViewSet(
             return PhotoUploadSerializer
         return PetSerializer
 
+    def filter_has_photos(
+        self, queryset: QuerySet, has_photos: Optional[str]
+    ) -> QuerySet:
+        """
+        Фильтрует питомцев по наличию фото.
+
+        Аргументы:
+            queryset (QuerySet): Queryset объектов Pet.
+            has_photos (Optional[str]): "true", "false" или None.
+
+        Возвращает:
+            QuerySet: Отфильтрованный queryset.
+        """
+        if has_photos is not None:
+            if has_photos.lower() == "true":
+                queryset = queryset.filter(photo_count__gt=0)
+            elif has_photos.lower() == "false":
+                queryset = queryset.filter(photo_count=0)
+        return queryset
+
+    def filter_attributes(
+        self, queryset: QuerySet, params: QueryDict
+    ) -> QuerySet:
+        """
+        Фильтрует питомцев по типу, диапазону возраста и началу имени.
+
+        Каждый фильтр обслуживается своим индексом модели Pet:
+        pets_pet_type_idx, pets_pet_age_idx и pets_pet_name_prefix_idx.
+
+        Аргументы:
+            queryset (QuerySet): Queryset объектов Pet.
+            params (QueryDict): Параметры запроса type, age_min, age_max
+                и name_prefix.
+
+        Возвращает:
+            QuerySet: Отфильтрованный queryset.
+
+        Вызывает:
+            ValueError: Если значение параметра некорректно (текст
+            исключения - сообщение об ошибке для ответа).
+        """
+        pet_type = params.get("type")
+        if pet_type is not None:
+            if pet_type not in dict(Pet.PET_TYPES):
+                raise ValueError("Invalid type")
+            queryset = queryset.filter(type=pet_type)
+
+        try:
+            age_min = params.get("age_min")
+            if age_min is not None:
+                queryset = queryset.filter(age__gte=int(age_min))
+            age_max = params.get("age_max")
+            if age_max is not None:
+                queryset = queryset.filter(age__lte=int(age_max))
+        except ValueError:
+            raise ValueError("Invalid age_min or age_max")
+
+        name_prefix = params.get("name_prefix")
+        if name_prefix:
+            queryset = queryset.filter(name__startswith=name_prefix)
+        return queryset
+
     def list(self, request) -> Response:
         """
         Возвращает список объектов Pet с возможностью фильтрации и пагинации.
 
+        Страницы кешируются по всем параметрам запроса и поколению данных,
+        которое увеличивается при любом изменении питомцев или фото
+        (кроме страниц с реплики сразу после изменения, см.
+        api.v1.cache.can_cache_page).
+        Ответ содержит ETag; при совпадении с If-None-Match возвращается
+        304 Not Modified.
+
         Аргументы:
             request (Request): HTTP запрос.
 
         Возвращает:
             Response: HTTP ответ с данными списка объектов.
         """
+        page_key = get_page_key(request)
+        cached = get_cached_page(page_key)
+        if cached is None:
+            cacheable = can_cache_page()
+            response = self.get_page(request)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            if cacheable:
+                etag = set_cached_page(page_key, response.data)
+            else:
+                etag = get_etag(response.data)
+        else:
+            etag, data = cached
+            response = Response(data)
+
+        if etag_matches(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        response["ETag"] = etag
+        return response
+
+    def get_page(self, request) -> Response:
+        """
+        Формирует страницу списка объектов Pet.
+
+        Поддерживает два режима пагинации: limit/offset (по умолчанию) и
+        курсорный по ключу (created_at, id), который включается параметром
+        cursor (пустое значение - первая страница). Размер страницы limit
+        ограничен settings.PAGINATION_MAX_LIMIT. Параметр count
+        управляет подсчетом общего количества: exact, estimated или none.
+        Параметр search ищет по имени; результаты упорядочены по рангу
+        совпадения (см. api.v1.search).
+
+        Аргументы:
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Response: HTTP ответ с данными страницы.
+        """
         queryset = self.get_queryset()
 
         limit = request.query_params.get("limit", settings.PAGINATION_LIMIT)
         offset = request.query_params.get("offset", settings.PAGINATION_OFFSET)
+        cursor = request.query_params.get("cursor")
+        count_mode = request.query_params.get(
+            "count", settings.PAGINATION_COUNT_DEFAULT
+        )
         has_photos = request.query_params.get(
             "has_photos", settings.HAS_PHOTOS_DEFAULT
         )
@@ -51,25 +230,98 @@ class PetViewSet(
             limit = int(limit)
             offset = int(offset)
         except ValueError:
+            limit = offset = -1
+        if limit < 1 or offset < 0:
             return Response(
                 {"error": "Invalid limit or offset"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        limit = min(limit, settings.PAGINATION_MAX_LIMIT)
 
-        if has_photos is not None:
-            if has_photos.lower() == "true":
-                queryset = queryset.filter(photos__isnull=False).distinct()
-            elif has_photos.lower() == "false":
-                queryset = queryset.filter(photos__isnull=True)
+        if count_mode not in COUNT_MODES:
+            return Response(
+                {"error": "Invalid count"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        total_count = queryset.count()
-        queryset = queryset[offset : offset + limit]
+        queryset = self.filter_has_photos(queryset, has_photos)
+        try:
+            queryset = self.filter_attributes(queryset, request.query_params)
+        except ValueError as error:
+            return Response(
+                {"error": str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-        serializer = self.get_serializer(
-            queryset, many=True, context={"request": request}
+        search = request.query_params.get("search", "").strip()
+        if len(search) > SEARCH_MAX_LENGTH:
+            return Response(
+                {"error": "Invalid search"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if search:
+            queryset = filter_search(queryset, search)
+
+        total_count = count_queryset(queryset, count_mode)
+
+        if search:
+            queryset = rank_search(queryset, search)
+        if settings.PETS_FAST_SERIALIZATION:
+            fields = PET_FIELDS + ((SEARCH_RANK,) if search else ())
+            queryset = queryset.values(*fields)
+
+        if cursor is not None:
+            try:
+                items, next_cursor, previous_cursor = paginate_keyset(
+                    queryset, limit, cursor, SEARCH_RANK if search else None
+                )
+            except InvalidCursor:
+                return Response(
+                    {"error": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "count": total_count,
+                    "items": self.serialize_items(items, request),
+                    "next": next_cursor,
+                    "previous": previous_cursor,
+                }
+            )
+
+        items = list(queryset[offset : offset + limit])
+
+        return Response(
+            {
+                "count": total_count,
+                "items": self.serialize_items(items, request),
+            }
         )
 
-        return Response({"count": total_count, "items": serializer.data})
+    def serialize_items(self, items: Sequence, request) -> Sequence[dict]:
+        """
+        Сериализует питомцев страницы списка.
+
+        При settings.PETS_FAST_SERIALIZATION строки values() кодируются
+        PetEncoder напрямую, без полей DRF; результат совпадает с
+        PetSerializer.
+
+        Аргументы:
+            items (Sequence): Объекты Pet или строки values() страницы.
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Sequence[dict]: Представления питомцев.
+        """
+        with observe_stage("serialize"):
+            if settings.PETS_FAST_SERIALIZATION:
+                get_file_url = PhotoSerializer(
+                    context={"request": request}
+                ).get_file_url
+                return PetEncoder(get_file_url).encode(items)
+            serializer = self.get_serializer(
+                items, many=True, context={"request": request}
+            )
+            return serializer.data
 
     def create(self, request) -> Response:
         """
@@ -87,16 +339,250 @@ class PetViewSet(
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
-        pet = Pet.objects.get(id=serializer.data["id"])
-        full_serializer = self.get_serializer(
-            pet, context={"request": request}
-        )
         return Response(
-            full_serializer.data,
+            serializer.data,
             status=status.HTTP_201_CREATED,
             headers=headers,
         )
 
+    def perform_create(self, serializer: PetSerializer) -> None:
+        """
+        Сохраняет новый объект Pet.
+
+        У только что созданного питомца нет фото, поэтому кеш связанных
+        фото заполняется сразу, без дополнительного запроса к БД.
+
+        Аргументы:
+            serializer (PetSerializer): Проверенный сериализатор.
+        """
+        with transaction.atomic():
+            pet = serializer.save()
+            stats.pets_created([pet])
+            changes.record_changes(changes.pet_created([pet]))
+        pet._prefetched_objects_cache = {"photos": Photo.objects.none()}
+        schedule_generation_bump()
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, NDJSONParser],
+        url_path="bulk",
+    )
+    def bulk_create(self, request) -> Response:
+        """
+        Создает объекты Pet пакетно из JSON-массива или потока NDJSON.
+
+        Каждый элемент проверяется по тем же правилам, что и при создании
+        одного питомца, одним проходом validate_pets без сериализатора
+        на каждый элемент. Корректные элементы вставляются через bulk_create
+        пакетами по batch_size, ошибки возвращаются по индексу элемента.
+
+        Аргументы:
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Response: HTTP ответ с результатами по каждому элементу.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a non-empty list of pets"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.PETS_BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {
+                    "error": (
+                        "Too many pets, maximum is "
+                        f"{settings.PETS_BULK_CREATE_MAX_ITEMS}"
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            batch_size = int(
+                request.query_params.get(
+                    "batch_size", settings.PETS_BULK_CREATE_BATCH_SIZE
+                )
+            )
+        except ValueError:
+            batch_size = 0
+        if not 0 < batch_size <= settings.PETS_BULK_CREATE_MAX_BATCH_SIZE:
+            return Response(
+                {"error": "Invalid batch_size"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        valid, errors = validators.validate_pets(items)
+        pets = [Pet(**data) for _, data in valid]
+        indexes = [index for index, _ in valid]
+
+        created = []
+        for start in range(0, len(pets), batch_size):
+            batch = pets[start : start + batch_size]
+            batch_indexes = indexes[start : start + batch_size]
+            try:
+                with transaction.atomic():
+                    Pet.objects.bulk_create(batch)
+                    stats.pets_created(batch)
+                    changes.record_changes(changes.pet_created(batch))
+            except DatabaseError as error:
+                errors.extend(
+                    {"index": index, "errors": {"detail": str(error)}}
+                    for index in batch_indexes
+                )
+                continue
+            created.extend(
+                {"index": index, "id": pet.id}
+                for index, pet in zip(batch_indexes, batch)
+            )
+        if created:
+            schedule_generation_bump()
+
+        errors.sort(key=lambda error: error["index"])
+        return Response(
+            {"created": len(created), "items": created, "errors": errors},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+        url_path="export",
+    )
+    def export(self, request) -> StreamingHttpResponse:
+        """
+        Потоково выгружает всех питомцев в формате NDJSON или CSV.
+
+        Формат выбирается заголовком Accept или параметром format
+        (ndjson по умолчанию). Поддерживаются фильтры списка (has_photos,
+        type, age_min, age_max, name_prefix) и photos=true (добавить URL
+        фото). Память не зависит от размера
+        таблицы: строки читаются серверным курсором пакетами.
+
+        Аргументы:
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            StreamingHttpResponse: Потоковый HTTP ответ.
+        """
+        queryset = self.filter_has_photos(
+            Pet.objects.all(),
+            request.query_params.get(
+                "has_photos", settings.HAS_PHOTOS_DEFAULT
+            ),
+        )
+        try:
+            queryset = self.filter_attributes(queryset, request.query_params)
+        except ValueError as error:
+            return Response(
+                {"error": str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        with_photos = request.query_params.get("photos", "").lower() == "true"
+        get_file_url = None
+        if with_photos:
+            get_file_url = PhotoSerializer(
+                context={"request": request}
+            ).get_file_url
+        items = iter_pets(
+            queryset, settings.PETS_EXPORT_CHUNK_SIZE, get_file_url
+        )
+
+        renderer = request.accepted_renderer
+        if renderer.format == CSVRenderer.format:
+            content = to_csv(items, with_photos)
+        else:
+            content = to_ndjson(items)
+        response = StreamingHttpResponse(
+            content, content_type=f"{renderer.media_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="pets.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"], url_path="stats")
+    def list_stats(self, request) -> Response:
+        """
+        Возвращает статистику питомцев: количество по типам, по возрасту
+        и с фото/без фото.
+
+        Статистика читается из таблицы PetStats, которая обновляется при
+        каждом изменении, поэтому запрос не подсчитывает питомцев.
+
+        Аргументы:
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Response: HTTP ответ со статистикой.
+        """
+        return Response(stats.get_stats())
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def list_changes(self, request) -> Response:
+        """
+        Возвращает изменения питомцев и фото после номера since.
+
+        Клиент запоминает "next" из ответа и передает его как since в
+        следующем запросе, пока "has_more" истинно. Без since возвращается
+        только номер последнего события - с него можно начать чтение
+        после полной выгрузки списка. Если события после since уже
+        удалены (compact_changes), возвращается 410 Gone.
+
+        Аргументы:
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Response: HTTP ответ с событиями.
+        """
+        since = request.query_params.get("since")
+        if since is None:
+            return Response(
+                {
+                    "items": [],
+                    "next": changes.get_last_seq(),
+                    "has_more": False,
+                }
+            )
+        try:
+            since = int(since)
+            limit = int(
+                request.query_params.get("limit", settings.PETS_CHANGES_LIMIT)
+            )
+        except ValueError:
+            since = limit = -1
+        if since < 0 or not 0 < limit <= settings.PETS_CHANGES_MAX_LIMIT:
+            return Response(
+                {"error": "Invalid since or limit"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        compacted = changes.get_compacted_seq()
+        if since < compacted:
+            return Response(
+                {
+                    "error": (
+                        f"Changes up to {compacted} were compacted, "
+                        "reload the list"
+                    )
+                },
+                status=status.HTTP_410_GONE,
+            )
+
+        events, has_more = changes.get_changes(since, limit)
+        get_file_url = PhotoSerializer(
+            context={"request": request}
+        ).get_file_url
+        return Response(
+            {
+                "items": ChangeEncoder(get_file_url).encode(events),
+                "next": events[-1].seq if events else since,
+                "has_more": has_more,
+            }
+        )
+
     @action(
         detail=True,
         methods=["post"],
@@ -114,12 +600,23 @@ class PetViewSet(
         Возвращает:
             Response: HTTP ответ с данными загруженного фото.
         """
+        # Файл пишется во временный файл по мере чтения, без буферизации
+        # в памяти; должно быть установлено до первого обращения к данным.
+        request._request.upload_handlers = [
+            StreamingImageUploadHandler(request._request)
+        ]
         pet = self.get_object()
         serializer = self.get_serializer(
             data=request.data, context={"request": request}
         )
         if serializer.is_valid():
-            photo = serializer.save(pet=pet)
+            try:
+                photo = serializer.save(pet=pet)
+            except DatabaseError as error:
+                return Response(
+                    {"error": str(error)},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
             return Response(
                 {"id": photo.id, "url": photo.get_full_url(request)},
                 status=status.HTTP_201_CREATED,
@@ -129,25 +626,162 @@ class PetViewSet(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
 
-    def destroy_photos(self, pet: Pet) -> None:
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[MultiPartParser],
+        url_path="photos",
+    )
+    def upload_photos(self, request) -> Response:
         """
-        Удаляет все фото, связанные с объектом Pet.
+        Загружает пакет фото одного или нескольких питомцев.
+
+        Каждая часть multipart-запроса - файл, имя поля - идентификатор
+        питомца (поле повторяется для нескольких фото). Файлы проверяются
+        параллельно, строки Photo вставляются одним запросом в одной
+        транзакции; ошибки возвращаются по каждому файлу.
 
         Аргументы:
-            pet (Pet): Экземпляр модели Pet.
+            request (Request): HTTP запрос.
+
+        Возвращает:
+            Response: HTTP ответ с результатами по каждому файлу.
         """
-        photos = pet.photos.all()
-        for photo in photos:
-            file_path = photo.file.path
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            photo.delete()
+        handler = BatchImageUploadHandler(request._request)
+        request._request.upload_handlers = [handler]
+        uploads = sorted(
+            (
+                (file, field_name)
+                for field_name, files in request.FILES.lists()
+                for file in files
+            ),
+            key=lambda upload: upload[0].index,
+        )
+        errors = [
+            {
+                "index": rejected["index"],
+                "pet_id": rejected["field_name"],
+                "name": rejected["name"],
+                "error": rejected["error"],
+            }
+            for rejected in handler.rejected
+        ]
+        if not uploads and not errors:
+            return Response(
+                {"error": "No files provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        pet_ids = {}
+        for field_name in {field_name for _, field_name in uploads}:
+            try:
+                pet_ids[field_name] = uuid.UUID(field_name)
+            except ValueError:
+                continue
+        found = set(
+            Pet.objects.filter(id__in=pet_ids.values()).values_list(
+                "id", flat=True
+            )
+        )
+        photo_errors = validate_photos([file for file, _ in uploads])
+
+        photos = []
+        for (file, field_name), error in zip(uploads, photo_errors):
+            if field_name not in pet_ids:
+                error = "Invalid pet ID"
+            elif pet_ids[field_name] not in found:
+                error = "Pet with the matching ID was not found"
+            if error is not None:
+                errors.append(
+                    {
+                        "index": file.index,
+                        "pet_id": field_name,
+                        "name": file.name,
+                        "error": error,
+                    }
+                )
+                continue
+            photo = Photo(pet_id=pet_ids[field_name], file=file)
+            photo.index = file.index
+            photos.append(photo)
+
+        items = []
+        if photos:
+            try:
+                save_photos(photos)
+            except DatabaseError as error:
+                errors.extend(
+                    {
+                        "index": photo.index,
+                        "pet_id": str(photo.pet_id),
+                        "name": photo.file.name,
+                        "error": str(error),
+                    }
+                    for photo in photos
+                )
+            else:
+                items = sorted(
+                    (
+                        {
+                            "index": photo.index,
+                            "pet_id": str(photo.pet_id),
+                            "id": photo.id,
+                            "url": photo.get_full_url(request),
+                        }
+                        for photo in photos
+                    ),
+                    key=lambda item: item["index"],
+                )
+
+        errors.sort(key=lambda error: error["index"])
+        return Response(
+            {"created": len(items), "items": items, "errors": errors},
+            status=status.HTTP_200_OK,
+        )
+
+    def destroy_photos(
+        self, pet_ids: Sequence[uuid.UUID]
+    ) -> Sequence[tuple[uuid.UUID, uuid.UUID]]:
+        """
+        Удаляет все фото, связанные с объектами Pet.
+
+        Строки Photo удаляются одним запросом, а файлы, на которые
+        больше нет ссылок, - после фиксации транзакции в фоновом потоке.
+
+        Аргументы:
+            pet_ids (Sequence[uuid.UUID]): Идентификаторы объектов Pet.
+
+        Возвращает:
+            Sequence[tuple[uuid.UUID, uuid.UUID]]: Пары (id фото,
+            id питомца) удаленных фото.
+        """
+        photos = Photo.objects.filter(pet_id__in=pet_ids)
+        deleted = []
+        references = Counter()
+        files = {}
+        for photo_id, pet_id, name, renditions in photos.values_list(
+            "id", "pet_id", "file", "renditions"
+        ):
+            deleted.append((photo_id, pet_id))
+            references[name] += 1
+            files.setdefault(name, set()).update(renditions.values())
+        photos.delete()
+        photo_storage.release(references)
+        schedule_photo_files_removal(
+            {name: sorted(renditions) for name, renditions in files.items()}
+        )
+        return deleted
 
     @action(detail=False, methods=["delete"])
     def delete(self, request) -> Response:
         """
         Удаляет объекты Pet по списку идентификаторов.
 
+        Существующие питомцы находятся и блокируются одним запросом, а
+        затем вместе с их фото удаляются несколькими запросами в той же
+        транзакции. Питомцы, удаленные параллельным запросом до
+        блокировки, считаются не найденными.
+
         Аргументы:
             request (Request): HTTP запрос.
 
@@ -161,25 +795,56 @@ class PetViewSet(
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        deleted_count = 0
         errors = []
-
+        requested = {}
         for pet_id in ids:
             try:
-                pet = Pet.objects.get(id=pet_id)
+                pk = uuid.UUID(str(pet_id))
+            except ValueError:
+                errors.append({"id": pet_id, "error": "Invalid pet ID"})
+                continue
+            if pk in requested:
+                errors.append({"id": pet_id, "error": "Duplicate pet ID"})
+                continue
+            requested[pk] = pet_id
+
+        deleted_count = 0
+        if requested:
+            try:
                 with transaction.atomic():
-                    self.destroy_photos(pet)
-                    pet.delete()
-                deleted_count += 1
-            except Pet.DoesNotExist:
-                errors.append(
+                    # Строки Pet блокируются первыми, как при загрузке фото
+                    # (см. save_photos).
+                    found = list(
+                        Pet.objects.select_for_update()
+                        .filter(id__in=requested)
+                        .order_by("id")
+                        .values_list("id", flat=True)
+                    )
+                    if found:
+                        stats.pets_deleted(found)
+                        photos = self.destroy_photos(found)
+                        Pet.objects.filter(id__in=found).only("id").delete()
+                        schedule_generation_bump()
+                        changes.record_changes(
+                            changes.photo_deleted(photos)
+                            + changes.pet_deleted(found)
+                        )
+            except DatabaseError as error:
+                errors.extend(
+                    {"id": pet_id, "error": str(error)}
+                    for pet_id in requested.values()
+                )
+            else:
+                found_set = set(found)
+                errors.extend(
                     {
                         "id": pet_id,
                         "error": "Pet with the matching ID was not found",
                     }
+                    for pk, pet_id in requested.items()
+                    if pk not in found_set
                 )
-            except Exception as error:
-                errors.append({"id": pet_id, "error": str(error)})
+                deleted_count = len(found)
 
         return Response(
             {"deleted": deleted_count, "errors": errors},
@@ -0,0 +1,118 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotModified,
+    JsonResponse,
+)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_GET, require_safe
+
+from accounting_for_pets.metrics import registry
+from pets.storage import photo_storage
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Отдает метрики процесса в текстовом формате Prometheus.
+
+    Аргументы:
+        request (HttpRequest): HTTP запрос.
+
+    Возвращает:
+        HttpResponse: Метрики в формате Prometheus.
+    """
+    return HttpResponse(
+        registry.render(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@require_GET
+def slow_requests(request: HttpRequest) -> JsonResponse:
+    """
+    Отдает образцы последних медленных запросов с их SQL-запросами.
+
+    Аргументы:
+        request (HttpRequest): HTTP запрос.
+
+    Возвращает:
+        JsonResponse: Список образцов, начиная с последнего.
+    """
+    return JsonResponse({"items": registry.get_slow_samples()})
+
+
+@require_safe
+def serve_media(request: HttpRequest, name: str) -> HttpResponse:
+    """
+    Отдает файл фото или его уменьшенной копии.
+
+    Доступ (API-ключ или подписанный URL) проверяется в APIKeyMiddleware.
+    С settings.MEDIA_ACCEL_REDIRECT файл передает nginx через
+    X-Accel-Redirect (вместе с Last-Modified и Range), а Django не читает
+    диск; запрос с совпавшим ETag (хеш содержимого) сразу получает 304.
+    Иначе файл отдает Django.
+
+    Аргументы:
+        request (HttpRequest): HTTP запрос.
+        name (str): Имя файла в хранилище.
+
+    Возвращает:
+        HttpResponse: Ответ с X-Accel-Redirect, файл или 304 Not Modified.
+
+    Вызывает:
+        Http404: Если файл вне каталогов фото или не найден.
+    """
+    if not name.startswith(
+        (f"{photo_storage.prefix}/", f"{settings.PHOTO_RENDITIONS_DIR}/")
+    ):
+        raise Http404
+    try:
+        path = photo_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404
+    digest = photo_storage.get_digest(name)
+    etag = f'"{digest}"' if digest else None
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        if etag and etag in parse_etags(
+            request.META.get("HTTP_IF_NONE_MATCH", "")
+        ):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+        else:
+            response = HttpResponse()
+            # Тип содержимого nginx определит по расширению файла.
+            del response["Content-Type"]
+            response["X-Accel-Redirect"] = (
+                settings.MEDIA_ACCEL_REDIRECT_PREFIX + filepath_to_uri(name)
+            )
+    else:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise Http404
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(stat.st_mtime)
+        )
+        if response is None:
+            response = FileResponse(open(path, "rb"))
+        if etag:
+            response["ETag"] = etag
+        response["Last-Modified"] = http_date(stat.st_mtime)
+
+    # Общие кеши не используются, чтобы не обходить проверку доступа.
+    patch_cache_control(response, private=True, max_age=settings.MEDIA_URL_TTL)
+    if digest:
+        # Файлы с хешем в имени не меняются.
+        patch_cache_control(response, immutable=True)
+    return response
@@ -0,0 +1,29 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Режим сервера: "wsgi" (синхронные воркеры) или "asgi" (воркеры uvicorn,
+# тысячи одновременных соединений на процесс).
+SERVER_MODE = os.getenv("SERVER_MODE") or "wsgi"
+
+# Кеш страниц списка, лимиты запросов и отметки чтения после записи должны
+# быть общими для воркеров: с локальным кешем процесса запускается один.
+LOCAL_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+SHARED_CACHE = os.getenv("CACHE_BACKEND", "") not in ("", LOCAL_CACHE_BACKEND)
+
+bind = os.getenv("GUNICORN_BIND") or "0.0.0.0:8000"
+workers = int(os.getenv("GUNICORN_WORKERS") or (2 if SHARED_CACHE else 1))
+
+if workers > 1 and not SHARED_CACHE:
+    raise RuntimeError(
+        "GUNICORN_WORKERS > 1 requires a shared cache: set CACHE_BACKEND "
+        "(for example, to memcached)."
+    )
+
+if SERVER_MODE == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
+    wsgi_app = "accounting_for_pets.asgi:application"
+else:
+    wsgi_app = "accounting_for_pets.wsgi:application"
@@ -0,0 +1,64 @@
+import math
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = "pets:generation"
+GENERATION_CHANGED_KEY = "pets:generation:changed"
+
+
+def get_generation() -> int:
+    """
+    Возвращает текущее поколение данных о питомцах.
+
+    Поколение входит в ключи кеша ответов: после его увеличения старые
+    записи кеша больше не используются.
+
+    Возвращает:
+        int: Номер поколения.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(GENERATION_KEY, generation, timeout=None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def get_generation_age() -> float:
+    """
+    Возвращает время с последнего увеличения поколения.
+
+    Возвращает:
+        float: Количество секунд или бесконечность, если время
+        неизвестно.
+    """
+    changed = cache.get(GENERATION_CHANGED_KEY)
+    return math.inf if changed is None else time.time() - changed
+
+
+def bump_generation() -> None:
+    """
+    Увеличивает поколение данных о питомцах.
+
+    Если счетчик вытеснен из кеша, он создается заново от текущего
+    времени, чтобы не совпасть с одним из прошлых поколений. Время
+    изменения записывается до увеличения, чтобы новое поколение не было
+    видно раньше него (см. get_generation_age).
+    """
+    cache.set(GENERATION_CHANGED_KEY, time.time(), timeout=None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def schedule_generation_bump() -> None:
+    """
+    Увеличивает поколение после фиксации текущей транзакции.
+
+    Увеличение до фиксации позволило бы параллельному чтению закешировать
+    еще не измененные данные под новым поколением.
+    """
+    transaction.on_commit(bump_generation)
@@ -0,0 +1,211 @@
+import datetime
+from typing import Iterable, Optional
+
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from pets.models import ChangeCompaction, ChangeEvent, Pet, Photo
+
+# Ключ транзакционной рекомендательной блокировки PostgreSQL, под которой
+# записываются события журнала изменений.
+CHANGES_LOCK_ID = 0x70657473  # "pets"
+
+
+def record_changes(events: list[ChangeEvent]) -> None:
+    """
+    Записывает события в журнал изменений в текущей транзакции.
+
+    Номера seq выдаются последовательностью при вставке, но транзакции
+    могут фиксироваться не в порядке номеров, и читатель, уже получивший
+    номер N, пропустил бы меньший номер, зафиксированный позже. Поэтому в
+    PostgreSQL события записываются под транзакционной блокировкой, которая
+    держится до фиксации: номера фиксируются строго по порядку.
+    Вызывается последним действием транзакции, чтобы блокировка держалась
+    как можно меньше и не ожидала блокировок строк.
+
+    Аргументы:
+        events (list[ChangeEvent]): Новые события.
+    """
+    if not events:
+        return
+    using = router.db_for_write(ChangeEvent)
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", [CHANGES_LOCK_ID]
+                )
+        ChangeEvent.objects.using(using).bulk_create(events)
+
+
+def pet_created(pets: Iterable[Pet]) -> list[ChangeEvent]:
+    """
+    Возвращает события создания питомцев с их данными.
+
+    Аргументы:
+        pets (Iterable[Pet]): Созданные питомцы.
+
+    Возвращает:
+        list[ChangeEvent]: События pet.created.
+    """
+    return [
+        ChangeEvent(
+            kind=ChangeEvent.PET_CREATED,
+            object_id=pet.id,
+            pet_id=pet.id,
+            data={
+                "name": pet.name,
+                "age": pet.age,
+                "type": pet.type,
+                "created_at": pet.created_at,
+            },
+        )
+        for pet in pets
+    ]
+
+
+def pet_deleted(pet_ids: Iterable) -> list[ChangeEvent]:
+    """
+    Возвращает события удаления питомцев.
+
+    Аргументы:
+        pet_ids (Iterable): Идентификаторы удаленных питомцев.
+
+    Возвращает:
+        list[ChangeEvent]: События pet.deleted.
+    """
+    return [
+        ChangeEvent(
+            kind=ChangeEvent.PET_DELETED, object_id=pet_id, pet_id=pet_id
+        )
+        for pet_id in pet_ids
+    ]
+
+
+def photo_created(photos: Iterable[Photo]) -> list[ChangeEvent]:
+    """
+    Возвращает события загрузки фото с именем файла.
+
+    Аргументы:
+        photos (Iterable[Photo]): Созданные фото.
+
+    Возвращает:
+        list[ChangeEvent]: События photo.created.
+    """
+    return [
+        ChangeEvent(
+            kind=ChangeEvent.PHOTO_CREATED,
+            object_id=photo.id,
+            pet_id=photo.pet_id,
+            data={"file": photo.file.name},
+        )
+        for photo in photos
+    ]
+
+
+def photo_deleted(photos: Iterable[tuple]) -> list[ChangeEvent]:
+    """
+    Возвращает события удаления фото.
+
+    Аргументы:
+        photos (Iterable[tuple]): Пары (id фото, id питомца).
+
+    Возвращает:
+        list[ChangeEvent]: События photo.deleted.
+    """
+    return [
+        ChangeEvent(
+            kind=ChangeEvent.PHOTO_DELETED, object_id=photo_id, pet_id=pet_id
+        )
+        for photo_id, pet_id in photos
+    ]
+
+
+def get_last_seq() -> int:
+    """
+    Возвращает номер последнего события журнала (0, если журнал пуст).
+
+    Возвращает:
+        int: Номер, с которого можно начать чтение изменений.
+    """
+    last = ChangeEvent.objects.aggregate(last=Max("seq"))["last"]
+    return last if last is not None else get_compacted_seq()
+
+
+def get_compacted_seq() -> int:
+    """
+    Возвращает номер, до которого (включительно) журнал удален.
+
+    Возвращает:
+        int: Номер последнего удаленного события или 0.
+    """
+    seq = ChangeCompaction.objects.aggregate(seq=Max("seq"))["seq"]
+    return seq or 0
+
+
+def get_changes(since: int, limit: int) -> tuple[list[ChangeEvent], bool]:
+    """
+    Возвращает события с номером больше since по возрастанию номера.
+
+    Запрос читает не больше limit + 1 строк по первичному ключу, поэтому
+    его стоимость зависит от количества изменений, а не от размера таблиц.
+
+    Аргументы:
+        since (int): Номер последнего полученного события.
+        limit (int): Максимальное количество событий.
+
+    Возвращает:
+        tuple[list[ChangeEvent], bool]: События и признак того, что
+        есть следующие события.
+    """
+    events = list(
+        ChangeEvent.objects.filter(seq__gt=since).order_by("seq")[
+            : limit + 1
+        ]
+    )
+    return events[:limit], len(events) > limit
+
+
+def compact_changes(
+    before: datetime.datetime, batch_size: int
+) -> tuple[int, Optional[int]]:
+    """
+    Удаляет события, записанные раньше before, пакетами.
+
+    Номер последнего удаленного события сохраняется в ChangeCompaction:
+    запрос изменений после меньшего номера получит 410 Gone, и клиенту
+    нужно заново прочитать полный список.
+
+    Аргументы:
+        before (datetime.datetime): Граница времени записи событий.
+        batch_size (int): Количество событий, удаляемых за один запрос.
+
+    Возвращает:
+        tuple[int, Optional[int]]: Количество удаленных событий и номер
+        последнего удаленного события (None, если удалять нечего).
+    """
+    last = (
+        ChangeEvent.objects.filter(created_at__lt=before)
+        .order_by("-seq")
+        .values_list("seq", flat=True)
+        .first()
+    )
+    if last is None:
+        return 0, None
+    # Граница сохраняется до удаления: прерванное удаление не оставит
+    # клиентам пропуск в журнале.
+    ChangeCompaction.objects.create(seq=last)
+
+    deleted = 0
+    while True:
+        batch = list(
+            ChangeEvent.objects.filter(seq__lte=last)
+            .order_by("seq")
+            .values_list("seq", flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted, last
+        deleted += ChangeEvent.objects.filter(
+            seq__gte=batch[0], seq__lte=batch[-1]
+        ).delete()[0]
@@ -0,0 +1,60 @@
+import os
+import tempfile
+from typing import Iterable
+
+from PIL import Image, ImageOps
+
+# Расширения файлов для форматов Pillow.
+FORMAT_EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def render_photo(
+    source_path: str,
+    target_dir: str,
+    widths: Iterable[int],
+    image_format: str,
+    quality: int,
+) -> dict[str, str]:
+    """
+    Создает уменьшенные копии фотографии.
+
+    Изображение декодируется один раз, после чего из него строятся все
+    копии. Ориентация из EXIF применяется к пикселям, а сами метаданные
+    в копии не переносятся. Функция не зависит от Django и может
+    выполняться в отдельном процессе.
+
+    Аргументы:
+        source_path (str): Путь к исходному файлу.
+        target_dir (str): Каталог для копий.
+        widths (Iterable[int]): Ширины копий в пикселях.
+        image_format (str): Формат Pillow (WEBP или JPEG).
+        quality (int): Качество сжатия.
+
+    Возвращает:
+        dict[str, str]: Имена файлов копий по ширине.
+    """
+    extension = FORMAT_EXTENSIONS[image_format]
+    os.makedirs(target_dir, exist_ok=True)
+    renditions = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        if image_format == "JPEG" and image.mode == "RGBA":
+            image = image.convert("RGB")
+        for width in sorted(set(widths)):
+            rendition = image.copy()
+            rendition.thumbnail((width, image.height), Image.LANCZOS)
+            name = f"{width}.{extension}"
+            fd, temp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    rendition.save(
+                        temp_file, image_format, quality=quality, optimize=True
+                    )
+                os.replace(temp_path, os.path.join(target_dir, name))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            renditions[str(width)] = name
+    return renditions
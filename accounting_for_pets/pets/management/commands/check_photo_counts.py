@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from accounting_for_pets.db.timeouts import without_timeouts
+from pets.models import Pet, Photo
+from pets.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    """
+    Команда для сверки денормализованного счетчика Pet.photo_count
+    с фактическим количеством фотографий.
+    """
+
+    help = "Проверяет (и при --fix исправляет) расхождения Pet.photo_count."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Исправить найденные расхождения.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество питомцев, исправляемых за один запрос.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        # Сверка и пересчет идут по всей таблице Pet и могут выполняться
+        # дольше таймаута запросов.
+        with without_timeouts():
+            self.check_counts(options["fix"], options["batch_size"])
+
+    def check_counts(self, fix: bool, batch_size: int) -> None:
+        """
+        Находит и при fix исправляет расхождения Pet.photo_count.
+
+        Аргументы:
+            fix (bool): Исправить найденные расхождения.
+            batch_size (int): Количество питомцев в одном запросе.
+        """
+        drifted = list(
+            Pet.objects.annotate(actual=Count("photos"))
+            .exclude(photo_count=F("actual"))
+            .values_list("id", flat=True)
+        )
+        self.stdout.write(f"Расхождений photo_count: {len(drifted)}")
+        if not drifted or not fix:
+            return
+
+        counts = (
+            Photo.objects.filter(pet=OuterRef("pk"))
+            .order_by()
+            .values("pet")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        for start in range(0, len(drifted), batch_size):
+            with transaction.atomic():
+                Pet.objects.filter(
+                    id__in=drifted[start : start + batch_size]
+                ).update(photo_count=Coalesce(Subquery(counts), 0))
+        # Наличие фото у исправленных питомцев могло измениться.
+        refresh_stats()
+        self.stdout.write(self.style.SUCCESS("Расхождения исправлены."))
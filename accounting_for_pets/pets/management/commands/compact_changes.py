@@ -0,0 +1,44 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pets.changes import compact_changes
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления старых событий журнала изменений.
+    """
+
+    help = (
+        "Удаляет события журнала изменений старше "
+        "PETS_CHANGES_RETENTION_DAYS дней."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.PETS_CHANGES_RETENTION_DAYS,
+            help="Сколько дней хранить события.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.PETS_CHANGES_COMPACT_BATCH_SIZE,
+            help="Количество событий, удаляемых за один запрос.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        before = timezone.now() - datetime.timedelta(days=options["days"])
+        deleted, seq = compact_changes(before, options["batch_size"])
+        if seq is None:
+            self.stdout.write("Нет событий для удаления.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено событий: {deleted} (до номера {seq} включительно)."
+            )
+        )
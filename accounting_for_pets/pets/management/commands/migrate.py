@@ -0,0 +1,15 @@
+from django.core.management.commands import migrate
+
+from accounting_for_pets.db.timeouts import without_timeouts
+
+
+class Command(migrate.Command):
+    """
+    Команда migrate без серверных таймаутов запросов к БД: построение
+    индексов и заполнение новых полей на больших таблицах может идти
+    дольше settings.DB_STATEMENT_TIMEOUT.
+    """
+
+    def handle(self, *args, **options) -> None:
+        with without_timeouts(options["database"]):
+            super().handle(*args, **options)
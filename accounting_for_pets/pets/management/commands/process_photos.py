@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from pets.models import Photo
+from pets.tasks import process_photos
+
+
+class Command(BaseCommand):
+    """
+    Команда для создания уменьшенных копий фотографий, у которых их нет
+    (например, загруженных до появления фоновой обработки).
+    """
+
+    help = "Создает уменьшенные копии фотографий без копий."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Пересоздать копии для всех фотографий.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Количество фотографий, обрабатываемых за один проход.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        photos = Photo.objects.order_by("created_at", "id")
+        if not options["all"]:
+            photos = photos.filter(renditions={})
+        photo_ids = list(photos.values_list("id", flat=True))
+        batch_size = options["batch_size"]
+        for start in range(0, len(photo_ids), batch_size):
+            process_photos(
+                photo_ids[start : start + batch_size],
+                regenerate=options["all"],
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработано фотографий: {len(photo_ids)}")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounting_for_pets.db.timeouts import without_timeouts
+from pets.stats import get_stats, refresh_stats
+
+
+class Command(BaseCommand):
+    """
+    Команда для пересчета статистики питомцев (таблица PetStats).
+    """
+
+    help = "Пересчитывает статистику питомцев по таблице Pet."
+
+    def handle(self, *args, **options) -> None:
+        # Пересчет по всей таблице Pet может идти дольше таймаута запросов.
+        with without_timeouts():
+            refresh_stats()
+        total = get_stats()["total"]
+        self.stdout.write(
+            self.style.SUCCESS(f"Статистика пересчитана, питомцев: {total}.")
+        )
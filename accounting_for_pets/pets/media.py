@@ -0,0 +1,134 @@
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest
+
+from pets.storage import photo_storage
+
+
+@lru_cache(maxsize=None)
+def get_signing_key() -> bytes:
+    """
+    Возвращает ключ подписи URL медиафайлов, производный от SECRET_KEY.
+
+    Возвращает:
+        bytes: Ключ HMAC.
+    """
+    return hashlib.sha256(
+        f"pets.media:{settings.SECRET_KEY}".encode()
+    ).digest()
+
+
+@receiver(setting_changed)
+def reset_signing_key(*, setting: str, **kwargs) -> None:
+    """Сбрасывает кеш ключа подписи при изменении SECRET_KEY."""
+    if setting == "SECRET_KEY":
+        get_signing_key.cache_clear()
+
+
+def get_expires(now: Optional[float] = None) -> int:
+    """
+    Возвращает срок действия подписи для URL, выданных сейчас.
+
+    Срок округляется вверх до границы интервала settings.MEDIA_URL_TTL:
+    URL одного файла не меняются в пределах интервала (и кешируются
+    клиентами), а действуют не меньше MEDIA_URL_TTL секунд.
+
+    Аргументы:
+        now (Optional[float]): Текущее время (для тестов).
+
+    Возвращает:
+        int: Время окончания действия подписи (Unix time).
+    """
+    ttl = settings.MEDIA_URL_TTL
+    now = time.time() if now is None else now
+    return (int(now) // ttl + 2) * ttl
+
+
+def get_signature(name: str, expires: int) -> str:
+    """
+    Возвращает подпись HMAC-SHA256 имени файла и срока действия.
+
+    Аргументы:
+        name (str): Имя файла в хранилище.
+        expires (int): Время окончания действия подписи.
+
+    Возвращает:
+        str: Подпись в шестнадцатеричном виде.
+    """
+    message = f"{name}\n{expires}".encode()
+    return hmac.new(get_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def get_signed_query(name: str, expires: Optional[int] = None) -> str:
+    """
+    Возвращает строку запроса подписанного URL файла.
+
+    Аргументы:
+        name (str): Имя файла в хранилище.
+        expires (Optional[int]): Время окончания действия подписи; по
+            умолчанию get_expires().
+
+    Возвращает:
+        str: Параметры expires и signature.
+    """
+    if expires is None:
+        expires = get_expires()
+    return f"expires={expires}&signature={get_signature(name, expires)}"
+
+
+def get_signed_url(name: str) -> str:
+    """
+    Возвращает подписанный URL файла (без схемы и хоста).
+
+    Аргументы:
+        name (str): Имя файла в хранилище.
+
+    Возвращает:
+        str: URL файла с параметрами подписи.
+    """
+    return f"{photo_storage.url(name)}?{get_signed_query(name)}"
+
+
+def get_media_name(request: HttpRequest) -> Optional[str]:
+    """
+    Возвращает имя файла в хранилище для запроса к settings.MEDIA_URL.
+
+    Аргументы:
+        request (HttpRequest): Входящий HTTP-запрос.
+
+    Возвращает:
+        Optional[str]: Имя файла или None для остальных запросов.
+    """
+    if not request.path_info.startswith(settings.MEDIA_URL):
+        return None
+    return request.path_info[len(settings.MEDIA_URL) :]
+
+
+def is_signed_request(request: HttpRequest) -> bool:
+    """
+    Проверяет подпись запроса к медиафайлу за постоянное время.
+
+    Аргументы:
+        request (HttpRequest): Входящий HTTP-запрос.
+
+    Возвращает:
+        bool: True, если запрос к файлу подписан и срок подписи не истек.
+    """
+    name = get_media_name(request)
+    if not name:
+        return False
+    signature = request.GET.get("signature", "")
+    try:
+        expires = int(request.GET.get("expires", ""))
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(signature, get_signature(name, expires))
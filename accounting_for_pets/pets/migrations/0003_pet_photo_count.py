@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_photo_count(apps, schema_editor):
+    Pet = apps.get_model('pets', 'Pet')
+    Photo = apps.get_model('pets', 'Photo')
+    db_alias = schema_editor.connection.alias
+    counts = (
+        Photo.objects.filter(pet=OuterRef('pk'))
+        .order_by()
+        .values('pet')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Pet.objects.using(db_alias).filter(
+        id__in=Photo.objects.values('pet')
+    ).update(photo_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_pet_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_photo_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('photo_count__gt', 0)), fields=['created_at', 'id'], name='pets_pet_with_photos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('photo_count', 0)), fields=['created_at', 'id'], name='pets_pet_without_photos_idx'),
+        ),
+    ]
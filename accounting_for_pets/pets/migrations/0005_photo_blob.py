@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:30
+
+from django.db import migrations, models
+import pets.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='file',
+            field=models.ImageField(db_index=True, storage=pets.storage.ContentAddressedStorage(prefix='photos'), upload_to='photos/'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0005_photo_blob'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='pet',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='pets_pet_created_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['created_at', 'id'], include=('name', 'age', 'type', 'photo_count'), name='pets_pet_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['type', 'created_at', 'id'], name='pets_pet_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['age'], name='pets_pet_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['name'], name='pets_pet_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.16 on 2026-10-18 12:05
+
+from django.db import migrations
+
+from accounting_for_pets.db.timeouts import without_timeouts
+
+# Индексы создаются без блокировки записи (CONCURRENTLY), поэтому
+# миграция выполняется вне транзакции.
+INDEXES = [
+    # Поиск по началу имени: UPPER(name) LIKE 'ABC%'.
+    (
+        'pets_pet_name_upper_idx',
+        'ON pets_pet (UPPER("name"::text) text_pattern_ops)',
+    ),
+    # Поиск похожих имен: UPPER(name) % 'ABC'.
+    (
+        'pets_pet_name_trgm_idx',
+        'ON pets_pet USING gin (UPPER("name"::text) gin_trgm_ops)',
+    ),
+]
+IS_INVALID_INDEX = (
+    'SELECT 1 FROM pg_index '
+    'JOIN pg_class ON pg_class.oid = pg_index.indexrelid '
+    'WHERE pg_class.relname = %s AND NOT pg_index.indisvalid'
+)
+
+
+def create_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Построение индекса на большой таблице может идти дольше
+    # statement_timeout.
+    with without_timeouts(connection.alias):
+        for name, definition in INDEXES:
+            # Прерванный CREATE INDEX CONCURRENTLY оставляет
+            # недействительный индекс, который IF NOT EXISTS пропустил
+            # бы при повторном запуске.
+            with connection.cursor() as cursor:
+                cursor.execute(IS_INVALID_INDEX, [name])
+                invalid = cursor.fetchone() is not None
+            if invalid:
+                schema_editor.execute(
+                    f'DROP INDEX CONCURRENTLY IF EXISTS {name}'
+                )
+            schema_editor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}'
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in reversed(INDEXES):
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('pets', '0006_pet_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
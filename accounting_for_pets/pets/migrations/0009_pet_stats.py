@@ -0,0 +1,60 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:53
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_pet_stats(apps, schema_editor):
+    Pet = apps.get_model('pets', 'Pet')
+    PetStats = apps.get_model('pets', 'PetStats')
+    db_alias = schema_editor.connection.alias
+    rows = (
+        Pet.objects.using(db_alias)
+        .order_by()
+        .values('type', 'age')
+        .annotate(
+            with_photos=Count('id', filter=Q(photo_count__gt=0)),
+            without_photos=Count('id', filter=Q(photo_count=0)),
+        )
+    )
+    stats = []
+    for row in rows:
+        for has_photos, count in (
+            (True, row['with_photos']),
+            (False, row['without_photos']),
+        ):
+            if count:
+                stats.append(
+                    PetStats(
+                        type=row['type'],
+                        age=row['age'],
+                        has_photos=has_photos,
+                        count=count,
+                    )
+                )
+    PetStats.objects.using(db_alias).bulk_create(stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0008_change_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('cat', 'Cat'), ('dog', 'Dog')], max_length=50)),
+                ('age', models.IntegerField()),
+                ('has_photos', models.BooleanField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='petstats',
+            constraint=models.UniqueConstraint(fields=('type', 'age', 'has_photos'), name='pets_petstats_bucket_unique'),
+        ),
+        migrations.RunPython(backfill_pet_stats, migrations.RunPython.noop),
+    ]
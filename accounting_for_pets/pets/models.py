@@ -1,12 +1,14 @@
-import re
 import uuid
 from typing import Optional
 
-from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.http import HttpRequest
 
+from pets import media, validators
+from pets.storage import photo_storage
+
 
 class Pet(models.Model):
     """Модель, представляющая питомца."""
@@ -25,6 +27,48 @@ class Pet(models.Model):
     age: int = models.IntegerField()
     type: str = models.CharField(max_length=50, choices=PET_TYPES)
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    # Денормализованный счетчик фотографий для фильтра has_photos.
+    # Поддерживается при загрузке и удалении фото, сверяется командой
+    # check_photo_counts.
+    photo_count: int = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Детерминированный порядок списка; совпадает с ключом курсорной
+        # пагинации.
+        ordering = ["created_at", "id"]
+        indexes = [
+            # Порядок списка и ключ курсорной пагинации. Поля страницы
+            # включены в индекс (в PostgreSQL), чтобы при пропуске строк
+            # по offset не читать таблицу.
+            models.Index(
+                fields=["created_at", "id"],
+                name="pets_pet_created_id_idx",
+                include=["name", "age", "type", "photo_count"],
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                name="pets_pet_with_photos_idx",
+                condition=models.Q(photo_count__gt=0),
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                name="pets_pet_without_photos_idx",
+                condition=models.Q(photo_count=0),
+            ),
+            # Фильтр по типу с сортировкой списка.
+            models.Index(
+                fields=["type", "created_at", "id"], name="pets_pet_type_idx"
+            ),
+            # Фильтр по диапазону возраста (age_min, age_max).
+            models.Index(fields=["age"], name="pets_pet_age_idx"),
+            # Поиск по началу имени (name_prefix): в PostgreSQL LIKE 'abc%'
+            # использует индекс только с классом операторов *_pattern_ops.
+            models.Index(
+                fields=["name"],
+                name="pets_pet_name_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def clean_fields(self, exclude: Optional[list[str]] = None) -> None:
         """
@@ -40,20 +84,15 @@ class Pet(models.Model):
         """
         super().clean_fields(exclude=exclude)
 
-        if self.age < settings.PET_AGE_MIN or self.age > settings.PET_AGE_MAX:
-            raise ValidationError(
-                {
-                    "age": (
-                        f"Возраст должен быть от {settings.PET_AGE_MIN} до "
-                        f"{settings.PET_AGE_MAX} включительно."
-                    )
-                }
-            )
-
-        if not re.match(settings.PET_NAME_REGEX, self.name):
-            raise ValidationError(
-                {"name": "Имя питомца должно содержать только буквы."}
-            )
+        errors = {}
+        age_error = validators.validate_age(self.age)
+        if age_error is not None:
+            errors["age"] = age_error
+        name_error = validators.validate_name(self.name)
+        if name_error is not None:
+            errors["name"] = name_error
+        if errors:
+            raise ValidationError(errors)
 
     def __str__(self) -> str:
         return self.name
@@ -68,9 +107,114 @@ class Photo(models.Model):
     pet: Pet = models.ForeignKey(
         Pet, related_name="photos", on_delete=models.CASCADE
     )
-    file: models.ImageField = models.ImageField(upload_to="photos/")
+    file: models.ImageField = models.ImageField(
+        upload_to="photos/", storage=photo_storage, db_index=True
+    )
+    # Имена уменьшенных копий в хранилище по ширине, например
+    # {"160": "renditions/<id>/160.webp"}. Заполняются в фоне после загрузки.
+    renditions: dict = models.JSONField(default=dict, editable=False)
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def digest(self) -> Optional[str]:
+        """Хеш SHA-256 содержимого файла или None для старых файлов."""
+        return photo_storage.get_digest(self.file.name)
+
     def get_full_url(self, request: HttpRequest) -> str:
-        """Получает полный URL файла фотографии."""
-        return request.build_absolute_uri(self.file.url)
+        """Получает полный подписанный URL файла фотографии."""
+        return request.build_absolute_uri(media.get_signed_url(self.file.name))
+
+
+class PhotoBlob(models.Model):
+    """
+    Модель, представляющая уникальное содержимое файла фотографии.
+
+    Хранит количество фотографий, ссылающихся на файл, чтобы удалять
+    файл с диска только после удаления последней ссылки.
+    """
+
+    digest: str = models.CharField(max_length=64, primary_key=True)
+    name: str = models.CharField(max_length=100)
+    size: int = models.PositiveBigIntegerField()
+    refcount: int = models.IntegerField(default=0)
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.digest
+
+
+class ChangeEvent(models.Model):
+    """
+    Модель, представляющая запись журнала изменений питомцев и фото.
+
+    Записи только добавляются, в той же транзакции, что и само изменение;
+    номер seq монотонно растет в порядке фиксации транзакций (см.
+    pets.changes). Старые записи удаляются командой compact_changes.
+    """
+
+    PET_CREATED = "pet.created"
+    PET_DELETED = "pet.deleted"
+    PHOTO_CREATED = "photo.created"
+    PHOTO_DELETED = "photo.deleted"
+    KINDS = [
+        (PET_CREATED, "Pet created"),
+        (PET_DELETED, "Pet deleted"),
+        (PHOTO_CREATED, "Photo created"),
+        (PHOTO_DELETED, "Photo deleted"),
+    ]
+
+    seq: int = models.BigAutoField(primary_key=True)
+    kind: str = models.CharField(max_length=20, choices=KINDS)
+    # Идентификатор питомца или фото
+    object_id: uuid.UUID = models.UUIDField()
+    pet_id: uuid.UUID = models.UUIDField()
+    # Данные созданного объекта на момент изменения
+    data: dict = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+
+    def __str__(self) -> str:
+        return f"{self.seq} {self.kind} {self.object_id}"
+
+
+class ChangeCompaction(models.Model):
+    """
+    Модель, представляющая удаление старых записей журнала изменений.
+
+    Записи ChangeEvent с номером не больше seq удалены, поэтому изменения
+    после меньшего номера получить уже нельзя.
+    """
+
+    seq: int = models.BigIntegerField()
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return str(self.seq)
+
+
+class PetStats(models.Model):
+    """
+    Модель, представляющая количество питомцев в одной группе статистики.
+
+    Группа - сочетание типа, возраста и наличия фото. Счетчики
+    обновляются в транзакциях изменений (см. pets.stats) и
+    пересчитываются командой refresh_pet_stats.
+    """
+
+    type: str = models.CharField(max_length=50, choices=Pet.PET_TYPES)
+    age: int = models.IntegerField()
+    has_photos: bool = models.BooleanField()
+    count: int = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "age", "has_photos"],
+                name="pets_petstats_bucket_unique",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.type} {self.age} {self.has_photos}: {self.count}"
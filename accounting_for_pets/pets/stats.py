@@ -0,0 +1,165 @@
+from collections import Counter
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q, QuerySet
+
+from pets.models import Pet, PetStats
+
+
+def count_buckets(queryset: QuerySet) -> Counter:
+    """
+    Подсчитывает питомцев queryset по группам статистики одним запросом.
+
+    Аргументы:
+        queryset (QuerySet): Queryset объектов Pet.
+
+    Возвращает:
+        Counter: Количество питомцев по группам (тип, возраст, есть фото).
+    """
+    rows = (
+        queryset.order_by()
+        .values("type", "age")
+        .annotate(
+            with_photos=Count("id", filter=Q(photo_count__gt=0)),
+            without_photos=Count("id", filter=Q(photo_count=0)),
+        )
+    )
+    buckets = Counter()
+    for row in rows:
+        buckets[row["type"], row["age"], True] += row["with_photos"]
+        buckets[row["type"], row["age"], False] += row["without_photos"]
+    return +buckets
+
+
+def apply_deltas(deltas: Counter) -> None:
+    """
+    Изменяет счетчики групп статистики в текущей транзакции.
+
+    Группы обновляются в одном порядке, чтобы параллельные транзакции не
+    блокировали строки друг друга крест-накрест. Отсутствующая группа
+    создается.
+
+    Аргументы:
+        deltas (Counter): Изменения количества по группам.
+    """
+    for bucket in sorted(key for key, delta in deltas.items() if delta):
+        pet_type, age, has_photos = bucket
+        rows = PetStats.objects.filter(
+            type=pet_type, age=age, has_photos=has_photos
+        )
+        if rows.update(count=F("count") + deltas[bucket]):
+            continue
+        PetStats.objects.bulk_create(
+            [PetStats(type=pet_type, age=age, has_photos=has_photos)],
+            ignore_conflicts=True,
+        )
+        rows.update(count=F("count") + deltas[bucket])
+
+
+def pets_created(pets: Iterable[Pet]) -> None:
+    """
+    Учитывает созданных питомцев в статистике.
+
+    Аргументы:
+        pets (Iterable[Pet]): Созданные питомцы.
+    """
+    apply_deltas(
+        Counter((pet.type, pet.age, pet.photo_count > 0) for pet in pets)
+    )
+
+
+def pets_deleted(pet_ids: Iterable) -> None:
+    """
+    Учитывает удаление питомцев в статистике.
+
+    Вызывается до удаления фото питомцев: группа определяется по
+    текущему количеству фото.
+
+    Аргументы:
+        pet_ids (Iterable): Идентификаторы удаляемых питомцев.
+    """
+    buckets = count_buckets(Pet.objects.filter(id__in=list(pet_ids)))
+    apply_deltas(
+        Counter({bucket: -count for bucket, count in buckets.items()})
+    )
+
+
+def photos_added(pet_ids: Iterable) -> None:
+    """
+    Учитывает загрузку фото: питомцы с первыми фото переходят в группу
+    с фото.
+
+    Вызывается до увеличения Pet.photo_count в той же транзакции, после
+    блокировки строк питомцев.
+
+    Аргументы:
+        pet_ids (Iterable): Идентификаторы питомцев с новыми фото.
+    """
+    deltas = Counter()
+    rows = Pet.objects.filter(id__in=list(pet_ids), photo_count=0)
+    for pet_type, age in rows.values_list("type", "age"):
+        deltas[pet_type, age, False] -= 1
+        deltas[pet_type, age, True] += 1
+    apply_deltas(deltas)
+
+
+def refresh_stats() -> None:
+    """
+    Пересчитывает статистику по таблице питомцев.
+
+    В PostgreSQL таблица статистики блокируется от изменений на время
+    пересчета: изменения, начатые раньше, успевают зафиксироваться и
+    попадают в подсчет, а начатые позже применяются к новым счетчикам.
+    """
+    using = router.db_for_write(PetStats)
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {PetStats._meta.db_table} "
+                    "IN SHARE ROW EXCLUSIVE MODE"
+                )
+        buckets = count_buckets(Pet.objects.using(using))
+        PetStats.objects.using(using).all().delete()
+        PetStats.objects.using(using).bulk_create(
+            PetStats(
+                type=pet_type, age=age, has_photos=has_photos, count=count
+            )
+            for (pet_type, age, has_photos), count in buckets.items()
+        )
+
+
+def get_stats() -> dict:
+    """
+    Возвращает статистику питомцев из таблицы PetStats.
+
+    Стоимость зависит только от количества групп, а не от количества
+    питомцев.
+
+    Возвращает:
+        dict: Общее количество, количество по типам, гистограмма по
+        возрасту от settings.PET_AGE_MIN до settings.PET_AGE_MAX и
+        количество питомцев с фото и без фото.
+    """
+    by_type = {pet_type: 0 for pet_type, _ in Pet.PET_TYPES}
+    by_age = {
+        age: 0 for age in range(settings.PET_AGE_MIN, settings.PET_AGE_MAX + 1)
+    }
+    photos = {True: 0, False: 0}
+    rows = PetStats.objects.filter(count__gt=0).values_list(
+        "type", "age", "has_photos", "count"
+    )
+    for pet_type, age, has_photos, count in rows:
+        by_type[pet_type] = by_type.get(pet_type, 0) + count
+        by_age[age] = by_age.get(age, 0) + count
+        photos[has_photos] += count
+    return {
+        "total": photos[True] + photos[False],
+        "by_type": by_type,
+        "by_age": {str(age): by_age[age] for age in sorted(by_age)},
+        "with_photos": photos[True],
+        "without_photos": photos[False],
+    }
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+from typing import Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+DIGEST_NAME_RE = re.compile(
+    r"^(?P<prefix>.+)/[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.\w+$"
+)
+
+# Расширения файлов для форматов, определенных Pillow при проверке.
+IMAGE_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "GIF": ".gif",
+    "WEBP": ".webp",
+    "BMP": ".bmp",
+    "TIFF": ".tif",
+}
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, сохраняющее каждое уникальное содержимое один раз.
+
+    Файл хешируется (SHA-256) во время записи на диск и сохраняется под
+    именем "<prefix>/ab/cd/<digest>.<ext>". Повторная загрузка того же
+    содержимого не занимает места на диске. Количество ссылок на каждый
+    файл хранится в модели PhotoBlob, поэтому файл удаляется только
+    когда на него не ссылается ни одна фотография.
+    """
+
+    def __init__(self, prefix: str = "photos", **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.prefix = prefix
+
+    @staticmethod
+    def get_digest(name: str) -> Optional[str]:
+        """
+        Возвращает хеш содержимого по имени файла.
+
+        Аргументы:
+            name (str): Имя файла в хранилище.
+
+        Возвращает:
+            Optional[str]: Хеш SHA-256 или None для файлов, сохраненных
+            до перехода на адресацию по содержимому.
+        """
+        match = DIGEST_NAME_RE.match(name or "")
+        return match.group("digest") if match else None
+
+    def get_digest_name(self, digest: str, extension: str) -> str:
+        """Возвращает имя файла в хранилище для хеша содержимого."""
+        return posixpath.join(
+            self.prefix, digest[:2], digest[2:4], f"{digest}{extension}"
+        )
+
+    def get_available_name(self, name: str, max_length=None) -> str:
+        """
+        Возвращает имя без проверки существования файла.
+
+        Итоговое имя определяется содержимым в _save, поэтому проверка
+        занятости имени не нужна.
+        """
+        return name
+
+    def _save(self, name: str, content: File) -> str:
+        """
+        Сохраняет содержимое под именем, вычисленным по его хешу.
+
+        Если загрузчик уже посчитал хеш и сохранил данные во временный
+        файл (атрибуты sha256 и temporary_file_path), файл перемещается на
+        место без повторного чтения. Иначе данные копируются во временный
+        файл с одновременным хешированием.
+
+        Аргументы:
+            name (str): Предлагаемое имя файла (используется расширение).
+            content (File): Содержимое файла.
+
+        Возвращает:
+            str: Имя сохраненного файла в хранилище.
+        """
+        digest = getattr(content, "sha256", None)
+        if digest and hasattr(content, "temporary_file_path"):
+            source = content.temporary_file_path()
+            owns_source = False
+        else:
+            digest, source = self._write_temporary(content)
+            owns_source = True
+
+        image = getattr(content, "image", None)
+        extension = IMAGE_EXTENSIONS.get(
+            getattr(image, "format", None),
+            os.path.splitext(name)[1].lower(),
+        )
+        final_name = self.get_digest_name(digest, extension)
+        path = self.path(final_name)
+
+        # Блокировка строки PhotoBlob сериализует запись файла с его
+        # удалением в remove_unreferenced.
+        with transaction.atomic():
+            self._acquire(digest, final_name, content.size)
+            if os.path.exists(path):
+                if owns_source:
+                    os.remove(source)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(source, path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(path, self.file_permissions_mode)
+        return final_name
+
+    def _write_temporary(self, content: File) -> tuple[str, str]:
+        """
+        Копирует содержимое во временный файл рядом с хранилищем.
+
+        Возвращает:
+            tuple[str, str]: Хеш SHA-256 и путь к временному файлу.
+        """
+        directory = settings.FILE_UPLOAD_TEMP_DIR
+        os.makedirs(directory, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return hasher.hexdigest(), temp_path
+
+    @staticmethod
+    def _acquire(digest: str, name: str, size: int) -> None:
+        """Увеличивает счетчик ссылок на содержимое."""
+        from pets.models import PhotoBlob
+
+        blob, created = PhotoBlob.objects.select_for_update().get_or_create(
+            digest=digest, defaults={"name": name, "size": size}
+        )
+        PhotoBlob.objects.filter(digest=blob.digest).update(
+            refcount=F("refcount") + 1
+        )
+
+    @staticmethod
+    def release(references: dict[str, int]) -> None:
+        """
+        Уменьшает счетчики ссылок на содержимое.
+
+        Вызывается в транзакции удаления фотографий; сами файлы удаляются
+        позже через remove_unreferenced.
+
+        Аргументы:
+            references (dict[str, int]): Количество удаленных ссылок
+            по имени файла.
+        """
+        from pets.models import PhotoBlob
+
+        for name, count in sorted(references.items()):
+            digest = ContentAddressedStorage.get_digest(name)
+            if digest:
+                PhotoBlob.objects.filter(digest=digest).update(
+                    refcount=F("refcount") - count
+                )
+
+    def discard(self, names: list[str]) -> None:
+        """
+        Удаляет файлы, сохраненные в откатившейся транзакции.
+
+        Вместе с транзакцией откатываются и строки PhotoBlob новых файлов,
+        а сами файлы остаются на диске. Файл удаляется, только если на его
+        содержимое по-прежнему нет ссылок: строка PhotoBlob создается
+        заново, чтобы параллельная загрузка того же содержимого ждала
+        удаления.
+
+        Аргументы:
+            names (list[str]): Имена файлов в хранилище; имена без хеша
+            (файлы, не дошедшие до хранилища) пропускаются.
+        """
+        from pets.models import PhotoBlob
+
+        for name in sorted(set(names)):
+            digest = self.get_digest(name)
+            if not digest or not name.startswith(f"{self.prefix}/"):
+                continue
+            PhotoBlob.objects.get_or_create(
+                digest=digest, defaults={"name": name, "size": 0}
+            )
+            self.remove_unreferenced(name, [])
+
+    def remove_unreferenced(self, name: str, renditions: list[str]) -> bool:
+        """
+        Удаляет файл и его копии, если на него больше нет ссылок.
+
+        Файлы, сохраненные до перехода на адресацию по содержимому,
+        принадлежат одной фотографии и удаляются всегда.
+
+        Аргументы:
+            name (str): Имя файла в хранилище.
+            renditions (list[str]): Имена уменьшенных копий файла.
+
+        Возвращает:
+            bool: True, если файл удален.
+        """
+        from pets.models import PhotoBlob
+
+        digest = self.get_digest(name)
+        with transaction.atomic():
+            if digest:
+                blob = (
+                    PhotoBlob.objects.select_for_update()
+                    .filter(digest=digest, refcount__lte=0)
+                    .first()
+                )
+                if blob is None:
+                    return False
+                blob.delete()
+            for rendition in renditions:
+                self.delete(rendition)
+            if digest:
+                # Копии общего содержимого лежат в каталоге его хеша.
+                shutil.rmtree(
+                    self.path(
+                        posixpath.join(settings.PHOTO_RENDITIONS_DIR, digest)
+                    ),
+                    ignore_errors=True,
+                )
+            self.delete(name)
+        return True
+
+
+photo_storage = ContentAddressedStorage(prefix="photos")
@@ -0,0 +1,238 @@
+import logging
+import multiprocessing
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from accounting_for_pets.metrics import observe_stage
+from pets.cache import bump_generation
+from pets.images import render_photo
+from pets.storage import photo_storage
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает пул фоновых потоков процесса, создавая его при первом вызове.
+
+    Возвращает:
+        ThreadPoolExecutor: Пул потоков для фоновых задач.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_TASK_WORKERS,
+            thread_name_prefix="pets-tasks",
+        )
+    return _executor
+
+
+def get_process_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Возвращает пул процессов для обработки изображений.
+
+    Процессы запускаются методом spawn: fork многопоточного
+    воркера небезопасен. При settings.PHOTO_PROCESSING_WORKERS = 0
+    пул не создается и изображения обрабатываются в фоновом потоке.
+
+    Возвращает:
+        Optional[ProcessPoolExecutor]: Пул процессов или None.
+    """
+    global _process_executor
+    if _process_executor is None and settings.PHOTO_PROCESSING_WORKERS > 0:
+        _process_executor = ProcessPoolExecutor(
+            max_workers=settings.PHOTO_PROCESSING_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_executor
+
+
+def reset_process_executor() -> None:
+    """Останавливает пул процессов; новый будет создан при следующем вызове."""
+    global _process_executor
+    if _process_executor is not None:
+        _process_executor.shutdown(wait=False)
+        _process_executor = None
+
+
+def run_task(func: Callable, *args) -> None:
+    """
+    Выполняет задачу в фоновом потоке вне обработки запроса.
+
+    При settings.BACKGROUND_TASKS_SYNC задача выполняется сразу
+    (удобно для тестов и отладки).
+
+    Аргументы:
+        func (Callable): Функция задачи.
+        *args: Аргументы функции.
+    """
+    if settings.BACKGROUND_TASKS_SYNC:
+        func(*args)
+    else:
+        get_executor().submit(_run_logged, func, *args)
+
+
+def _run_logged(func: Callable, *args) -> None:
+    """Выполняет задачу, логируя ошибки и закрывая соединения с БД."""
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+    finally:
+        close_old_connections()
+
+
+def remove_photo_files(files: dict[str, list[str]]) -> None:
+    """
+    Удаляет файлы фотографий, на которые больше нет ссылок, и их копии.
+
+    Аргументы:
+        files (dict[str, list[str]]): Имена уменьшенных копий по имени
+        файла фотографии.
+    """
+    for name, renditions in files.items():
+        try:
+            with observe_stage("photo_files_remove"):
+                photo_storage.remove_unreferenced(name, renditions)
+        except OSError:
+            logger.exception("Failed to remove file %s", name)
+
+
+def schedule_photo_files_removal(files: dict[str, list[str]]) -> None:
+    """
+    Планирует удаление файлов фотографий после фиксации транзакции.
+
+    Файлы удаляются пакетами по settings.FILE_REMOVAL_BATCH_SIZE в фоновом
+    потоке. Если транзакция откатится, файлы останутся на месте.
+
+    Аргументы:
+        files (dict[str, list[str]]): Имена уменьшенных копий по имени
+        файла фотографии.
+    """
+    items = [(name, renditions) for name, renditions in files.items() if name]
+    if not items:
+        return
+
+    def enqueue() -> None:
+        batch_size = settings.FILE_REMOVAL_BATCH_SIZE
+        for start in range(0, len(items), batch_size):
+            run_task(
+                remove_photo_files, dict(items[start : start + batch_size])
+            )
+
+    transaction.on_commit(enqueue)
+
+
+def process_photos(photo_ids: list, regenerate: bool = False) -> None:
+    """
+    Создает уменьшенные копии фотографий и сохраняет их имена в Photo.
+
+    Декодирование и сжатие выполняются в пуле процессов, чтобы не
+    занимать GIL воркера, обслуживающего запросы.
+
+    Аргументы:
+        photo_ids (list): Идентификаторы объектов Photo.
+        regenerate (bool): Пересоздать копии, даже если копии того же
+        файла уже есть.
+    """
+    from pets.models import Photo
+
+    executor = get_process_executor()
+    photos = Photo.objects.filter(id__in=photo_ids).only("id", "file")
+    updated = False
+    try:
+        for photo in photos:
+            updated |= process_photo(photo, executor, regenerate)
+    except BrokenProcessPool:
+        logger.exception("Photo processing pool is broken")
+        reset_process_executor()
+    finally:
+        # Одно увеличение поколения на пакет, а не на каждую фотографию:
+        # кешированные страницы списка сбрасываются один раз.
+        if updated:
+            bump_generation()
+
+
+def process_photo(
+    photo,
+    executor: Optional[ProcessPoolExecutor],
+    regenerate: bool = False,
+) -> bool:
+    """
+    Создает уменьшенные копии одной фотографии.
+
+    Аргументы:
+        photo (Photo): Объект Photo с полями id и file.
+        executor (Optional[ProcessPoolExecutor]): Пул процессов или None.
+        regenerate (bool): Не использовать копии других фотографий с тем
+        же файлом.
+
+    Возвращает:
+        bool: True, если копии фотографии сохранены.
+
+    Вызывает:
+        BrokenProcessPool: Если пул процессов сломан.
+    """
+    from pets.models import Photo
+
+    # Копии одинакового содержимого общие: если они уже созданы для
+    # другой фотографии, повторная обработка не нужна.
+    digest = photo.digest
+    if digest and not regenerate:
+        existing = (
+            Photo.objects.filter(file=photo.file.name)
+            .exclude(id=photo.id)
+            .exclude(renditions={})
+            .values_list("renditions", flat=True)
+            .first()
+        )
+        if existing:
+            Photo.objects.filter(id=photo.id).update(renditions=existing)
+            return True
+    directory = posixpath.join(
+        settings.PHOTO_RENDITIONS_DIR, digest or str(photo.id)
+    )
+    args = (
+        photo.file.path,
+        photo_storage.path(directory),
+        settings.PHOTO_RENDITION_WIDTHS,
+        settings.PHOTO_RENDITION_FORMAT,
+        settings.PHOTO_RENDITION_QUALITY,
+    )
+    try:
+        with observe_stage("photo_render"):
+            if executor is None:
+                names = render_photo(*args)
+            else:
+                names = executor.submit(render_photo, *args).result()
+    except BrokenProcessPool:
+        raise
+    except Exception:
+        logger.exception("Failed to process photo %s", photo.id)
+        return False
+    renditions = {
+        width: posixpath.join(directory, name)
+        for width, name in names.items()
+    }
+    Photo.objects.filter(id=photo.id).update(renditions=renditions)
+    return True
+
+
+def schedule_photo_processing(photo_ids: Iterable) -> None:
+    """
+    Планирует обработку фотографий после фиксации текущей транзакции.
+
+    Аргументы:
+        photo_ids (Iterable): Идентификаторы объектов Photo.
+    """
+    photo_ids = list(photo_ids)
+    if photo_ids:
+        transaction.on_commit(lambda: run_task(process_photos, photo_ids))
@@ -0,0 +1,216 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+NAME_ERROR = "Имя питомца должно содержать только буквы."
+# Сообщения полей DRF, переводятся его каталогом сообщений.
+REQUIRED_ERROR = _("This field is required.")
+NULL_ERROR = _("This field may not be null.")
+BLANK_ERROR = _("This field may not be blank.")
+INTEGER_ERROR = _("A valid integer is required.")
+STRING_ERROR = _("Not a valid string.")
+CHOICE_ERROR = _('"{input}" is not a valid choice.')
+MAX_LENGTH_ERROR = _(
+    "Ensure this field has no more than {max_length} characters."
+)
+OBJECT_ERROR = _("Invalid data. Expected a dictionary, but got {datatype}.")
+
+# Настройки, при изменении которых правила компилируются заново.
+RULE_SETTINGS = ("VALID_NAME_REGEX", "PET_AGE_MIN", "PET_AGE_MAX")
+
+INTEGER_RE = re.compile(r"^[-+]?\d+(\.0*)?$")
+
+
+@dataclass(frozen=True)
+class PetRules:
+    """Скомпилированные правила проверки питомца."""
+
+    name_re: re.Pattern
+    name_max_length: int
+    age_min: int
+    age_max: int
+    types: frozenset
+
+    @property
+    def age_error(self) -> str:
+        return (
+            f"Возраст питомца должен быть от {self.age_min} до "
+            f"{self.age_max} включительно."
+        )
+
+
+@lru_cache(maxsize=None)
+def get_rules() -> PetRules:
+    """
+    Возвращает правила проверки, скомпилированные из настроек.
+
+    Регулярное выражение settings.VALID_NAME_REGEX компилируется один
+    раз; правила пересобираются при изменении настроек в тестах.
+
+    Возвращает:
+        PetRules: Правила проверки.
+    """
+    from pets.models import Pet
+
+    return PetRules(
+        name_re=re.compile(settings.VALID_NAME_REGEX),
+        name_max_length=Pet._meta.get_field("name").max_length,
+        age_min=settings.PET_AGE_MIN,
+        age_max=settings.PET_AGE_MAX,
+        types=frozenset(value for value, _ in Pet.PET_TYPES),
+    )
+
+
+@receiver(setting_changed)
+def reset_rules(*, setting: str, **kwargs) -> None:
+    """Сбрасывает скомпилированные правила при изменении настроек."""
+    if setting in RULE_SETTINGS:
+        get_rules.cache_clear()
+
+
+def validate_name(value: str) -> Optional[str]:
+    """
+    Проверяет, что имя содержит только буквы.
+
+    Аргументы:
+        value (str): Имя питомца.
+
+    Возвращает:
+        Optional[str]: Сообщение об ошибке или None.
+    """
+    if get_rules().name_re.fullmatch(value) is None:
+        return NAME_ERROR
+    return None
+
+
+def validate_age(value: int) -> Optional[str]:
+    """
+    Проверяет, что возраст находится в допустимых пределах.
+
+    Аргументы:
+        value (int): Возраст питомца.
+
+    Возвращает:
+        Optional[str]: Сообщение об ошибке или None.
+    """
+    rules = get_rules()
+    if not rules.age_min <= value <= rules.age_max:
+        return rules.age_error
+    return None
+
+
+def validate_pets(
+    items: list[Any],
+) -> tuple[list[tuple[int, dict]], list[dict]]:
+    """
+    Проверяет список данных питомцев за один проход.
+
+    Правила те же, что у PetSerializer (обязательные поля name, age и
+    type, приведение возраста к целому, обрезка пробелов в имени), но без
+    создания сериализатора и полей DRF на каждый элемент. Правила
+    загружаются один раз на весь список.
+
+    Аргументы:
+        items (list[Any]): Данные питомцев.
+
+    Возвращает:
+        tuple[list[tuple[int, dict]], list[dict]]: Корректные элементы
+        в виде (индекс, данные для Pet) и ошибки в виде
+        {"index": индекс, "errors": {поле: [сообщения]}}.
+    """
+    rules = get_rules()
+    name_match = rules.name_re.fullmatch
+    name_max_length = rules.name_max_length
+    age_min, age_max = rules.age_min, rules.age_max
+    types = rules.types
+
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            message = OBJECT_ERROR.format(datatype=type(item).__name__)
+            errors.append(
+                {"index": index, "errors": {"non_field_errors": [message]}}
+            )
+            continue
+        item_errors = {}
+
+        name = item.get("name")
+        if name is None:
+            item_errors["name"] = [
+                REQUIRED_ERROR if "name" not in item else NULL_ERROR
+            ]
+        elif not isinstance(name, (str, int, float)) or isinstance(
+            name, bool
+        ):
+            item_errors["name"] = [STRING_ERROR]
+        else:
+            name = str(name).strip()
+            if not name:
+                item_errors["name"] = [BLANK_ERROR]
+            elif len(name) > name_max_length:
+                item_errors["name"] = [
+                    MAX_LENGTH_ERROR.format(max_length=name_max_length)
+                ]
+            elif name_match(name) is None:
+                item_errors["name"] = [NAME_ERROR]
+
+        age = item.get("age")
+        if age is None:
+            item_errors["age"] = [
+                REQUIRED_ERROR if "age" not in item else NULL_ERROR
+            ]
+        else:
+            age = to_integer(age)
+            if age is None:
+                item_errors["age"] = [INTEGER_ERROR]
+            elif not age_min <= age <= age_max:
+                item_errors["age"] = [rules.age_error]
+
+        pet_type = item.get("type")
+        if pet_type is None:
+            item_errors["type"] = [
+                REQUIRED_ERROR if "type" not in item else NULL_ERROR
+            ]
+        elif str(pet_type) not in types:
+            # ChoiceField в DRF сравнивает строковое представление, поэтому
+            # списки и словари тоже получают ошибку выбора, а не TypeError.
+            item_errors["type"] = [CHOICE_ERROR.format(input=pet_type)]
+        else:
+            pet_type = str(pet_type)
+
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            valid.append((index, {"name": name, "age": age, "type": pet_type}))
+    return valid, errors
+
+
+def to_integer(value: Any) -> Optional[int]:
+    """
+    Приводит значение к целому так же, как IntegerField в DRF.
+
+    Аргументы:
+        value (Any): Значение из запроса.
+
+    Возвращает:
+        Optional[int]: Целое число или None, если значение некорректно.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        # int() в DRF допускает пробелы с обеих сторон числа.
+        value = value.strip()
+        if INTEGER_RE.match(value):
+            return int(value.partition(".")[0])
+    return None